@@ -2,28 +2,75 @@
 
 __version__ = "0.3.0"
 
-import asyncio
-
-from .cli import main_cli as unified_cli
-from .config import TapoConfig
-from .device_discovery import check_host_connectivity, discover_devices
-from .utils import (
-    cleanup_resources,
-    console,
-    create_tapo_protocol,
-    process_device_data,
-    setup_console,
-)
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .cli import main_cli as unified_cli
+    from .config import TapoConfig
+    from .device_discovery import discover_devices, iter_discover_devices
+    from .events import DeviceEvent, DeviceStateStore, EventType
+    from .hub_session import HubSession
+    from .models import ChildDevice
+    from .utils import (
+        check_host_connectivity,
+        cleanup_resources,
+        console,
+        create_tapo_protocol,
+        process_device_data,
+        setup_console,
+    )
+
+# Public name -> (submodule, attribute). Submodules are imported on first access
+# (PEP 562), so importing the package, e.g. for the CLI, stays cheap.
+_LAZY_ATTRIBUTES = {
+    "ChildDevice": ("models", "ChildDevice"),
+    "DeviceEvent": ("events", "DeviceEvent"),
+    "DeviceStateStore": ("events", "DeviceStateStore"),
+    "EventType": ("events", "EventType"),
+    "HubSession": ("hub_session", "HubSession"),
+    "TapoConfig": ("config", "TapoConfig"),
+    "check_host_connectivity": ("utils", "check_host_connectivity"),
+    "cleanup_resources": ("utils", "cleanup_resources"),
+    "console": ("utils", "console"),
+    "create_tapo_protocol": ("utils", "create_tapo_protocol"),
+    "discover_devices": ("device_discovery", "discover_devices"),
+    "iter_discover_devices": ("device_discovery", "iter_discover_devices"),
+    "process_device_data": ("utils", "process_device_data"),
+    "setup_console": ("utils", "setup_console"),
+    "unified_cli": ("cli", "main_cli"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attribute)
+    # Later lookups find the name directly and skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 __all__ = [
+    "ChildDevice",
+    "DeviceEvent",
+    "DeviceStateStore",
+    "EventType",
+    "HubSession",
     "TapoConfig",
     "check_host_connectivity",
     "cleanup_resources",
     "console",
     "create_tapo_protocol",
     "discover_devices",
+    "iter_discover_devices",
     "process_device_data",
     "setup_console",
     "unified_cli"
 ]
-
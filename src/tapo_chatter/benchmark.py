@@ -0,0 +1,536 @@
+"""Offline benchmarks for Tapo Chatter against a simulated device fleet.
+
+``SimulatedFleet`` stands in for a network of generic Tapo devices and H100
+hubs with configurable latency, jitter, loss and child counts, and
+``SimulatedClient`` answers the ``ApiClient`` calls Tapo Chatter makes from it.
+The benchmarks run the real discovery, child device and monitor code against
+that fleet and report wall time, throughput, peak memory and event-loop lag,
+so performance can be compared between versions without any hardware.
+"""
+import asyncio
+import base64
+import datetime
+import functools
+import io
+import json
+import platform
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+from . import main as monitor
+from .config import IpRange
+from .device_discovery import discover_devices
+from .events import DeviceStateStore
+from .hub_session import CHILD_PAGE_SIZE, HubSession
+from .main import HubState, MonitorView, get_child_devices, poll_hub
+from .profiling import percentile
+from .utils import console
+
+SCENARIOS = ("discovery", "child_devices", "monitor")
+
+# Throughput drop relative to a baseline run that counts as a regression
+DEFAULT_TOLERANCE = 0.2
+
+
+@dataclass
+class FleetSpec:
+    """Shape and network behaviour of a simulated fleet."""
+    network: str = "10.99.0.0/22"
+    devices: int = 200
+    hubs: int = 4
+    children: int = 16
+    latency: float = 0.02
+    jitter: float = 0.01
+    loss: float = 0.0
+    seed: int = 0
+
+
+@dataclass(slots=True)
+class SimulatedDeviceInfo:
+    """Device info shaped like the tapo library's result classes (attributes, no instance dict)."""
+    device_id: str
+    nickname: str
+    model: str
+    type: str
+    mac: str
+    ip: str
+    hw_ver: str = "1.0"
+    fw_ver: str = "1.3.0 Build 240101"
+    device_on: bool = True
+    signal_level: int = 3
+    rssi: int = -55
+    on_time: int = 0
+
+
+@dataclass(slots=True)
+class SimulatedChild:
+    """A hub child device that reports through ``to_dict()`` like the library's sensor results."""
+    device_id: str
+    nickname: str
+    device_type: str
+    status: str = "Online"
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.payload)
+
+    def to_json(self) -> Dict[str, Any]:
+        """The entry the hub's raw child list holds for this device, with its nickname base64-encoded."""
+        return {
+            'device_id': self.device_id,
+            'nickname': base64.b64encode(self.nickname.encode('utf-8')).decode('ascii'),
+            'type': self.device_type,
+            'status': self.status.lower(),
+            **self.payload,
+        }
+
+
+# One result class per sensor type, as the library returns them
+class SimulatedT100(SimulatedChild):
+    """A motion sensor."""
+    __slots__ = ()
+
+
+class SimulatedT110(SimulatedChild):
+    """A contact sensor."""
+    __slots__ = ()
+
+
+class SimulatedFleet:
+    """A deterministic fleet of generic devices and hubs spread over an address range."""
+
+    def __init__(self, spec: FleetSpec) -> None:
+        self.spec = spec
+        self.address_range = IpRange.from_string(spec.network)
+        self._random = random.Random(spec.seed)
+        addresses = list(self.address_range)
+        if spec.devices + spec.hubs > len(addresses):
+            raise ValueError(f"{spec.network} has room for {len(addresses)} devices, "
+                             f"not {spec.devices + spec.hubs}")
+        chosen = self._random.sample(addresses, spec.devices + spec.hubs)
+        self.hubs: Dict[str, SimulatedDeviceInfo] = {
+            ip: self._device_info(ip, i, "H100", "SMART.TAPOHUB") for i, ip in enumerate(chosen[:spec.hubs])
+        }
+        self.devices: Dict[str, SimulatedDeviceInfo] = {
+            ip: self._device_info(ip, i, "P110", "SMART.TAPOPLUG") for i, ip in enumerate(chosen[spec.hubs:])
+        }
+        self.children: Dict[str, List[SimulatedChild]] = {
+            ip: [self._child(ip, i) for i in range(spec.children)] for ip in self.hubs
+        }
+        self.requests = 0
+        self.lost = 0
+        self.child_list_requests = 0
+
+    def _device_info(self, ip: str, index: int, model: str, device_type: str) -> SimulatedDeviceInfo:
+        octets = [int(part) for part in ip.split('.')]
+        return SimulatedDeviceInfo(
+            device_id=f"{model}-{index:04d}",
+            nickname=f"{model} {index}",
+            model=model,
+            type=device_type,
+            mac="50-C7-BF-" + "-".join(f"{octet:02X}" for octet in octets[1:]),
+            ip=ip,
+            rssi=self._random.randint(-80, -40),
+        )
+
+    def _child(self, hub: str, index: int) -> SimulatedChild:
+        child_cls, device_type, payload = (
+            (SimulatedT100, "T100", {'detected': False}) if index % 2 == 0
+            else (SimulatedT110, "T110", {'open': False})
+        )
+        payload.update({
+            'at_low_battery': False,
+            'rssi': self._random.randint(-85, -45),
+            'jamming_rssi': self._random.randint(-110, -90),
+            'hw_ver': "1.0",
+            'mac': f"AA-BB-{index:04X}",
+            'region': "Europe/Berlin",
+            'report_interval': 16,
+            'signal_level': 3,
+            'lastOnboardingTimestamp': 1_700_000_000 + index,
+        })
+        return child_cls(device_id=f"{hub}-child-{index:03d}", nickname=f"Sensor {index}",
+                              device_type=device_type, payload=payload)
+
+    @property
+    def hosts(self) -> int:
+        return len(self.hubs) + len(self.devices)
+
+    async def round_trip(self, host: str, hang_on_loss: bool = False) -> None:
+        """
+        Spend one request's latency; lost requests raise, or never answer with ``hang_on_loss``.
+
+        Never answering leaves the caller's timeout to fire, as a dropped UDP or
+        TCP packet would.
+        """
+        self.requests += 1
+        delay = max(0.0, self.spec.latency + self._random.uniform(-self.spec.jitter, self.spec.jitter))
+        lost = self._random.random() < self.spec.loss
+        if lost:
+            self.lost += 1
+            if hang_on_loss:
+                await asyncio.sleep(3600)
+        await asyncio.sleep(delay)
+        if lost:
+            raise ConnectionError(f"Simulated loss talking to {host}")
+
+    def evolve(self, hub: str) -> List[SimulatedChild]:
+        """Advance a hub's children by one report: sensors trip, signals drift."""
+        children = self.children[hub]
+        for child in children:
+            payload = child.payload
+            if self._random.random() < 0.1:
+                key = 'detected' if 'detected' in payload else 'open'
+                payload[key] = not payload[key]
+            payload['rssi'] = max(-95, min(-35, payload['rssi'] + self._random.randint(-2, 2)))
+        return children
+
+    async def check_host_connectivity(self, host: str, port: int = 80, timeout: float = 2,
+                                      cache_ttl: float = 0) -> bool:
+        """Stand-in for ``utils.check_host_connectivity``; empty addresses refuse after one round trip."""
+        try:
+            await asyncio.wait_for(self.round_trip(host, hang_on_loss=True), timeout=timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            return False
+        return host in self.hubs or host in self.devices
+
+
+class SimulatedHub:
+    """The handler ``SimulatedClient.h100()`` returns."""
+
+    def __init__(self, fleet: SimulatedFleet, host: str) -> None:
+        self.fleet = fleet
+        self.host = host
+
+    async def get_device_info(self) -> SimulatedDeviceInfo:
+        await self.fleet.round_trip(self.host)
+        return self.fleet.hubs[self.host]
+
+    async def get_child_device_list(self) -> List[SimulatedChild]:
+        await self.fleet.round_trip(self.host)
+        self.fleet.child_list_requests += 1
+        return list(self.fleet.evolve(self.host))
+
+    async def get_child_device_list_json(self, start_index: int) -> Dict[str, Any]:
+        """One page of the raw child list; the children report anew when the first page is read."""
+        await self.fleet.round_trip(self.host)
+        if start_index == 0:
+            self.fleet.child_list_requests += 1
+            children = self.fleet.evolve(self.host)
+        else:
+            children = self.fleet.children[self.host]
+        return {
+            'child_device_list': [child.to_json() for child in children[start_index:start_index + CHILD_PAGE_SIZE]],
+            'start_index': start_index,
+            'sum': len(children),
+        }
+
+
+class SimulatedDevice:
+    """The handler ``SimulatedClient.generic_device()`` returns."""
+
+    def __init__(self, fleet: SimulatedFleet, host: str, info: SimulatedDeviceInfo) -> None:
+        self.fleet = fleet
+        self.host = host
+        self.info = info
+
+    async def get_device_info(self) -> SimulatedDeviceInfo:
+        await self.fleet.round_trip(self.host, hang_on_loss=True)
+        return self.info
+
+
+class SimulatedClient:
+    """Stand-in for ``tapo.ApiClient`` that talks to a ``SimulatedFleet``."""
+
+    def __init__(self, fleet: SimulatedFleet) -> None:
+        self.fleet = fleet
+
+    async def generic_device(self, host: str) -> SimulatedDevice:
+        info = self.fleet.devices.get(host) or self.fleet.hubs.get(host)
+        await self.fleet.round_trip(host, hang_on_loss=True)
+        if info is None:
+            raise ConnectionRefusedError(f"Connection refused by {host}")
+        return SimulatedDevice(self.fleet, host, info)
+
+    async def h100(self, host: str) -> SimulatedHub:
+        await self.fleet.round_trip(host)
+        if host not in self.fleet.hubs:
+            raise ConnectionRefusedError(f"Connection refused by {host}")
+        return SimulatedHub(self.fleet, host)
+
+
+@contextmanager
+def quiet_consoles() -> Iterator[None]:
+    """Keep the progress output of the code under test off the console."""
+    consoles = (console, monitor.console)
+    quiet = [c.quiet for c in consoles]
+    for c in consoles:
+        c.quiet = True
+    try:
+        yield
+    finally:
+        for c, was_quiet in zip(consoles, quiet, strict=True):
+            c.quiet = was_quiet
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps at a fixed interval."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: List[float] = []
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def summary(self) -> Dict[str, float]:
+        samples = sorted(self.samples)
+        return {
+            'mean': sum(samples) / len(samples) if samples else 0.0,
+            'p99': percentile(samples, 99),
+            'max': samples[-1] if samples else 0.0,
+        }
+
+
+async def measure(name: str, run: Callable[[], Awaitable[Tuple[int, Dict[str, Any]]]],
+                  trace_memory: bool = True) -> Dict[str, Any]:
+    """
+    Run one scenario and collect its wall time, throughput, peak memory and loop lag.
+
+    ``run`` returns the number of items it processed and scenario-specific details.
+    """
+    lag = LoopLagMonitor()
+    lag_task = asyncio.create_task(lag.run())
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        items, details = await run()
+    finally:
+        wall_time = time.perf_counter() - started
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        lag_task.cancel()
+        await asyncio.gather(lag_task, return_exceptions=True)
+    return {
+        'scenario': name,
+        'wall_time': wall_time,
+        'items': items,
+        'throughput': items / wall_time if wall_time > 0 else 0.0,
+        'memory_peak_bytes': peak,
+        'loop_lag': lag.summary(),
+        **details,
+    }
+
+
+async def bench_discovery(fleet: SimulatedFleet, limit: int = 64, timeout: float = 0.5,
+                          prefilter: bool = True) -> Tuple[int, Dict[str, Any]]:
+    """Sweep the fleet's whole address range with ``discover_devices``; items are addresses scanned."""
+    devices, error_stats = await discover_devices(
+        SimulatedClient(fleet), ip_ranges=[fleet.address_range], limit=limit,
+        timeout_seconds=timeout, prefilter=prefilter, check_connectivity=fleet.check_host_connectivity,
+    )
+    return len(fleet.address_range), {
+        'devices_found': len(devices),
+        'devices_expected': fleet.hosts,
+        'error_stats': error_stats,
+    }
+
+
+async def bench_child_devices(fleet: SimulatedFleet, rounds: int = 5) -> Tuple[int, Dict[str, Any]]:
+    """Fetch every hub's children ``rounds`` times with ``get_child_devices``; items are children parsed."""
+    client = SimulatedClient(fleet)
+    sessions = [HubSession(client, hub) for hub in fleet.hubs]
+    parsed = 0
+    failures = 0
+    for _ in range(rounds):
+        results = await asyncio.gather(
+            *(get_child_devices(client, session.host, session=session, quiet=True,
+                                check_connectivity=fleet.check_host_connectivity)
+              for session in sessions),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                failures += 1
+            else:
+                parsed += len(result)
+    return parsed, {'rounds': rounds, 'failed_fetches': failures}
+
+
+async def bench_monitor(fleet: SimulatedFleet, duration: float = 3.0,
+                        interval: float = 0.25, paged: bool = False) -> Tuple[int, Dict[str, Any]]:
+    """
+    Run the monitor's poll, diff and render loop for ``duration`` seconds; items are hub polls.
+
+    When ``paged``, child lists are fetched and diffed page by page.
+    """
+    client = SimulatedClient(fleet)
+    states = [HubState(host=hub, session=HubSession(client, hub)) for hub in fleet.hubs]
+    view = MonitorView(states)
+    store = DeviceStateStore()
+    events = 0
+
+    async def count_event(event: Any) -> None:
+        nonlocal events
+        events += 1
+
+    store.subscribe(view.on_event)
+    store.subscribe(count_event)
+    screen = Console(file=io.StringIO(), width=160)
+    updated = asyncio.Event()
+    first_request = fleet.child_list_requests
+    renders = 0
+    pollers = [
+        asyncio.create_task(poll_hub(client, state, interval, updated, store, paged=paged,
+                                     check_connectivity=fleet.check_host_connectivity))
+        for state in states
+    ]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    try:
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                await asyncio.wait_for(updated.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            await asyncio.sleep(monitor.RENDER_DEBOUNCE)
+            updated.clear()
+            screen.print(view.render())
+            screen.file = io.StringIO()
+            renders += 1
+    finally:
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+    return fleet.child_list_requests - first_request, {
+        'renders': renders,
+        'rows_formatted': view.rows_formatted,
+        'events': events,
+        'handshakes': sum(state.session.handshakes for state in states),
+    }
+
+
+async def run_benchmarks(spec: FleetSpec, scenarios: Tuple[str, ...] = SCENARIOS, limit: int = 64,
+                         timeout: float = 0.5, rounds: int = 5, duration: float = 3.0,
+                         interval: float = 0.25, paged: bool = False,
+                         trace_memory: bool = True) -> Dict[str, Any]:
+    """Run the selected scenarios, each against a fresh fleet, and return the results document."""
+    runs: Dict[str, Callable[[SimulatedFleet], Awaitable[Tuple[int, Dict[str, Any]]]]] = {
+        'discovery': lambda fleet: bench_discovery(fleet, limit=limit, timeout=timeout),
+        'child_devices': lambda fleet: bench_child_devices(fleet, rounds=rounds),
+        'monitor': lambda fleet: bench_monitor(fleet, duration=duration, interval=interval, paged=paged),
+    }
+    from . import __version__
+
+    results = []
+    for name in scenarios:
+        fleet = SimulatedFleet(spec)
+        with quiet_consoles():
+            result = await measure(name, functools.partial(runs[name], fleet), trace_memory=trace_memory)
+        result['requests'] = fleet.requests
+        result['lost'] = fleet.lost
+        results.append(result)
+    return {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': datetime.datetime.now().isoformat(timespec="seconds"),
+        'fleet': asdict(spec),
+        'settings': {'limit': limit, 'timeout': timeout, 'rounds': rounds,
+                     'duration': duration, 'interval': interval, 'paged': paged,
+                     'trace_memory': trace_memory},
+        'results': results,
+    }
+
+
+def write_results(document: Dict[str, Any], path: Path) -> None:
+    """Write a results document as JSON."""
+    path.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+
+
+def compare_results(document: Dict[str, Any], baseline: Dict[str, Any],
+                    tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Describe each scenario whose throughput fell more than ``tolerance`` below the baseline."""
+    previous = {result['scenario']: result for result in baseline.get('results', [])}
+    regressions = []
+    for result in document['results']:
+        before = previous.get(result['scenario'])
+        if not before or not before.get('throughput'):
+            continue
+        change = result['throughput'] / before['throughput'] - 1
+        if change < -tolerance:
+            regressions.append(
+                f"{result['scenario']}: {result['throughput']:.1f}/s vs {before['throughput']:.1f}/s "
+                f"baseline ({change:+.0%})"
+            )
+    return regressions
+
+
+def print_results(document: Dict[str, Any], output: Optional[Console] = None) -> None:
+    """Print a results document as a table."""
+    output = output or console
+    table = Table(title=f"Benchmark Results (tapo_chatter {document['version']})")
+    table.add_column("Scenario", style="cyan")
+    table.add_column("Wall (s)", justify="right", style="yellow")
+    table.add_column("Items", justify="right")
+    table.add_column("Throughput (/s)", justify="right", style="green")
+    table.add_column("Peak Memory (KiB)", justify="right", style="magenta")
+    table.add_column("Loop Lag p99 / max (ms)", justify="right", style="blue")
+    for result in document['results']:
+        peak = result['memory_peak_bytes']
+        lag = result['loop_lag']
+        table.add_row(
+            result['scenario'],
+            f"{result['wall_time']:.2f}",
+            str(result['items']),
+            f"{result['throughput']:.1f}",
+            f"{peak / 1024:.0f}" if peak is not None else "-",
+            f"{lag['p99'] * 1000:.1f} / {lag['max'] * 1000:.1f}",
+        )
+    output.print(table)
+
+
+async def benchmark_main(spec: FleetSpec, scenarios: Tuple[str, ...] = SCENARIOS,
+                         output: Optional[Path] = Path("benchmark-results.json"),
+                         baseline: Optional[Path] = None, tolerance: float = DEFAULT_TOLERANCE,
+                         **settings: Any) -> bool:
+    """
+    Run the benchmarks, print and save the results, and compare them to a baseline.
+
+    Returns False if any scenario regressed against ``baseline``.
+    """
+    console.print(f"[yellow]Benchmarking {', '.join(scenarios)} against {spec.devices} simulated devices "
+                  f"and {spec.hubs} hubs with {spec.children} children each...[/yellow]")
+    document = await run_benchmarks(spec, scenarios, **settings)
+    print_results(document)
+    if output is not None:
+        write_results(document, output)
+        console.print(f"[green]Results written to {output}[/green]")
+    if baseline is None:
+        return True
+    try:
+        previous = json.loads(baseline.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Could not read baseline {baseline}: {e!s}[/red]")
+        return False
+    regressions = compare_results(document, previous, tolerance)
+    for regression in regressions:
+        console.print(f"[bold red]Regression: {regression}[/bold red]")
+    if not regressions:
+        console.print(f"[green]No scenario's throughput dropped more than {tolerance:.0%} below {baseline}[/green]")
+    return not regressions
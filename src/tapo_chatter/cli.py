@@ -1,17 +1,171 @@
-"""Unified CLI interface for Tapo Chatter."""
+"""Unified CLI interface for Tapo Chatter.
+
+Modes import their modules only when selected, so short runs such as
+``tapo-chatter --version`` from scripts don't load rich, tapo or the network
+stack.
+"""
 import argparse
-import asyncio
+import dataclasses
 import sys
-from typing import List, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .config import TapoConfig
+    from .history import HistoryStore
+
+
+def add_polling_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the hub polling arguments shared by the monitor and serve modes."""
+    from .history import default_history_path
+    from .scheduling import DEFAULT_MAX_INTERVAL
+
+    parser.add_argument("--ip", action="append", default=None,
+                      help="IP address of a Tapo hub to poll, comma-separated and repeatable "
+                           "(overrides TAPO_IP_ADDRESS)")
+    parser.add_argument("--interval", type=int, default=10,
+                      help="Seconds between polls of each hub (default: 10)")
+    parser.add_argument("--adaptive", action="store_true",
+                      help="Poll each hub only as often as its children report, backing off while they are stable "
+                           "and returning to --interval after a change")
+    parser.add_argument("--max-interval", type=float, default=DEFAULT_MAX_INTERVAL,
+                      help=f"Longest interval --adaptive backs off to, in seconds (default: {DEFAULT_MAX_INTERVAL:g})")
+    parser.add_argument("--paged", action="store_true",
+                      help="Fetch each hub's child list page by page, reporting changes as each page arrives")
+    parser.add_argument("--history", nargs="?", const="", default=None, metavar="PATH",
+                      help="Record every reading to an SQLite history database "
+                           f"(default location: {default_history_path()})")
+
+
+def add_monitor_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the monitor mode arguments."""
+    add_polling_arguments(parser)
+    parser.add_argument("--profile", action="store_true",
+                      help="Time each poll stage per hub and show a latency summary on exit")
+
+
+def add_serve_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the serve mode arguments."""
+    from .server import DEFAULT_HOST, DEFAULT_PORT
+
+    add_polling_arguments(parser)
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST,
+                      help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                      help=f"Port to listen on (default: {DEFAULT_PORT})")
+
+
+def add_discover_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the discover mode arguments."""
+    from .discover import DEFAULT_HUB_LIMIT, DEFAULT_HUB_TIMEOUT
+    from .tuning import limit_arg, timeout_arg
+    from .utils import device_fields_arg
 
-from .config import TapoConfig
-from .discover import discover_main
-from .main import main as monitor_main
-from .utils import console, setup_console
+    parser.add_argument("-s", "--subnet", type=str, default=None,
+                      help="Network subnet to scan (e.g. 192.168.1)")
+    parser.add_argument("-r", "--range", type=str, default=None,
+                      help="Range of IP addresses to scan, format: start-end (e.g. 1-254)")
+    parser.add_argument("-T", "--target", action="append", default=None,
+                      help="IPs, ranges or CIDRs to scan, comma-separated and repeatable "
+                           "(e.g. 10.0.0.0/22,192.168.5.10-192.168.5.20)")
+    parser.add_argument("-l", "--limit", type=limit_arg, default=20,
+                      help="Maximum number of concurrent network probes, or 'auto' to adapt it (default: 20)")
+    parser.add_argument("-t", "--timeout", type=timeout_arg, default=0.5,
+                      help="Timeout for each probe in seconds, or 'auto' to learn it from responses (default: 0.5)")
+    parser.add_argument("--sweep-limit", type=int, default=256,
+                      help="Maximum number of concurrent TCP port checks in the pre-filter sweep (default: 256)")
+    parser.add_argument("--no-prefilter", action="store_true",
+                      help="Probe every address with the Tapo protocol instead of sweeping the Tapo port first")
+    parser.add_argument("--no-cache", action="store_true",
+                      help="Ignore the discovery cache and always sweep the full range")
+    parser.add_argument("--rescan", action="store_true",
+                      help="Sweep the full range even if the cached sweep is still fresh")
+    parser.add_argument("--cache-max-age", type=float, default=24,
+                      help="Hours after which a cached sweep is refreshed (default: 24)")
+    parser.add_argument("-n", "--num-devices", type=int, default=None,
+                      help="Stop after finding this many devices (default: scan entire range)")
+    parser.add_argument("-j", "--json", action="store_true",
+                      help="Output results in JSON format")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                      help="Show verbose error output")
+    parser.add_argument("--no-children", action="store_true",
+                      help="Skip fetching and displaying child devices from hubs")
+    parser.add_argument("--hub-limit", type=int, default=DEFAULT_HUB_LIMIT,
+                      help=f"Maximum number of hubs to fetch child devices from at once (default: {DEFAULT_HUB_LIMIT})")
+    parser.add_argument("--hub-timeout", type=float, default=DEFAULT_HUB_TIMEOUT,
+                      help=f"Seconds to wait for each hub's child devices (default: {DEFAULT_HUB_TIMEOUT:g})")
+    parser.add_argument("--profile", action="store_true",
+                      help="Time each probe stage (connect, handshake, device info, parsing) per host and show a latency summary")
+    parser.add_argument("--fields", type=device_fields_arg, default=frozenset(),
+                      help="Comma-separated device info fields to report in addition to the standard ones, "
+                           "e.g. fw_ver,on_time, or 'extended' for firmware, uptime and power protection data")
+
+
+def add_benchmark_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the benchmark mode arguments."""
+    from .benchmark import DEFAULT_TOLERANCE, SCENARIOS, FleetSpec
+
+    defaults = FleetSpec()
+
+    parser.add_argument("--devices", type=int, default=defaults.devices,
+                      help=f"Number of simulated generic devices (default: {defaults.devices})")
+    parser.add_argument("--hubs", type=int, default=defaults.hubs,
+                      help=f"Number of simulated H100 hubs (default: {defaults.hubs})")
+    parser.add_argument("--children", type=int, default=defaults.children,
+                      help=f"Child devices per hub (default: {defaults.children})")
+    parser.add_argument("--network", type=str, default=defaults.network,
+                      help=f"Address range the fleet is spread over (default: {defaults.network})")
+    parser.add_argument("--latency", type=float, default=defaults.latency,
+                      help=f"Seconds per simulated request (default: {defaults.latency:g})")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter,
+                      help=f"Random variation of the latency in seconds (default: {defaults.jitter:g})")
+    parser.add_argument("--loss", type=float, default=defaults.loss,
+                      help=f"Fraction of requests that are lost (default: {defaults.loss:g})")
+    parser.add_argument("--seed", type=int, default=defaults.seed,
+                      help=f"Random seed for the fleet layout and network behaviour (default: {defaults.seed})")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, default=None,
+                      help="Scenario to run, repeatable (default: all)")
+    parser.add_argument("-l", "--limit", type=int, default=64,
+                      help="Concurrent probes in the discovery scenario (default: 64)")
+    parser.add_argument("-t", "--timeout", type=float, default=0.5,
+                      help="Probe timeout in seconds in the discovery scenario (default: 0.5)")
+    parser.add_argument("--rounds", type=int, default=5,
+                      help="Child device fetches per hub in the child_devices scenario (default: 5)")
+    parser.add_argument("--duration", type=float, default=3.0,
+                      help="Seconds to run the monitor scenario (default: 3)")
+    parser.add_argument("--interval", type=float, default=0.25,
+                      help="Poll interval in seconds in the monitor scenario (default: 0.25)")
+    parser.add_argument("--paged", action="store_true",
+                      help="Fetch child lists page by page in the monitor scenario")
+    parser.add_argument("--no-memory", action="store_true",
+                      help="Skip peak memory tracing, which slows the scenarios down")
+    parser.add_argument("-o", "--output", type=Path, default=Path("benchmark-results.json"),
+                      help="JSON file to write the results to (default: benchmark-results.json)")
+    parser.add_argument("--baseline", type=Path, default=None,
+                      help="Earlier results file to compare against; exits with status 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                      help=f"Throughput drop that counts as a regression (default: {DEFAULT_TOLERANCE:g})")
+
+
+# Mode -> (help, function adding its arguments)
+MODES: Dict[str, Tuple[str, Callable[[argparse.ArgumentParser], None]]] = {
+    "monitor": ("Monitor Tapo hubs and their devices continuously", add_monitor_arguments),
+    "serve": ("Poll Tapo hubs headlessly and serve their state over HTTP", add_serve_arguments),
+    "discover": ("Discover Tapo devices on your network", add_discover_arguments),
+    "benchmark": ("Benchmark discovery and monitoring against a simulated fleet", add_benchmark_arguments),
+}
 
 
 def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
-    """Parse command line arguments for the unified CLI."""
+    """
+    Parse command line arguments for the unified CLI.
+
+    Only the selected mode's arguments are defined, since their defaults come
+    from that mode's modules and importing every mode would slow down each run.
+    """
+    if args is None:
+        args = sys.argv[1:]
+
     # Create the main parser
     parser = argparse.ArgumentParser(
         description="Tapo Chatter - Manage, monitor, and discover TP-Link Tapo smart home devices",
@@ -23,60 +177,107 @@ def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
 
     # Create subparsers for different modes
     subparsers = parser.add_subparsers(dest="mode", help="Operation mode")
+    mode_parsers = {mode: subparsers.add_parser(mode, help=help_text) for mode, (help_text, _) in MODES.items()}
 
-    # MONITOR mode (original tapo-chatter functionality)
-    monitor_parser = subparsers.add_parser("monitor", help="Monitor a Tapo hub and its devices continuously")
-    monitor_parser.add_argument("--ip", type=str, help="IP address of the Tapo hub to monitor (overrides TAPO_IP_ADDRESS)")
-    monitor_parser.add_argument("--interval", type=int, default=10,
-                              help="Refresh interval in seconds (default: 10)")
-
-    # DISCOVER mode (original tapo-discover functionality)
-    discover_parser = subparsers.add_parser("discover", help="Discover Tapo devices on your network")
-    discover_parser.add_argument("-s", "--subnet", type=str, default=None,
-                               help="Network subnet to scan (e.g. 192.168.1)")
-    discover_parser.add_argument("-r", "--range", type=str, default=None,
-                               help="Range of IP addresses to scan, format: start-end (e.g. 1-254)")
-    discover_parser.add_argument("-l", "--limit", type=int, default=20,
-                               help="Maximum number of concurrent network probes (default: 20)")
-    discover_parser.add_argument("-t", "--timeout", type=float, default=0.5,
-                               help="Timeout for each probe in seconds (default: 0.5)")
-    discover_parser.add_argument("-n", "--num-devices", type=int, default=None,
-                               help="Stop after finding this many devices (default: scan entire range)")
-    discover_parser.add_argument("-j", "--json", action="store_true",
-                               help="Output results in JSON format")
-    discover_parser.add_argument("-v", "--verbose", action="store_true",
-                               help="Show verbose error output")
-    discover_parser.add_argument("--no-children", action="store_true",
-                               help="Skip fetching and displaying child devices from hubs")
+    # The only global option is a flag, so the first positional argument is the mode
+    selected = next((arg for arg in args if not arg.startswith("-")), None)
+    if selected in MODES:
+        MODES[selected][1](mode_parsers[selected])
 
     return parser.parse_args(args)
 
 
-async def monitor_mode(args: argparse.Namespace) -> None:
-    """Run the monitor mode (original tapo-chatter functionality)."""
-    # If custom IP is provided, update the config temporarily
-    config = TapoConfig.from_env()
+def open_history(args: argparse.Namespace) -> Optional['HistoryStore']:
+    """Open the history store requested with --history, if any."""
+    from .history import HistoryStore
+
+    if args.history is None:
+        return None
+    return HistoryStore(Path(args.history) if args.history else None)
+
+
+def load_hub_config(args: argparse.Namespace) -> 'TapoConfig':
+    """Load the configuration, letting --ip override the configured hubs."""
+    from .config import get_config, parse_hub_addresses
+    from .utils import console
+
+    # If custom IPs are provided, override the hubs in a copy of the shared config
+    config = get_config()
     if args.ip:
-        if TapoConfig.is_valid_ip(args.ip):
-            config.ip_address = args.ip
-        else:
-            console.print(f"[red]Invalid IP address format: {args.ip}[/red]")
+        try:
+            hub_ips = parse_hub_addresses(",".join(args.ip))
+        except ValueError as e:
+            console.print(f"[red]Invalid IP address format: {e!s}[/red]")
             sys.exit(1)
+        config = dataclasses.replace(config, ip_address=hub_ips[0] if hub_ips else None, hub_ips=hub_ips)
+    return config
+
+
+async def monitor_mode(args: argparse.Namespace) -> None:
+    """Run the monitor mode (original tapo-chatter functionality)."""
+    from .main import main as monitor_main
+
+    config = load_hub_config(args)
+    history = open_history(args)
 
     # Run the monitor with the specified refresh interval
-    await monitor_main(refresh_interval=args.interval, config=config)
+    try:
+        await monitor_main(refresh_interval=args.interval, config=config, history=history,
+                           profile=args.profile, follow_config=True, adaptive=args.adaptive,
+                           max_interval=args.max_interval, paged=args.paged)
+    finally:
+        if history is not None:
+            history.close()
+
+
+async def serve_mode(args: argparse.Namespace) -> None:
+    """Run the headless serve mode."""
+    from rich.panel import Panel
+
+    from .server import serve_main
+    from .utils import console
+
+    try:
+        config = load_hub_config(args)
+        history = open_history(args)
+        try:
+            await serve_main(refresh_interval=args.interval, config=config, host=args.host, port=args.port,
+                             history=history, follow_config=True, adaptive=args.adaptive,
+                             max_interval=args.max_interval, paged=args.paged)
+        finally:
+            if history is not None:
+                history.close()
+    except (OSError, ValueError) as e:
+        # Missing credentials or hubs, or a port that is already taken
+        console.print(Panel(
+            f"[red]Error: {e!s}[/red]",
+            title="Fatal Error",
+            border_style="red"
+        ))
+        sys.exit(1)
 
 
 async def discover_mode(args: argparse.Namespace) -> None:
     """Run the discover mode (original tapo-discover functionality)."""
+    from .config import get_config, parse_ip_ranges
+    from .discover import discover_main
+    from .utils import console
+
     # Get configuration first
-    config = TapoConfig.from_env()
+    config = get_config()
 
     # Only parse the IP range if explicitly provided
     subnet = args.subnet
     ip_range = None
+    ip_ranges = None
 
-    if args.range:
+    if args.target:
+        try:
+            ip_ranges = [parsed for target in args.target for parsed in parse_ip_ranges(target)]
+        except ValueError as e:
+            console.print(f"[bold red]Invalid scan target: {e!s}[/bold red]")
+            sys.exit(1)
+    elif args.range:
         try:
             start, end = map(int, args.range.split('-'))
             ip_range = (start, end)
@@ -84,10 +285,12 @@ async def discover_mode(args: argparse.Namespace) -> None:
             console.print(f"[bold red]Invalid IP range format: {args.range}. Should be start-end (e.g. 1-254)[/bold red]")
             sys.exit(1)
     elif not subnet:  # Only use config if no explicit subnet provided
-        # Use configuration if no explicit range provided
-        subnet, ip_range = config.get_discovery_params()
+        # Use every configured range if no explicit range provided
+        ip_ranges = config.ip_ranges or None
 
     # Show debug info for what we're actually using
+    if ip_ranges:
+        console.print(f"[yellow]Debug: Using targets: {', '.join(str(r) for r in ip_ranges)}[/yellow]")
     if subnet:
         console.print(f"[yellow]Debug: Using subnet: {subnet}[/yellow]")
     if ip_range:
@@ -102,10 +305,49 @@ async def discover_mode(args: argparse.Namespace) -> None:
         stop_after=args.num_devices,
         json_output=args.json,
         verbose=args.verbose,
-        show_children=not args.no_children
+        show_children=not args.no_children,
+        ip_ranges=ip_ranges,
+        prefilter=not args.no_prefilter,
+        prefilter_limit=args.sweep_limit,
+        use_cache=not args.no_cache,
+        rescan=args.rescan,
+        cache_max_age=args.cache_max_age * 3600,
+        hub_limit=args.hub_limit,
+        hub_timeout=args.hub_timeout,
+        extra_fields=args.fields,
+        profile=args.profile
     )
 
 
+async def benchmark_mode(args: argparse.Namespace) -> None:
+    """Run the benchmarks against a simulated fleet."""
+    from .benchmark import SCENARIOS, FleetSpec, benchmark_main
+    from .utils import console
+
+    spec = FleetSpec(network=args.network, devices=args.devices, hubs=args.hubs, children=args.children,
+                     latency=args.latency, jitter=args.jitter, loss=args.loss, seed=args.seed)
+    try:
+        passed = await benchmark_main(
+            spec,
+            scenarios=tuple(args.scenario or SCENARIOS),
+            output=args.output,
+            baseline=args.baseline,
+            tolerance=args.tolerance,
+            limit=args.limit,
+            timeout=args.timeout,
+            rounds=args.rounds,
+            duration=args.duration,
+            interval=args.interval,
+            paged=args.paged,
+            trace_memory=not args.no_memory,
+        )
+    except ValueError as e:
+        console.print(f"[bold red]Invalid fleet: {e!s}[/bold red]")
+        sys.exit(1)
+    if not passed:
+        sys.exit(1)
+
+
 def get_version() -> str:
     """Get the current version of tapo-chatter."""
     from . import __version__
@@ -114,6 +356,8 @@ def get_version() -> str:
 
 async def main_async(args: argparse.Namespace) -> None:
     """Asynchronous entry point for the CLI."""
+    from .utils import console, setup_console
+
     # Initialize console
     setup_console()
 
@@ -127,12 +371,18 @@ async def main_async(args: argparse.Namespace) -> None:
         await monitor_mode(args)
     elif args.mode == "discover":
         await discover_mode(args)
+    elif args.mode == "serve":
+        await serve_mode(args)
+    elif args.mode == "benchmark":
+        await benchmark_mode(args)
     else:
         # No mode specified, show help
         console.print("[yellow]Error: No mode specified[/yellow]")
-        console.print("Please specify a mode: 'monitor' or 'discover'")
+        console.print("Please specify a mode: 'monitor', 'discover', 'serve' or 'benchmark'")
         console.print("Example: tapo-chatter monitor")
         console.print("Example: tapo-chatter discover")
+        console.print("Example: tapo-chatter serve")
+        console.print("Example: tapo-chatter benchmark")
         console.print("\nUse 'tapo-chatter --help' for more information")
 
 
@@ -140,8 +390,14 @@ def main_cli() -> None:
     """Synchronous entry point for the console script."""
     try:
         args = parse_args()
+        if args.version:
+            # Answered before the event loop and console are even imported
+            print(f"Tapo Chatter v{get_version()}")
+            return
+        import asyncio
         asyncio.run(main_async(args))
     except KeyboardInterrupt:
+        from .utils import console
         console.print("\n[bold yellow]Exiting application...[/bold yellow]")
     # Other exceptions are caught within the mode handlers
 
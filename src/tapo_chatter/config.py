@@ -1,10 +1,12 @@
 """Configuration module for Tapo Chatter."""
 import ipaddress
 import os
+import warnings
+from collections import ChainMap
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv, load_dotenv
 from rich.console import Console
 
 # Load environment variables from .env file if it exists
@@ -12,46 +14,157 @@ from rich.console import Console
 
 console = Console()
 
+# Seconds between checks of the .env file by long-running modes
+CONFIG_CHECK_INTERVAL = 5.0
 
-@dataclass
+
+@dataclass(frozen=True, order=True, init=False)
 class IpRange:
-    """Represents a range of IP addresses."""
-    subnet: str
-    start: int
-    end: int
+    """
+    Represents an inclusive range of IPv4 addresses.
+
+    The older ``IpRange(subnet, start, end)`` form, with a three-octet subnet
+    and last-octet bounds, is still accepted but deprecated in favour of
+    ``IpRange.from_subnet()``.
+    """
+    first: ipaddress.IPv4Address
+    last: ipaddress.IPv4Address
+
+    def __init__(self, first: Union[ipaddress.IPv4Address, str, None] = None,
+                 last: Union[ipaddress.IPv4Address, str, int, None] = None,
+                 end: Optional[int] = None, *, subnet: Optional[str] = None,
+                 start: Optional[int] = None) -> None:
+        if subnet is not None or start is not None or end is not None:
+            if subnet is None:
+                # Positional IpRange(subnet, start, end)
+                subnet, start = str(first), int(last)  # type: ignore[arg-type]
+            warnings.warn(
+                "IpRange(subnet, start, end) is deprecated; use IpRange.from_subnet() "
+                "or IpRange(first, last) with IPv4 addresses",
+                DeprecationWarning, stacklevel=2
+            )
+            first, last = f"{subnet}.{start}", f"{subnet}.{end}"
+        if first is None or last is None:
+            raise TypeError("IpRange() needs a first and last address")
+        object.__setattr__(self, 'first', ipaddress.IPv4Address(first))
+        object.__setattr__(self, 'last', ipaddress.IPv4Address(last))
+        self.__post_init__()
+
+    def __post_init__(self):
+        """Validate that the range is not reversed."""
+        if self.first > self.last:
+            raise ValueError(f"Invalid IP range: {self.first} is after {self.last}")
 
     @classmethod
     def from_string(cls, ip_range: str) -> 'IpRange':
-        """Parse an IP range string into subnet and range components."""
+        """Parse an IP range string (single IP, start-end range or CIDR) into a range."""
+        ip_range = ip_range.strip()
         if '-' in ip_range:
-            # Handle range format (e.g., "192.168.1.1-192.168.1.254")
-            start_ip, end_ip = ip_range.split('-')
-            start_parts = start_ip.split('.')
-            end_parts = end_ip.split('.')
+            # Handle range format (e.g., "192.168.1.1-192.168.1.254" or "192.168.1.1-254")
+            start_ip, end_ip = (part.strip() for part in ip_range.split('-', 1))
+            if '.' not in end_ip:
+                # Last-octet shorthand is relative to the start address's /24
+                end_ip = '.'.join([*start_ip.split('.')[:3], end_ip])
+            return cls(first=ipaddress.IPv4Address(start_ip), last=ipaddress.IPv4Address(end_ip))
+        elif '/' in ip_range:
+            # Handle CIDR notation (e.g., "192.168.0.0/22"), skipping the network
+            # and broadcast addresses where the network has them
+            network = ipaddress.IPv4Network(ip_range, strict=False)
+            if network.num_addresses > 2:
+                return cls(first=network.network_address + 1, last=network.broadcast_address - 1)
+            return cls(first=network.network_address, last=network.broadcast_address)
+        else:
+            # Handle single IP (e.g., "192.168.1.100")
+            address = ipaddress.IPv4Address(ip_range)
+            return cls(first=address, last=address)
 
-            # Ensure both IPs are in the same subnet
-            if start_parts[:3] != end_parts[:3]:
-                raise ValueError("IP range must be within the same subnet")
+    @classmethod
+    def from_subnet(cls, subnet: str, start: int = 1, end: int = 254) -> 'IpRange':
+        """Build a range from a three-octet subnet (e.g. "192.168.1") and last-octet bounds."""
+        start = max(1, min(254, start))
+        end = max(1, min(254, end))
+        if start > end:
+            start, end = end, start
+        return cls(first=ipaddress.IPv4Address(f"{subnet}.{start}"),
+                   last=ipaddress.IPv4Address(f"{subnet}.{end}"))
 
-            subnet = '.'.join(start_parts[:3])
-            start = int(start_parts[3])
-            end = int(end_parts[3])
+    @property
+    def subnet(self) -> str:
+        """The first three octets of the range's first address."""
+        return '.'.join(str(self.first).split('.')[:3])
 
-            return cls(subnet=subnet, start=start, end=end)
-        elif '/' in ip_range:
-            # Handle CIDR notation (e.g., "192.168.1.0/24")
-            network = ipaddress.ip_network(ip_range)
-            first_ip = network.network_address
-            subnet = '.'.join(str(first_ip).split('.')[:3])
-            return cls(subnet=subnet, start=1, end=254)  # Standard usable range for /24
+    @property
+    def start(self) -> int:
+        """The last octet of the range's first address."""
+        return int(self.first) & 0xFF
+
+    @property
+    def end(self) -> int:
+        """The last octet of the range's last address, or 255 if it is past ``subnet``."""
+        if int(self.last) >> 8 != int(self.first) >> 8:
+            return 255
+        return int(self.last) & 0xFF
+
+    def __contains__(self, ip_address: object) -> bool:
+        """Whether an address (string or IPv4Address) falls inside the range."""
+        try:
+            address = ipaddress.IPv4Address(ip_address)  # type: ignore[arg-type]
+        except ValueError:
+            return False
+        return self.first <= address <= self.last
+
+    def __len__(self) -> int:
+        """Number of addresses in the range."""
+        return int(self.last) - int(self.first) + 1
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the addresses in the range as strings."""
+        for value in range(int(self.first), int(self.last) + 1):
+            yield str(ipaddress.IPv4Address(value))
+
+    def __str__(self) -> str:
+        if self.first == self.last:
+            return str(self.first)
+        return f"{self.first}-{self.last}"
+
+
+def merge_ip_ranges(ip_ranges: Iterable[IpRange]) -> List[IpRange]:
+    """Merge overlapping and adjacent ranges into a sorted, non-overlapping list."""
+    merged: List[IpRange] = []
+    for ip_range in sorted(ip_ranges):
+        if merged and int(ip_range.first) <= int(merged[-1].last) + 1:
+            if ip_range.last > merged[-1].last:
+                merged[-1] = IpRange(first=merged[-1].first, last=ip_range.last)
         else:
-            # Handle single IP (e.g., "192.168.1.100")
-            parts = ip_range.split('.')
-            if len(parts) != 4:
-                raise ValueError("Invalid IP address format")
-            subnet = '.'.join(parts[:3])
-            octet = int(parts[3])
-            return cls(subnet=subnet, start=octet, end=octet)
+            merged.append(ip_range)
+    return merged
+
+
+def parse_ip_ranges(ip_ranges: str) -> List[IpRange]:
+    """Parse a comma-separated list of IPs, ranges and CIDRs."""
+    return [IpRange.from_string(part) for part in ip_ranges.split(',') if part.strip()]
+
+
+def iter_ip_addresses(ip_ranges: Iterable[IpRange]) -> Iterator[str]:
+    """Lazily iterate over every address in the ranges, each at most once."""
+    for ip_range in merge_ip_ranges(ip_ranges):
+        yield from ip_range
+
+
+def count_ip_addresses(ip_ranges: Iterable[IpRange]) -> int:
+    """Count the distinct addresses covered by the ranges."""
+    return sum(len(ip_range) for ip_range in merge_ip_ranges(ip_ranges))
+
+
+def parse_hub_addresses(hub_addresses: str) -> List[str]:
+    """Parse a comma-separated list of hub IP addresses, dropping duplicates."""
+    hosts: List[str] = []
+    for part in hub_addresses.split(','):
+        if part.strip():
+            host = str(ipaddress.IPv4Address(part.strip()))
+            if host not in hosts:
+                hosts.append(host)
+    return hosts
 
 
 @dataclass
@@ -61,20 +174,38 @@ class TapoConfig:
     password: str
     ip_address: Optional[str] = None
     ip_ranges: List[IpRange] = field(default_factory=list)
+    hub_ips: List[str] = field(default_factory=list)
 
     def __post_init__(self):
         """Initialize default values after dataclass initialization."""
         if self.ip_ranges is None:
             self.ip_ranges = []
+        if self.hub_ips is None:
+            self.hub_ips = []
+
+    @property
+    def hub_addresses(self) -> List[str]:
+        """Every hub to monitor, falling back to the single ``ip_address``."""
+        if self.hub_ips:
+            return list(self.hub_ips)
+        return [self.ip_address] if self.ip_address else []
 
     @classmethod
-    def from_env(cls) -> 'TapoConfig':
-        """Load configuration from environment variables."""
-        load_dotenv()
+    def from_env(cls, values: Optional[Mapping[str, Optional[str]]] = None) -> 'TapoConfig':
+        """
+        Load configuration from environment variables.
+
+        Args:
+            values: Variables to read instead of the process environment, which
+                is otherwise read after loading the .env file into it
+        """
+        if values is None:
+            load_dotenv()
+            values = os.environ
 
         # Required fields
-        username = os.getenv('TAPO_USERNAME')
-        password = os.getenv('TAPO_PASSWORD')
+        username = values.get('TAPO_USERNAME')
+        password = values.get('TAPO_PASSWORD')
 
         if not username or not password:
             raise ValueError(
@@ -82,30 +213,128 @@ class TapoConfig:
             )
 
         # Optional fields
-        ip_address = os.getenv('TAPO_IP_ADDRESS')
-        ip_range_str = os.getenv('TAPO_IP_RANGE')
+        ip_address = values.get('TAPO_IP_ADDRESS')
+        ip_range_str = values.get('TAPO_IP_RANGE')
+
+        # Handle comma-separated ranges
+        ip_ranges = parse_ip_ranges(ip_range_str) if ip_range_str else []
 
-        ip_ranges: List[IpRange] = []
-        if ip_range_str:
-            # Handle comma-separated ranges
-            for range_part in ip_range_str.split(','):
-                range_part = range_part.strip()
-                if range_part:
-                    ip_ranges.append(IpRange.from_string(range_part))
+        # TAPO_IP_ADDRESS may list several hubs; ip_address keeps the first
+        hub_ips: List[str] = []
+        if ip_address and ',' in ip_address:
+            hub_ips = parse_hub_addresses(ip_address)
+            ip_address = hub_ips[0] if hub_ips else None
 
         return cls(
             username=username,
             password=password,
             ip_address=ip_address,
-            ip_ranges=ip_ranges
+            ip_ranges=ip_ranges,
+            hub_ips=hub_ips
         )
 
+
     def get_discovery_params(self) -> Tuple[Optional[str], Tuple[int, int]]:
-        """Get the subnet and IP range for device discovery."""
+        """
+        Get the subnet and last-octet range of the first configured range.
+
+        Deprecated: the result can only describe one /24, so the other
+        configured ranges are left out. Scan ``ip_ranges`` instead, which
+        ``merge_ip_ranges()`` turns into non-overlapping ranges.
+        """
+        warnings.warn(
+            "TapoConfig.get_discovery_params() is deprecated; scan TapoConfig.ip_ranges instead",
+            DeprecationWarning, stacklevel=2
+        )
         if not self.ip_ranges:
             # Default fallback
             return None, (1, 254)
-
-        # For now, use the first range. In the future, we could scan multiple ranges
-        first_range = self.ip_ranges[0]
+        first_range = merge_ip_ranges(self.ip_ranges)[0]
         return first_range.subnet, (first_range.start, first_range.end)
+
+
+class ConfigCache:
+    """
+    The process-wide configuration, built once and rebuilt when the .env file changes.
+
+    ``get()`` never touches the file system after the first call. Long-running
+    modes call ``reload_if_changed()`` on their own schedule, which costs one
+    ``stat()`` of the .env file unless its modification time moved.
+    """
+
+    def __init__(self, dotenv_path: Optional[str] = None) -> None:
+        """
+        Args:
+            dotenv_path: The .env file to read, located like ``load_dotenv()`` does if None
+        """
+        self._dotenv_path = dotenv_path
+        self._config: Optional[TapoConfig] = None
+        self._mtime: Optional[int] = None
+
+    @property
+    def dotenv_path(self) -> str:
+        """The .env file being followed, or an empty string if there is none (yet)."""
+        if not self._dotenv_path:
+            self._dotenv_path = find_dotenv() or None
+        return self._dotenv_path or ""
+
+    def _modified_at(self, path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            return None
+
+    def _load(self) -> TapoConfig:
+        path = self.dotenv_path
+        # Recorded first, so an invalid file is reported once rather than on every check
+        self._mtime = self._modified_at(path)
+        # The file is parsed once per load and never copied into the environment, so
+        # an edited key takes effect; variables set outside still win, as with load_dotenv()
+        values = {key: value for key, value in (dotenv_values(path) if path else {}).items() if value is not None}
+        self._config = TapoConfig.from_env(ChainMap(os.environ, values))
+        return self._config
+
+    def get(self) -> TapoConfig:
+        """Return the configuration, loading it on first use."""
+        if self._config is None:
+            return self._load()
+        return self._config
+
+    def reload_if_changed(self) -> Optional[TapoConfig]:
+        """
+        Rebuild the configuration if the .env file changed since it was loaded.
+
+        Returns the new configuration, or None if nothing changed. If the
+        changed file is invalid, ValueError is raised and the previous
+        configuration stays in use.
+        """
+        if self._config is None:
+            return self._load()
+        if self._modified_at(self.dotenv_path) == self._mtime:
+            return None
+        previous = self._config
+        config = self._load()
+        return config if config != previous else None
+
+    def clear(self) -> None:
+        """Forget the loaded configuration so the next ``get()`` reads it again."""
+        self._config = None
+        self._mtime = None
+
+
+_config_cache = ConfigCache()
+
+
+def get_config() -> TapoConfig:
+    """Return the process-wide configuration, loaded from the environment once."""
+    return _config_cache.get()
+
+
+def reload_config_if_changed() -> Optional[TapoConfig]:
+    """Reload the process-wide configuration if the .env file changed; see ``ConfigCache``."""
+    return _config_cache.reload_if_changed()
+
+
+def clear_config_cache() -> None:
+    """Forget the process-wide configuration."""
+    _config_cache.clear()
@@ -4,14 +4,44 @@ This module provides functionality to discover Tapo devices on the local network
 by concurrently probing IP addresses in a given range.
 """
 import asyncio
-import socket
-from typing import Any, Dict, List, Optional, Tuple
+import contextlib
+import functools
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import netifaces
 from tapo import ApiClient
 
-from .config import TapoConfig
-from .utils import check_host_connectivity, console, process_device_data
+from .config import (
+    IpRange,
+    count_ip_addresses,
+    get_config,
+    iter_ip_addresses,
+    merge_ip_ranges,
+)
+from .profiling import DEVICE_INFO, HANDSHAKE, PARSE, timed
+from .tuning import AdaptiveTuner
+from .utils import (
+    ConnectivityCheck,
+    capture_library_logs,
+    check_host_connectivity,
+    console,
+    process_device_data,
+    suppress_library_logs,
+)
 
 # console is imported from utils, so remove this duplicate
 # console = Console()
@@ -45,55 +75,74 @@ def get_local_ip_subnet() -> Optional[str]:
         return "192.168.1"
 
 
-def get_useful_device_info(device_info: Any) -> Dict[str, Any]:
+def get_useful_device_info(device_info: Any, extra_fields: Iterable[str] = ()) -> Dict[str, Any]:
     """
     Extract useful properties from device_info object.
     
     Args:
         device_info: The device info object returned by the Tapo API
+        extra_fields: Properties to keep in addition to the standard ones
         
     Returns:
         Dict[str, Any]: Dictionary containing useful device information
     """
     # Utilize the common function in utils.py
-    return process_device_data(device_info)
+    return process_device_data(device_info, extra_fields)
 
 
-async def device_probe(client: ApiClient, ip_address: str, timeout_seconds: float = 1.0) -> Tuple[bool, Optional[Dict[str, Any]]]:
+async def device_probe(client: ApiClient, ip_address: str, timeout_seconds: float = 1.0,
+                       log_messages: Optional[List[str]] = None,
+                       extra_fields: Iterable[str] = (),
+                       raise_errors: bool = False) -> Tuple[bool, Optional[Dict[str, Any]]]:
     """
     Probe a single IP address for a Tapo device.
-    
+
+    Library log output is not suppressed here; wrap scans in
+    ``suppress_library_logs()`` to keep it off the console.
+
     Args:
         client: The Tapo ApiClient instance
         ip_address: The IP address to probe
         timeout_seconds: Maximum time to wait for a response
-        
+        log_messages: Optional list that receives the library messages suppressed
+            during this probe
+        extra_fields: Device info properties to keep in addition to the standard ones
+        raise_errors: Whether a failed probe raises its exception instead of
+            returning (False, None), so scans can classify the failure
+
     Returns:
         Tuple[bool, Optional[Dict]]: Tuple containing (success, device_data)
-    """
-    # Redirect console output to suppress raw error messages
-    import io
-    import sys
-    original_stderr = sys.stderr
-    sys.stderr = io.StringIO()  # Capture stderr output
 
+    Raises:
+        Exception: With ``raise_errors``, whatever the probe failed with, or
+            LookupError if the host answered without device info
+    """
+    messages: List[str] = []
     try:
-        device = await client.generic_device(ip_address)
-        device_info = await device.get_device_info()
-        # Restore stderr before returning
-        sys.stderr = original_stderr
-
-        if device_info:
-            device_instance = {
-                'ip_address': ip_address,
-                'device_info': get_useful_device_info(device_info)
-            }
-            return True, device_instance
-        return False, None
+        with capture_library_logs(ip_address) as messages:
+            with timed(HANDSHAKE, ip_address):
+                device = await client.generic_device(ip_address)
+            with timed(DEVICE_INFO, ip_address):
+                device_info = await device.get_device_info()
     except Exception:
-        # Restore stderr before returning
-        sys.stderr = original_stderr
+        if raise_errors:
+            raise
         return False, None
+    finally:
+        if log_messages is not None:
+            log_messages.extend(messages)
+
+    if device_info:
+        with timed(PARSE, ip_address):
+            useful_info = get_useful_device_info(device_info, extra_fields)
+        device_instance = {
+            'ip_address': ip_address,
+            'device_info': useful_info
+        }
+        return True, device_instance
+    if raise_errors:
+        raise LookupError(f"{ip_address} returned no device info")
+    return False, None
 
 
 async def device_probe_semaphore(sem: asyncio.Semaphore, client: ApiClient, ip_address: str,
@@ -114,31 +163,62 @@ async def device_probe_semaphore(sem: asyncio.Semaphore, client: ApiClient, ip_a
         return await asyncio.wait_for(device_probe(client, ip_address), timeout=timeout_seconds)
 
 
-async def discover_devices(client: ApiClient, subnet: Optional[str] = None,
-                         ip_range: Optional[Tuple[int, int]] = (1, 254),
-                         limit: int = 20,
-                         timeout_seconds: float = 0.5,
-                         stop_after: Optional[int] = None
-                         ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+# Port every Tapo device serves its local HTTP API on
+TAPO_HTTP_PORT = 80
+
+# Error categories reported alongside discovery results
+ERROR_TYPES = (
+    'port_closed',
+    'timeout',
+    'connection_refused',
+    'network_unreachable',
+    'invalid_url',
+    'hash_mismatch',
+    'cancelled',
+    'other',
+)
+
+
+# Marker a worker puts on the results queue once the addresses run out
+_WORKER_DONE = object()
+
+
+def _record_error(error_types: Dict[str, int], error: BaseException) -> None:
+    """Count a failed probe under its error category."""
+    if isinstance(error, asyncio.TimeoutError):
+        error_types['timeout'] += 1
+    elif isinstance(error, ConnectionRefusedError):
+        error_types['connection_refused'] += 1
+    elif isinstance(error, OSError):
+        if error.errno == 113:  # No route to host
+            error_types['network_unreachable'] += 1
+        else:
+            error_types['other'] += 1
+    elif 'Invalid URL' in str(error):
+        error_types['invalid_url'] += 1
+    elif 'hash mismatch' in str(error).lower():
+        error_types['hash_mismatch'] += 1
+    else:
+        error_types['other'] += 1
+
+
+def resolve_scan_targets(subnet: Optional[str], ip_range: Optional[Tuple[int, int]],
+                         ip_ranges: Optional[List[IpRange]]) -> List[IpRange]:
     """
-    Discover Tapo devices on the network by probing IP addresses.
-    
-    Args:
-        client: The Tapo ApiClient instance
-        subnet: The subnet to scan (e.g. "192.168.1"), if None will be auto-detected
-        ip_range: Range of IP addresses to scan (last octet), defaults to (1, 254)
-        limit: Maximum number of concurrent probes (higher means faster scanning)
-        timeout_seconds: Maximum time to wait for each probe (lower means faster scanning)
-        stop_after: Stop scanning after finding this many devices (None means scan all IPs)
-        
-    Returns:
-        Tuple[List[Dict[str, Any]], Dict[str, int]]: 
-            - List of discovered devices with their information
-            - Dictionary with error statistics by type
+    Work out which address ranges to scan.
+
+    Explicit ``ip_ranges`` win. Otherwise a ``subnet``/``ip_range`` pair describes a
+    single /24 range; without a subnet, every configured ``TAPO_IP_RANGE`` range is
+    used, falling back to the auto-detected local subnet.
     """
+    if ip_ranges:
+        return merge_ip_ranges(ip_ranges)
+
     if subnet is None:
-        # Try to get subnet from configuration first
-        config = TapoConfig.from_env()
+        # Try configuration first
+        config = get_config()
+        if config.ip_ranges and ip_range is None:
+            return merge_ip_ranges(config.ip_ranges)
         if config.ip_ranges:
             subnet = config.ip_ranges[0].subnet
         else:
@@ -149,104 +229,339 @@ async def discover_devices(client: ApiClient, subnet: Optional[str] = None,
                 subnet = "192.168.1"
 
     # Use default IP range if none provided
-    if ip_range is None:
-        ip_range = (1, 254)
+    start, end = ip_range if ip_range is not None else (1, 254)
+    return [IpRange.from_subnet(subnet, start, end)]
+
+
+def _address_puller(addresses: Union[Iterable[str], AsyncIterable[str]]
+                    ) -> Callable[[], Awaitable[Optional[str]]]:
+    """Return a coroutine function that takes the next address, or None once they run out."""
+    if isinstance(addresses, AsyncIterable):
+        async_iter = aiter(addresses)
+        lock = asyncio.Lock()  # An async generator can't be advanced concurrently
+
+        async def next_address() -> Optional[str]:
+            async with lock:
+                return await anext(async_iter, None)
+    else:
+        address_iter = iter(addresses)
+
+        async def next_address() -> Optional[str]:
+            return next(address_iter, None)
+    return next_address
+
+
+async def scan_addresses(addresses: Union[Iterable[str], AsyncIterable[str]],
+                         probe: Callable[[str], Awaitable[Any]],
+                         limit: int = 20,
+                         timeout_seconds: float = 0.5,
+                         tuner: Optional[AdaptiveTuner] = None
+                         ) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Probe addresses with a fixed pool of workers, yielding outcomes as they arrive.
+
+    Workers pull from a single shared iterator, so only ``limit`` probes (and at most
+    ``limit`` queued results) exist at any time, however large the address set is.
+    ``addresses`` may also be an async iterable, such as the output of another scan,
+    which lets scans be chained into a pipeline. Closing the generator cancels the
+    workers.
 
-    console.print(f"[yellow]Discovering Tapo devices on subnet {subnet}.* (range {ip_range[0]}-{ip_range[1]})[/yellow]")
-    console.print(f"[yellow]Using concurrency limit of {limit} with {timeout_seconds}s timeout[/yellow]")
+    With a ``tuner``, ``tuner.max_limit`` workers are started but only as many as the
+    tuner's current window probe at once, each with the tuner's current timeout, and
+    every outcome is fed back to the tuner.
 
-    device_data = []
-    sem = asyncio.Semaphore(limit)  # Limit concurrent tasks
+    Args:
+        addresses: The addresses to probe, consumed lazily
+        probe: Coroutine function called with each address
+        limit: Number of concurrent workers
+        timeout_seconds: Maximum time to wait for each probe
+        tuner: Optional AdaptiveTuner that overrides limit and timeout_seconds
+
+    Yields:
+        Tuple[str, Any]: The address and either the probe's result or the exception it raised
+    """
+    if tuner is not None:
+        limit = tuner.max_limit
+    results: asyncio.Queue = asyncio.Queue(maxsize=max(1, limit))
+    loop = asyncio.get_running_loop()
+    next_address = _address_puller(addresses)
+    slot = tuner.slot if tuner is not None else contextlib.nullcontext
+
+    async def worker() -> None:
+        while True:
+            async with slot():
+                address = await next_address()
+                if address is None:
+                    break
+                started = loop.time()
+                try:
+                    outcome = await asyncio.wait_for(
+                        probe(address), timeout=tuner.timeout if tuner is not None else timeout_seconds)
+                except Exception as e:
+                    outcome = e
+                if tuner is not None:
+                    tuner.record(loop.time() - started, outcome)
+            await results.put((address, outcome))
+        await results.put(_WORKER_DONE)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, limit))]
+    active = len(workers)
+    try:
+        while active:
+            item = await results.get()
+            if item is _WORKER_DONE:
+                active -= 1
+                continue
+            yield item
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+def _target_addresses(targets: List[IpRange], exclude: Optional[Set[str]]) -> Tuple[Iterable[str], int]:
+    """Lazily list the addresses in ``targets`` that are not excluded, and count them."""
+    total = count_ip_addresses(targets)
+    addresses: Iterable[str] = iter_ip_addresses(targets)
+    if exclude:
+        skip = {ip for ip in exclude if any(ip in target for target in targets)}
+        total -= len(skip)
+        addresses = (ip for ip in addresses if ip not in skip)
+    return addresses, total
+
+
+async def sweep_open_hosts(addresses: Iterable[str], check: ConnectivityCheck,
+                           port: int = TAPO_HTTP_PORT, limit: int = 256,
+                           timeout_seconds: float = 0.5,
+                           error_stats: Optional[Dict[str, int]] = None) -> AsyncIterator[str]:
+    """
+    Sweep a TCP port on ``addresses``, passing on only the hosts that accept a connection.
+
+    Args:
+        addresses: The addresses to check, consumed lazily
+        check: The port check, such as ``check_host_connectivity``
+        port: TCP port a host must accept
+        limit: Maximum number of concurrent port checks
+        timeout_seconds: Maximum time to wait for each check
+        error_stats: Optional dictionary whose 'port_closed' count is increased for
+            every host that does not accept the connection
+
+    Yields:
+        str: Each address whose port is open, as its check completes
+    """
+    sweep = scan_addresses(
+        addresses,
+        lambda ip: check(ip, port=port, timeout=timeout_seconds, cache_ttl=0),
+        limit,
+        timeout_seconds,
+    )
+    try:
+        async for ip, is_open in sweep:
+            if is_open is True:
+                yield ip
+            elif error_stats is not None:
+                error_stats['port_closed'] = error_stats.get('port_closed', 0) + 1
+    finally:
+        await sweep.aclose()
+
+
+async def _scan_probe(client: ApiClient, ip: str, extra_fields: FrozenSet[str] = frozenset(),
+                      probe_logs: Optional[Dict[str, List[str]]] = None
+                      ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """Probe ``ip`` for a scan, raising failures and keeping any library messages in ``probe_logs``."""
+    if probe_logs is None:
+        return await device_probe(client, ip, extra_fields=extra_fields, raise_errors=True)
+    messages: List[str] = []
+    try:
+        return await device_probe(client, ip, log_messages=messages, extra_fields=extra_fields,
+                                  raise_errors=True)
+    finally:
+        if messages:
+            probe_logs[ip] = messages
+
+
+async def iter_discover_devices(client: ApiClient, subnet: Optional[str] = None,
+                                ip_range: Optional[Tuple[int, int]] = None,
+                                limit: int = 20,
+                                timeout_seconds: float = 0.5,
+                                stop_after: Optional[int] = None,
+                                error_stats: Optional[Dict[str, int]] = None,
+                                ip_ranges: Optional[List[IpRange]] = None,
+                                prefilter: bool = True,
+                                prefilter_limit: int = 256,
+                                prefilter_port: int = TAPO_HTTP_PORT,
+                                exclude: Optional[Set[str]] = None,
+                                probe_logs: Optional[Dict[str, List[str]]] = None,
+                                tuner: Optional[AdaptiveTuner] = None,
+                                extra_fields: FrozenSet[str] = frozenset(),
+                                check_connectivity: Optional[ConnectivityCheck] = None
+                                ) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Discover Tapo devices on the network, yielding each one as soon as it responds.
 
-    # Validate and adjust range
-    start_ip = max(1, min(254, ip_range[0]))
-    end_ip = max(1, min(254, ip_range[1]))
-    if start_ip > end_ip:
-        start_ip, end_ip = end_ip, start_ip
+    Consumers can start working with early results while the rest of the range is
+    still being probed. Closing the iterator early (e.g. with ``contextlib.aclosing``)
+    cancels the outstanding probes.
 
-    # Create tasks for each IP in the range
-    tasks = []
-    for ip_octet in range(start_ip, end_ip + 1):
-        ip_address = f"{subnet}.{ip_octet}"
-        task = asyncio.create_task(device_probe_semaphore(sem, client, ip_address, timeout_seconds))
-        tasks.append(task)
+    With ``prefilter`` enabled, a cheap TCP connect sweep of the Tapo HTTP port runs
+    ahead of the authenticated probe at much higher concurrency, and only hosts that
+    accept the connection are probed with the Tapo protocol.
 
-    console.print(f"[yellow]Created {len(tasks)} probe tasks, waiting for completion...[/yellow]")
+    The tapo library's log output is kept off the console while the scan is running.
 
-    # Collect results as they complete
+    Args:
+        client: The Tapo ApiClient instance
+        subnet: The subnet to scan (e.g. "192.168.1"), if None will be auto-detected
+        ip_range: Range of IP addresses to scan (last octet), defaults to (1, 254)
+        limit: Maximum number of concurrent probes (higher means faster scanning)
+        timeout_seconds: Maximum time to wait for each probe (lower means faster scanning)
+        stop_after: Stop scanning after finding this many devices (None means scan all IPs)
+        error_stats: Optional dictionary that is filled with error counts by type
+        ip_ranges: Arbitrary ranges/CIDRs to scan instead of subnet and ip_range;
+            overlapping ranges are merged so each address is probed once
+        prefilter: Whether to sweep the Tapo port before the authenticated probe
+        prefilter_limit: Maximum number of concurrent port checks
+        prefilter_port: TCP port a host must accept to be probed
+        exclude: Addresses to skip, e.g. ones already verified from the discovery cache
+        probe_logs: Optional dictionary that receives, per IP address, the library
+            log messages suppressed while probing it
+        tuner: Optional AdaptiveTuner that sizes the concurrency window and probe
+            timeout of the Tapo probe stage from observed responses; the pre-filter
+            sweep still uses prefilter_limit and timeout_seconds
+        extra_fields: Device info properties to keep in addition to the standard
+            ones, such as firmware version or on-time
+        check_connectivity: Port check used by the pre-filter sweep instead of
+            ``check_host_connectivity``
+
+    Yields:
+        Dict[str, Any]: A discovered device with its IP address and information
+    """
+    error_types = error_stats if error_stats is not None else {}
+    for error_type in ERROR_TYPES:
+        error_types.setdefault(error_type, 0)
+    # Failures already counted in a caller's error_stats are not this scan's
+    previous_errors = sum(error_types.values())
+
+    targets = resolve_scan_targets(subnet, ip_range, ip_ranges)
+    addresses, total = _target_addresses(targets, exclude)
+
+    console.print(f"[yellow]Discovering Tapo devices on {', '.join(str(target) for target in targets)} ({total} addresses)[/yellow]")
+    if tuner is not None:
+        console.print(f"[yellow]Using adaptive tuning starting at concurrency {tuner.limit} with {tuner.timeout}s timeout[/yellow]")
+    else:
+        console.print(f"[yellow]Using concurrency limit of {limit} with {timeout_seconds}s timeout[/yellow]")
+
+    sweep = None
+    candidates: Union[Iterable[str], AsyncIterable[str]] = addresses
+    if prefilter:
+        console.print(f"[yellow]Pre-filtering on TCP port {prefilter_port} with {prefilter_limit} concurrent checks[/yellow]")
+        candidates = sweep = sweep_open_hosts(addresses, check_connectivity or check_host_connectivity,
+                                      port=prefilter_port, limit=prefilter_limit,
+                                      timeout_seconds=timeout_seconds, error_stats=error_types)
+
+    # Failures are raised so they are counted by category and, when tuning,
+    # back off the window instead of passing as fast responses
+    probe = functools.partial(_scan_probe, client, extra_fields=extra_fields, probe_logs=probe_logs)
+    scan = scan_addresses(candidates, probe, limit, timeout_seconds, tuner=tuner)
+
+    # Yield results as they complete
     completed = 0
     found = 0
-    errors = 0
-    error_types = {
-        'timeout': 0,
-        'connection_refused': 0,
-        'network_unreachable': 0,
-        'invalid_url': 0,
-        'hash_mismatch': 0,
-        'cancelled': 0,
-        'other': 0
-    }
-
-    with console.status(f"[bold green]Scanning network... (0/{len(tasks)} completed, 0 devices found)") as status:
-        for task in asyncio.as_completed(tasks):
-            try:
-                is_device, device_instance = await task
+    try:
+        with suppress_library_logs(), \
+                console.status(f"[bold green]Scanning network... (0/{total} completed, 0 devices found)") as status:
+            async for _, outcome in scan:
+                if isinstance(outcome, BaseException):
+                    _record_error(error_types, outcome)
+                    continue
+
+                is_device, device_instance = outcome
                 completed += 1
-                status.update(f"[bold green]Scanning network... ({completed}/{len(tasks)} completed, {found} devices found, {errors} errors)")
+                errors = sum(error_types.values()) - previous_errors
+                progress = f"Scanning network... ({completed}/{total} completed, {found} devices found, {errors} errors)"
+                status.update(f"[bold green]{progress}")
 
                 if is_device and device_instance:
                     found += 1
-                    device_data.append(device_instance)
                     ip = device_instance['ip_address']
                     nickname = device_instance['device_info'].get('nickname', 'Unknown')
                     model = device_instance['device_info'].get('model', 'Unknown')
-                    status.update(f"[bold green]Scanning network... ({completed}/{len(tasks)} completed, {found} devices found, {errors} errors) - Found {model} '{nickname}' at {ip}")
+                    status.update(f"[bold green]{progress} - Found {model} '{nickname}' at {ip}")
+
+                    yield device_instance
 
                     # Check if we've reached the desired number of devices
                     if stop_after is not None and found >= stop_after:
                         console.print(f"[yellow]Reached target of {stop_after} devices, stopping scan early[/yellow]")
-                        # Cancel remaining tasks
-                        for t in tasks:
-                            if not t.done():
-                                t.cancel()
-                                error_types['cancelled'] += 1
                         break
+    finally:
+        # Stop the workers, whether we stopped early or the consumer did;
+        # anything not yet probed counts as cancelled
+        await scan.aclose()
+        if sweep is not None:
+            await sweep.aclose()
+        errors = sum(error_types.values()) - previous_errors
+        error_types['cancelled'] += total - completed - errors
 
-            except asyncio.TimeoutError:
-                errors += 1
-                error_types['timeout'] += 1
-            except ConnectionRefusedError:
-                errors += 1
-                error_types['connection_refused'] += 1
-            except OSError as e:
-                errors += 1
-                if e.errno == 113:  # No route to host
-                    error_types['network_unreachable'] += 1
-                else:
-                    error_types['other'] += 1
-            except Exception as e:
-                errors += 1
-                if 'Invalid URL' in str(e):
-                    error_types['invalid_url'] += 1
-                elif 'hash mismatch' in str(e).lower():
-                    error_types['hash_mismatch'] += 1
-                else:
-                    error_types['other'] += 1
-
-    return device_data, error_types
 
+async def discover_devices(client: ApiClient, subnet: Optional[str] = None,
+                         ip_range: Optional[Tuple[int, int]] = None,
+                         limit: int = 20,
+                         timeout_seconds: float = 0.5,
+                         stop_after: Optional[int] = None,
+                         ip_ranges: Optional[List[IpRange]] = None,
+                         prefilter: bool = True,
+                         prefilter_limit: int = 256,
+                         exclude: Optional[Set[str]] = None,
+                         probe_logs: Optional[Dict[str, List[str]]] = None,
+                         tuner: Optional[AdaptiveTuner] = None,
+                         extra_fields: FrozenSet[str] = frozenset(),
+                         check_connectivity: Optional[ConnectivityCheck] = None
+                         ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Discover Tapo devices on the network by probing IP addresses.
 
-async def check_host_connectivity(host: str, port: int = 80, timeout: float = 2) -> bool:
-    """Check if the host is reachable on the network."""
-    try:
-        # Create a socket object
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
+    This collects everything yielded by ``iter_discover_devices``.
 
-        # Attempt to connect to the host
-        result = sock.connect_ex((host, port))
-        sock.close()
+    Args:
+        client: The Tapo ApiClient instance
+        subnet: The subnet to scan (e.g. "192.168.1"), if None will be auto-detected
+        ip_range: Range of IP addresses to scan (last octet), defaults to (1, 254)
+        limit: Maximum number of concurrent probes (higher means faster scanning)
+        timeout_seconds: Maximum time to wait for each probe (lower means faster scanning)
+        stop_after: Stop scanning after finding this many devices (None means scan all IPs)
+        ip_ranges: Arbitrary ranges/CIDRs to scan instead of subnet and ip_range
+        prefilter: Whether to sweep the Tapo port before the authenticated probe
+        prefilter_limit: Maximum number of concurrent port checks
+        exclude: Addresses to skip
+        probe_logs: Optional dictionary that receives suppressed library messages per IP
+        tuner: Optional AdaptiveTuner for the Tapo probe stage
+        extra_fields: Device info properties to keep in addition to the standard ones
+        check_connectivity: Port check used by the pre-filter sweep
 
-        return result == 0
-    except socket.error:
-        return False
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, int]]:
+            - List of discovered devices with their information
+            - Dictionary with error statistics by type
+    """
+    error_types: Dict[str, int] = {}
+    device_data = [
+        device async for device in iter_discover_devices(
+            client,
+            subnet=subnet,
+            ip_range=ip_range,
+            limit=limit,
+            timeout_seconds=timeout_seconds,
+            stop_after=stop_after,
+            error_stats=error_types,
+            ip_ranges=ip_ranges,
+            prefilter=prefilter,
+            prefilter_limit=prefilter_limit,
+            exclude=exclude,
+            probe_logs=probe_logs,
+            tuner=tuner,
+            extra_fields=extra_fields,
+            check_connectivity=check_connectivity,
+        )
+    ]
+    return device_data, error_types
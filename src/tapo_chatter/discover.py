@@ -1,32 +1,47 @@
 """Command-line tool for discovering Tapo devices on the network."""
 import argparse
 import asyncio
+import functools
 import json
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from rich.table import Table
 from tapo import ApiClient
 
-from .config import TapoConfig
-from .device_discovery import discover_devices
+from .config import IpRange, TapoConfig, get_config, parse_ip_ranges
+from .device_discovery import discover_devices, resolve_scan_targets
+from .discovery_cache import DEFAULT_MAX_AGE, DiscoveryCache
 from .main import (
     get_child_devices,
     print_additional_device_info_table,
     print_device_table as print_child_device_table,
 )
-from .utils import console, create_tapo_protocol
+from .models import ChildDevice
+from .profiling import LatencyProfile, print_profile, use_profile
+from .tuning import AUTO, AdaptiveTuner, limit_arg, timeout_arg
+from .utils import console, create_tapo_protocol, device_fields_arg
 
 # console is imported from utils, so remove this duplicate
 # console = Console()
 
 
-def print_device_table(devices: List[Dict[str, Any]]) -> None:
+def print_device_table(devices: List[Dict[str, Any]], title: str = "Discovered Tapo Devices") -> None:
     """Print a formatted table of discovered devices."""
     if not devices:
         console.print("[yellow]No devices found[/yellow]")
         return
 
-    table = Table(title="Discovered Tapo Devices")
+    table = Table(title=title)
 
     # Add columns
     table.add_column("IP Address", style="cyan")
@@ -90,151 +105,436 @@ def print_device_table(devices: List[Dict[str, Any]]) -> None:
     console.print(table)
 
 
-async def print_hub_child_devices(hub_devices: List[Dict[str, Any]], client: ApiClient, show_details: bool = True) -> None:
+# Number of hubs whose child devices are fetched at the same time
+DEFAULT_HUB_LIMIT = 4
+
+# Maximum time to spend fetching one hub's child devices, in seconds
+DEFAULT_HUB_TIMEOUT = 15.0
+
+
+def print_hub_result(hub: Dict[str, Any], child_devices: List[ChildDevice], error: Optional[BaseException],
+                     show_details: bool = True, hub_timeout: float = DEFAULT_HUB_TIMEOUT) -> None:
+    """Print one hub's header followed by its child device tables or the error fetching them."""
+    ip_address = hub.get('ip_address')
+    name = hub.get('device_info', {}).get('nickname', 'Unknown Hub')
+    model = hub.get('device_info', {}).get('model', 'Unknown')
+
+    console.print(f"\n[bold blue]===== Child Devices Connected to {name} ({model}) at {ip_address} =====\n[/bold blue]")
+
+    if ip_address is None:
+        console.print("[yellow]Cannot fetch child devices: No IP address available[/yellow]")
+    elif isinstance(error, asyncio.TimeoutError):
+        console.print(f"[red]Timed out after {hub_timeout}s fetching child devices from hub at {ip_address}[/red]")
+    elif error is not None:
+        console.print(f"[red]Error fetching child devices from hub at {ip_address}: {error!s}[/red]")
+    elif not child_devices:
+        console.print("[yellow]No child devices found connected to this hub.[/yellow]")
+    else:
+        console.print(f"[green]Found {len(child_devices)} child devices connected to hub {name}[/green]")
+
+        # Print detailed information tables
+        if show_details:
+            print_additional_device_info_table(child_devices)
+
+        # Print the main child device table
+        print_child_device_table(child_devices)
+
+
+async def print_hub_child_devices(hub_devices: List[Dict[str, Any]], client: ApiClient, show_details: bool = True,
+                                  limit: int = DEFAULT_HUB_LIMIT,
+                                  hub_timeout: float = DEFAULT_HUB_TIMEOUT) -> None:
     """
     Print child devices for each hub discovered.
-    
+
+    Hubs are queried concurrently, at most ``limit`` at a time, and their results
+    are printed in discovery order as soon as each hub and the ones before it are done.
+    Fetches print nothing themselves, so each hub's output, including any error,
+    stays together under its header.
+
     Args:
         hub_devices: List of discovered hub devices
         client: The Tapo ApiClient instance
         show_details: Whether to show detail tables for each child device
+        limit: Maximum number of hubs to query at once
+        hub_timeout: Maximum time in seconds to wait for a single hub
     """
-    for hub in hub_devices:
-        ip_address = hub.get('ip_address')
-        name = hub.get('device_info', {}).get('nickname', 'Unknown Hub')
-        model = hub.get('device_info', {}).get('model', 'Unknown')
+    sem = asyncio.Semaphore(max(1, limit))
 
-        console.print(f"\n[bold blue]===== Child Devices Connected to {name} ({model}) at {ip_address} =====\n[/bold blue]")
+    async def fetch(ip_address: str) -> List[ChildDevice]:
+        async with sem:
+            return await asyncio.wait_for(get_child_devices(client, ip_address, quiet=True), timeout=hub_timeout)
 
-        # Get child devices from the hub
-        try:
-            if ip_address is None:
-                console.print("[yellow]Cannot fetch child devices: No IP address available[/yellow]")
-                continue
+    fetches = [
+        asyncio.create_task(fetch(hub['ip_address'])) if hub.get('ip_address') is not None else None
+        for hub in hub_devices
+    ]
+    if any(fetches):
+        console.print(f"[yellow]Fetching child devices from {sum(1 for f in fetches if f)} hubs "
+                      f"({limit} at a time, {hub_timeout}s timeout each)...[/yellow]")
+
+    try:
+        for hub, fetch_task in zip(hub_devices, fetches, strict=True):
+            # Wait for this hub's child devices; later hubs keep fetching meanwhile
+            child_devices: List[ChildDevice] = []
+            error: Optional[Exception] = None
+            if fetch_task is not None:
+                try:
+                    child_devices = await fetch_task
+                except Exception as e:
+                    error = e
+            print_hub_result(hub, child_devices, error, show_details, hub_timeout)
+    finally:
+        pending = [fetch_task for fetch_task in fetches if fetch_task is not None]
+        for fetch_task in pending:
+            fetch_task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+# Descriptions of the error categories discovery counts
+ERROR_DESCRIPTIONS: Dict[str, str] = {
+    'port_closed': "No Tapo port open (skipped by pre-filter sweep)",
+    'timeout': "Normal timeouts from non-responsive IPs",
+    'connection_refused': "Device refused connection (port closed)",
+    'network_unreachable': "Network segment unreachable",
+    'invalid_url': "Invalid URL format during connection",
+    'hash_mismatch': "Security hash mismatch (non-Tapo device)",
+    'cancelled': "Scan cancelled by early stop option",
+    'other': "Other connection errors"
+}
+
+
+def resolve_probe_settings(limit: Union[int, str],
+                           timeout: Union[float, str]) -> Tuple[Optional[AdaptiveTuner], int, float]:
+    """
+    Work out the Tapo probe concurrency and timeout to scan with.
+
+    "auto" limit/timeout hand the probe stage over to an adaptive tuner, which is
+    returned along with the starting limit and the timeout for the pre-filter
+    sweep; the sweep keeps the default timeout.
+    """
+    if limit != AUTO and timeout != AUTO:
+        return None, int(limit), float(timeout)
+    tuner = AdaptiveTuner(
+        limit=None if limit == AUTO else int(limit),
+        timeout=None if timeout == AUTO else float(timeout)
+    )
+    return tuner, tuner.max_limit, 0.5 if timeout == AUTO else float(timeout)
+
+
+async def profiled_discover_devices(latency: Optional[LatencyProfile],
+                                    **options: Any) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Run discover_devices with ``options``, timing its stages into ``latency`` if given."""
+    with use_profile(latency):
+        return await discover_devices(**options)
 
-            console.print(f"[yellow]Fetching child devices from hub at {ip_address}...[/yellow]")
-            child_devices = await get_child_devices(client, ip_address)
 
-            if not child_devices:
-                console.print("[yellow]No child devices found connected to this hub.[/yellow]")
-                continue
+async def reverify_cached_devices(scan: Callable[..., Awaitable[Tuple[List[Dict[str, Any]], Dict[str, int]]]],
+                                  cache: DiscoveryCache, targets: List[IpRange],
+                                  stop_after: Optional[int]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Probe the cached devices within ``targets`` again, recording the ones that answer.
 
-            console.print(f"[green]Found {len(child_devices)} child devices connected to hub {name}[/green]")
+    Args:
+        scan: Runs discover_devices with the scan options already applied
+        cache: The discovery cache to read known devices from and record into
+        targets: The ranges being scanned
+        stop_after: Stop after finding this many devices
 
-            # Print detailed information tables
-            if show_details:
-                print_additional_device_info_table(child_devices)
+    Returns:
+        Tuple[List[Dict], Dict]: The devices that answered and the error statistics
+    """
+    known_ips = cache.known_ips(targets)
+    if not known_ips:
+        return [], {}
+    console.print(f"[yellow]Re-verifying {len(known_ips)} cached device(s)...[/yellow]")
+    devices, error_stats = await scan(
+        ip_ranges=[IpRange.from_string(ip) for ip in known_ips],
+        stop_after=stop_after,
+        prefilter=False
+    )
+    for device in devices:
+        cache.record(device)
+    return devices, error_stats
 
-            # Print the main child device table
-            print_child_device_table(child_devices)
 
-        except Exception as e:
-            console.print(f"[red]Error fetching child devices from hub at {ip_address}: {e!s}[/red]")
+async def sweep_unless_fresh(scan: Callable[..., Awaitable[Tuple[List[Dict[str, Any]], Dict[str, int]]]],
+                             cache: Optional[DiscoveryCache], targets: List[IpRange],
+                             found: List[Dict[str, Any]], stop_after: Optional[int] = None,
+                             rescan: bool = False, cache_max_age: float = DEFAULT_MAX_AGE,
+                             **sweep_options: Any) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Sweep ``targets`` for devices not already ``found``, unless there is no need to.
+
+    The sweep is skipped when ``found`` already reaches ``stop_after``, or when the
+    cache holds a fresh sweep of the targets and no rescan was requested. A sweep
+    that ran is recorded in the cache.
+
+    Args:
+        scan: Runs discover_devices with the scan options already applied
+        cache: The discovery cache, or None to always sweep without recording
+        targets: The ranges to sweep
+        found: Devices already found, which the sweep skips
+        stop_after: Stop after finding this many devices in total
+        rescan: Sweep even if the cached sweep is still fresh
+        cache_max_age: Seconds after which a cached sweep is considered stale
+        **sweep_options: Further discover_devices options, such as the pre-filter
+
+    Returns:
+        Tuple[List[Dict], Dict]: The devices the sweep found and its error statistics
+    """
+    remaining = None if stop_after is None else stop_after - len(found)
+    if remaining is not None and remaining <= 0:
+        console.print(f"[yellow]Reached target of {stop_after} devices from the cache[/yellow]")
+        return [], {}
+    if cache is not None and not rescan and not cache.is_stale(targets, cache_max_age):
+        console.print("[green]Cached sweep is still fresh, skipping the full scan (use --rescan to force one)[/green]")
+        return [], {}
+
+    new_devices, error_stats = await scan(
+        ip_ranges=targets,
+        stop_after=remaining,
+        exclude={device['ip_address'] for device in found},
+        **sweep_options
+    )
+    if cache is not None:
+        for device in new_devices:
+            cache.record(device)
+        if remaining is None:
+            cache.mark_swept(targets)
+    return new_devices, error_stats
+
+
+def save_discovery_cache(cache: DiscoveryCache) -> None:
+    """Write the discovery cache, warning instead of failing if it cannot be written."""
+    try:
+        cache.save()
+    except OSError as e:
+        console.print(f"[yellow]Warning: Could not write discovery cache {cache.path}: {e!s}[/yellow]")
+
+
+def print_scan_diagnostics(error_stats: Dict[str, int], tuner: Optional[AdaptiveTuner] = None,
+                           probe_logs: Optional[Dict[str, List[str]]] = None,
+                           verbose: bool = False) -> None:
+    """Print the tuning summary if there is a tuner, and with ``verbose`` the error and log tables."""
+    if tuner is not None:
+        print_tuning_summary(tuner)
+    if verbose:
+        print_error_stats(error_stats)
+    if probe_logs:
+        print_probe_logs(probe_logs)
+
+
+def print_tuning_summary(tuner: AdaptiveTuner) -> None:
+    """Report what adaptive tuning settled on so it can be pinned."""
+    summary = tuner.summary()
+    p50 = f"{summary['p50']:.3f}s" if summary['p50'] is not None else "n/a"
+    p99 = f"{summary['p99']:.3f}s" if summary['p99'] is not None else "n/a"
+    console.print(
+        f"[cyan]Adaptive tuning settled on --limit {summary['limit']} --timeout {summary['timeout']} "
+        f"(p50 {p50}, p99 {p99}, {summary['responses']} responses, "
+        f"{summary['timeouts']} timeouts, {summary['errors']} errors)[/cyan]"
+    )
+
+
+def print_error_stats(error_stats: Dict[str, int]) -> None:
+    """Print a table of the connection errors the scan ran into, if there were any."""
+    if sum(error_stats.values()) == 0:
+        return
+    console.print("\n[yellow]Connection Statistics:[/yellow]")
+
+    stats_table = Table(title="Network Scan Results")
+    stats_table.add_column("Error Type", style="yellow")
+    stats_table.add_column("Count", style="cyan")
+    stats_table.add_column("Description", style="green")
+
+    # Add rows for each error type that has occurrences
+    for error_type, count in error_stats.items():
+        if count > 0:
+            description = ERROR_DESCRIPTIONS.get(error_type, "Unknown error type")
+            stats_table.add_row(error_type, str(count), description)
+
+    console.print(stats_table)
+    console.print()  # Add a blank line for readability
+
+
+def print_probe_logs(probe_logs: Dict[str, List[str]]) -> None:
+    """Show what the library reported for the probes it was quiet about."""
+    logs_table = Table(title="Suppressed Library Messages")
+    logs_table.add_column("IP Address", style="cyan")
+    logs_table.add_column("Messages", style="yellow")
+    logs_table.add_column("Last Message", style="dim")
+    for ip, messages in probe_logs.items():
+        logs_table.add_row(ip, str(len(messages)), messages[-1])
+    console.print(logs_table)
+    console.print()
+
+
+def print_json_results(devices: List[Dict[str, Any]], error_stats: Dict[str, int],
+                       tuner: Optional[AdaptiveTuner], latency: Optional[LatencyProfile]) -> None:
+    """Print the discovery results, and the tuning and profile summaries if any, as JSON."""
+    output: Dict[str, Any] = {
+        'devices': devices,
+        'error_stats': error_stats
+    }
+    if tuner is not None:
+        output['tuning'] = tuner.summary()
+    if latency is not None:
+        output['profile'] = latency.summary()
+    # Extra fields may hold library enums, which are written as their names
+    print(json.dumps(output, indent=2, default=str))
+
+
+async def print_discovery_results(devices: List[Dict[str, Any]], reported: List[Dict[str, Any]],
+                                  client: ApiClient, show_children: bool = True,
+                                  hub_limit: int = DEFAULT_HUB_LIMIT,
+                                  hub_timeout: Optional[float] = DEFAULT_HUB_TIMEOUT) -> None:
+    """
+    Print the discovered devices not already ``reported``, then the children of any hubs.
+
+    Args:
+        devices: All devices the discovery found
+        reported: Devices that have been printed already
+        client: The Tapo ApiClient instance to fetch hub child devices with
+        show_children: Whether to show child devices for discovered hubs
+        hub_limit: Maximum number of hubs to fetch child devices from at once
+        hub_timeout: Maximum time in seconds to wait for one hub's child devices
+    """
+    if not devices:
+        console.print("[yellow]No devices found[/yellow]")
+        return
+
+    reported_ips = {device['ip_address'] for device in reported}
+    unreported = [device for device in devices if device['ip_address'] not in reported_ips]
+    if unreported:
+        print_device_table(unreported, title="Newly Discovered Tapo Devices" if reported else "Discovered Tapo Devices")
+
+    # Filter hub devices
+    hub_devices = [
+        device for device in devices
+        if 'HUB' in device.get('device_info', {}).get('type', '').upper()
+    ]
+
+    # Print child devices for each hub if requested
+    if show_children and hub_devices:
+        await print_hub_child_devices(hub_devices, client, limit=hub_limit, hub_timeout=hub_timeout)
 
 
 async def discover_main(subnet: Optional[str] = None,
-                       ip_range: Optional[Tuple[int, int]] = (1, 254),
-                       limit: int = 20,
-                       timeout: float = 0.5,
+                       ip_range: Optional[Tuple[int, int]] = None,
+                       limit: Union[int, str] = 20,
+                       timeout: Union[float, str] = 0.5,
                        stop_after: Optional[int] = None,
                        json_output: bool = False,
                        verbose: bool = False,
                        show_children: bool = True,
-                       custom_config: Optional[TapoConfig] = None) -> None:
+                       custom_config: Optional[TapoConfig] = None,
+                       ip_ranges: Optional[List[IpRange]] = None,
+                       prefilter: bool = True,
+                       prefilter_limit: int = 256,
+                       use_cache: bool = True,
+                       rescan: bool = False,
+                       cache_max_age: float = DEFAULT_MAX_AGE,
+                       hub_limit: int = DEFAULT_HUB_LIMIT,
+                       hub_timeout: float = DEFAULT_HUB_TIMEOUT,
+                       extra_fields: FrozenSet[str] = frozenset(),
+                       profile: bool = False) -> None:
     """
     Main discovery function.
     
     Args:
         subnet: Network subnet to scan (e.g. "192.168.1")
         ip_range: Range of IP addresses to scan (last octet), or None to use config
-        limit: Maximum number of concurrent probes (higher = faster scanning)
-        timeout: Timeout for each probe in seconds (lower = faster scanning)
+        limit: Maximum number of concurrent probes (higher = faster scanning), or "auto"
+        timeout: Timeout for each probe in seconds (lower = faster scanning), or "auto"
         stop_after: Stop scanning after finding this many devices
         json_output: Whether to output JSON instead of a table
         verbose: Whether to show verbose error output
         show_children: Whether to show child devices for discovered hubs
         custom_config: Optional pre-configured TapoConfig instance
+        ip_ranges: Arbitrary ranges/CIDRs to scan instead of subnet and ip_range
+        prefilter: Whether to run a fast TCP port sweep before the Tapo probe
+        prefilter_limit: Maximum number of concurrent port checks in the sweep
+        use_cache: Whether to re-verify cached devices first and skip fresh sweeps
+        rescan: Force a full sweep even if the cached sweep is still fresh
+        cache_max_age: Seconds after which a cached sweep is considered stale
+        hub_limit: Maximum number of hubs to fetch child devices from at once
+        hub_timeout: Maximum time in seconds to wait for one hub's child devices
+        extra_fields: Device info properties to report in addition to the standard ones
+        profile: Whether to time each probe stage per host and report the latencies
     """
+    latency = LatencyProfile() if profile else None
     try:
         # Get configuration
         if custom_config:
             config = custom_config
         else:
             console.print("[yellow]Loading configuration...[/yellow]")
-            config = TapoConfig.from_env()
+            config = get_config()
             console.print("[green]Configuration loaded successfully[/green]")
 
         # Initialize API client
         client = await create_tapo_protocol(config.username, config.password)
 
-        # Use configured IP range if available
-        if not subnet and not ip_range:
-            subnet, ip_range = config.get_discovery_params()
-
-        # Start discovery
-        devices, error_stats = await discover_devices(
+        # Use configured IP ranges if nothing more specific was requested
+        if not subnet and not ip_range and not ip_ranges:
+            ip_ranges = config.ip_ranges or None
+
+        targets = resolve_scan_targets(subnet, ip_range, ip_ranges)
+        tuner, probe_limit, probe_timeout = resolve_probe_settings(limit, timeout)
+        # Library messages suppressed during each probe, kept for verbose diagnostics
+        probe_logs: Optional[Dict[str, List[str]]] = {} if verbose else None
+        scan = functools.partial(
+            profiled_discover_devices,
+            latency,
             client=client,
-            subnet=subnet,
-            ip_range=ip_range,
-            limit=limit,
-            timeout_seconds=timeout,
-            stop_after=stop_after
+            limit=probe_limit,
+            timeout_seconds=probe_timeout,
+            probe_logs=probe_logs,
+            tuner=tuner,
+            extra_fields=extra_fields
         )
 
-        # Show verbose error statistics if requested
-        if verbose and sum(error_stats.values()) > 0:
-            console.print("\n[yellow]Connection Statistics:[/yellow]")
-
-            # Create a table for error stats
-            stats_table = Table(title="Network Scan Results")
-            stats_table.add_column("Error Type", style="yellow")
-            stats_table.add_column("Count", style="cyan")
-            stats_table.add_column("Description", style="green")
-
-            # Add error type descriptions
-            descriptions = {
-                'timeout': "Normal timeouts from non-responsive IPs",
-                'connection_refused': "Device refused connection (port closed)",
-                'network_unreachable': "Network segment unreachable",
-                'invalid_url': "Invalid URL format during connection",
-                'hash_mismatch': "Security hash mismatch (non-Tapo device)",
-                'cancelled': "Scan cancelled by early stop option",
-                'other': "Other connection errors"
-            }
-
-            # Add rows for each error type that has occurrences
-            for error_type, count in error_stats.items():
-                if count > 0:
-                    description = descriptions.get(error_type, "Unknown error type")
-                    stats_table.add_row(error_type, str(count), description)
-
-            console.print(stats_table)
-            console.print()  # Add a blank line for readability
+        # Re-verify devices remembered from earlier scans first
+        cache = DiscoveryCache.load() if use_cache else None
+        devices: List[Dict[str, Any]] = []
+        error_stats: Dict[str, int] = {}
+        reported: List[Dict[str, Any]] = []
+        if cache is not None:
+            devices, error_stats = await reverify_cached_devices(scan, cache, targets, stop_after)
+            if devices and not json_output:
+                print_device_table(devices, title="Known Tapo Devices (from cache)")
+                reported = list(devices)
+
+        new_devices, sweep_stats = await sweep_unless_fresh(
+            scan, cache, targets, devices,
+            stop_after=stop_after,
+            rescan=rescan,
+            cache_max_age=cache_max_age,
+            prefilter=prefilter,
+            prefilter_limit=prefilter_limit
+        )
+        devices.extend(new_devices)
+        for error_type, count in sweep_stats.items():
+            error_stats[error_type] = error_stats.get(error_type, 0) + count
+
+        if cache is not None:
+            save_discovery_cache(cache)
+
+        print_scan_diagnostics(error_stats, tuner if not json_output else None,
+                               probe_logs, verbose=verbose)
 
         # Output results
         if json_output:
-            # Convert devices to JSON
-            output = {
-                'devices': devices,
-                'error_stats': error_stats
-            }
-            print(json.dumps(output, indent=2))
-        else:
-            # Print formatted table
-            if devices:
-                print_device_table(devices)
-
-                # Filter hub devices
-                hub_devices = [
-                    device for device in devices
-                    if 'HUB' in device.get('device_info', {}).get('type', '').upper()
-                ]
-
-                # Print child devices for each hub if requested
-                if show_children and hub_devices:
-                    await print_hub_child_devices(hub_devices, client)
-            else:
-                console.print("[yellow]No devices found[/yellow]")
+            print_json_results(devices, error_stats, tuner, latency)
+            return
+
+        # Print formatted table, leaving out devices already shown from the cache
+        with use_profile(latency):
+            await print_discovery_results(devices, reported, client, show_children=show_children,
+                                          hub_limit=hub_limit, hub_timeout=hub_timeout)
+        if latency is not None:
+            console.print()
+            print_profile(latency.summary(), console)
 
     except Exception as e:
         console.print(f"[red]Error during device discovery: {e!s}[/red]")
@@ -247,10 +547,23 @@ def discover_cli():
                       help="Network subnet to scan (e.g. 192.168.1)")
     parser.add_argument("-r", "--range", type=str, default=None,
                       help="Range of IP addresses to scan, format: start-end (e.g. 1-254)")
-    parser.add_argument("-l", "--limit", type=int, default=20,
-                      help="Maximum number of concurrent network probes (default: 20)")
-    parser.add_argument("-t", "--timeout", type=float, default=0.5,
-                      help="Timeout for each probe in seconds (default: 0.5)")
+    parser.add_argument("-T", "--target", action="append", default=None,
+                      help="IPs, ranges or CIDRs to scan, comma-separated and repeatable "
+                           "(e.g. 10.0.0.0/22,192.168.5.10-192.168.5.20)")
+    parser.add_argument("-l", "--limit", type=limit_arg, default=20,
+                      help="Maximum number of concurrent network probes, or 'auto' to adapt it (default: 20)")
+    parser.add_argument("-t", "--timeout", type=timeout_arg, default=0.5,
+                      help="Timeout for each probe in seconds, or 'auto' to learn it from responses (default: 0.5)")
+    parser.add_argument("--sweep-limit", type=int, default=256,
+                      help="Maximum number of concurrent TCP port checks in the pre-filter sweep (default: 256)")
+    parser.add_argument("--no-prefilter", action="store_true",
+                      help="Probe every address with the Tapo protocol instead of sweeping the Tapo port first")
+    parser.add_argument("--no-cache", action="store_true",
+                      help="Ignore the discovery cache and always sweep the full range")
+    parser.add_argument("--rescan", action="store_true",
+                      help="Sweep the full range even if the cached sweep is still fresh")
+    parser.add_argument("--cache-max-age", type=float, default=DEFAULT_MAX_AGE / 3600,
+                      help="Hours after which a cached sweep is refreshed (default: 24)")
     parser.add_argument("-n", "--num-devices", type=int, default=None,
                       help="Stop after finding this many devices (default: scan entire range)")
     parser.add_argument("-j", "--json", action="store_true",
@@ -259,6 +572,15 @@ def discover_cli():
                       help="Show verbose error output")
     parser.add_argument("--no-children", action="store_true",
                       help="Skip fetching and displaying child devices from hubs")
+    parser.add_argument("--hub-limit", type=int, default=DEFAULT_HUB_LIMIT,
+                      help=f"Maximum number of hubs to fetch child devices from at once (default: {DEFAULT_HUB_LIMIT})")
+    parser.add_argument("--hub-timeout", type=float, default=DEFAULT_HUB_TIMEOUT,
+                      help=f"Seconds to wait for each hub's child devices (default: {DEFAULT_HUB_TIMEOUT:g})")
+    parser.add_argument("--profile", action="store_true",
+                      help="Time each probe stage (connect, handshake, device info, parsing) per host and show a latency summary")
+    parser.add_argument("--fields", type=device_fields_arg, default=frozenset(),
+                      help="Comma-separated device info fields to report in addition to the standard ones, "
+                           "e.g. fw_ver,on_time, or 'extended' for firmware, uptime and power protection data")
 
     args = parser.parse_args()
 
@@ -272,6 +594,14 @@ def discover_cli():
             console.print(f"[bold red]Invalid IP range format: {args.range}. Should be start-end (e.g. 1-254)[/bold red]")
             return
 
+    ip_ranges = None
+    if args.target:
+        try:
+            ip_ranges = [parsed for target in args.target for parsed in parse_ip_ranges(target)]
+        except ValueError as e:
+            console.print(f"[bold red]Invalid scan target: {e!s}[/bold red]")
+            return
+
     try:
         asyncio.run(discover_main(
             subnet=args.subnet,
@@ -281,7 +611,17 @@ def discover_cli():
             stop_after=args.num_devices,
             json_output=args.json,
             verbose=args.verbose,
-            show_children=not args.no_children
+            show_children=not args.no_children,
+            ip_ranges=ip_ranges,
+            prefilter=not args.no_prefilter,
+            prefilter_limit=args.sweep_limit,
+            use_cache=not args.no_cache,
+            rescan=args.rescan,
+            cache_max_age=args.cache_max_age * 3600,
+            hub_limit=args.hub_limit,
+            hub_timeout=args.hub_timeout,
+            extra_fields=args.fields,
+            profile=args.profile
         ))
     except KeyboardInterrupt:
         console.print("\n[bold yellow]Discovery stopped by user[/bold yellow]")
@@ -0,0 +1,100 @@
+"""On-disk cache of discovery results for Tapo Chatter.
+
+The cache remembers which addresses answered as Tapo devices on previous scans,
+so a later ``discover`` run can re-verify those addresses first and only sweep
+the full range again once its last sweep has gone stale.
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from platformdirs import user_cache_dir
+
+from .config import IpRange, merge_ip_ranges
+
+CACHE_FILENAME = "discovery_cache.json"
+CACHE_VERSION = 1
+
+# A full sweep of a range is repeated once the previous one is this old (seconds)
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+# Devices not seen for this long are dropped from the cache (seconds)
+DEFAULT_RETENTION = 30 * 24 * 60 * 60
+
+# Device info fields kept for each cached address
+CACHED_FIELDS = ('device_id', 'model', 'mac', 'nickname', 'type')
+
+
+def default_cache_path() -> Path:
+    """Return the discovery cache location under the user cache directory."""
+    return Path(user_cache_dir("tapo_chatter")) / CACHE_FILENAME
+
+
+def targets_key(ip_ranges: Iterable[IpRange]) -> str:
+    """Return a stable key identifying a set of scan targets."""
+    return ",".join(str(ip_range) for ip_range in merge_ip_ranges(ip_ranges))
+
+
+class DiscoveryCache:
+    """Known Tapo devices by IP address, plus when each target set was last swept."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or default_cache_path()
+        self.devices: Dict[str, Dict[str, Any]] = {}
+        self.sweeps: Dict[str, float] = {}
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> 'DiscoveryCache':
+        """Load the cache from disk; a missing or unreadable file gives an empty cache."""
+        cache = cls(path)
+        try:
+            with open(cache.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cache
+
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return cache
+        cache.devices = dict(data.get('devices', {}))
+        cache.sweeps = dict(data.get('sweeps', {}))
+        return cache
+
+    def save(self, retention: float = DEFAULT_RETENTION) -> None:
+        """Write the cache to disk atomically, dropping devices not seen within ``retention``."""
+        cutoff = time.time() - retention
+        self.devices = {
+            ip: entry for ip, entry in self.devices.items()
+            if entry.get('last_seen', 0) >= cutoff
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({'version': CACHE_VERSION, 'devices': self.devices, 'sweeps': self.sweeps}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def record(self, device_instance: Dict[str, Any]) -> None:
+        """Remember a device returned by discovery as seen now."""
+        device_info = device_instance.get('device_info', {})
+        entry = {name: device_info.get(name) for name in CACHED_FIELDS}
+        entry['last_seen'] = time.time()
+        self.devices[device_instance['ip_address']] = entry
+
+    def known_ips(self, ip_ranges: Optional[Iterable[IpRange]] = None) -> List[str]:
+        """Return cached device addresses, optionally only those inside ``ip_ranges``."""
+        ips = sorted(self.devices, key=lambda ip: tuple(int(part) for part in ip.split('.')))
+        if ip_ranges is None:
+            return ips
+        ranges = merge_ip_ranges(ip_ranges)
+        return [ip for ip in ips if any(ip in ip_range for ip_range in ranges)]
+
+    def mark_swept(self, ip_ranges: Iterable[IpRange]) -> None:
+        """Record that the given targets have just been swept in full."""
+        self.sweeps[targets_key(ip_ranges)] = time.time()
+
+    def is_stale(self, ip_ranges: Iterable[IpRange], max_age: float = DEFAULT_MAX_AGE) -> bool:
+        """Whether the given targets need a full sweep."""
+        swept_at = self.sweeps.get(targets_key(ip_ranges))
+        return swept_at is None or time.time() - swept_at >= max_age
@@ -0,0 +1,211 @@
+"""Change detection for Tapo hub child devices.
+
+``DeviceStateStore`` remembers the last known state of every child device,
+keyed by hub and ``device_id``, and turns each new ``get_child_devices``
+snapshot into the handful of ``DeviceEvent`` transitions it contains. Events
+are delivered to async subscribers, so consumers such as alerting or logging
+only see what changed instead of whole snapshots.
+"""
+import datetime
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .models import ChildDevice
+from .utils import console
+
+
+class EventType(str, Enum):
+    """The kinds of child device transitions that are reported."""
+    MOTION = "motion"
+    CONTACT = "contact"
+    STATUS = "status"
+    BATTERY = "battery"
+    RSSI_BAND = "rssi_band"
+    ADDED = "added"
+    REMOVED = "removed"
+
+
+@dataclass(frozen=True)
+class DeviceEvent:
+    """One state transition of a child device."""
+    type: EventType
+    hub: str
+    device_id: str
+    nickname: str
+    old: Any = None
+    new: Any = None
+    timestamp: datetime.datetime = field(default_factory=datetime.datetime.now)
+
+    def __str__(self) -> str:
+        if self.type in (EventType.ADDED, EventType.REMOVED):
+            return f"{self.nickname} ({self.device_id}) {self.type.value} on hub {self.hub}"
+        return f"{self.nickname} {self.type.value}: {self.old} -> {self.new}"
+
+
+Subscriber = Callable[[DeviceEvent], Awaitable[None]]
+
+
+def rssi_band(rssi: Any) -> Optional[str]:
+    """Classify an RSSI reading with the same thresholds the device table colours by."""
+    if not isinstance(rssi, (int, float)):
+        return None
+    if rssi == 0 or rssi > -65:
+        return "good"
+    if rssi > -75:
+        return "fair"
+    return "poor"
+
+
+def tracked_state(device: ChildDevice) -> Dict[EventType, Any]:
+    """Extract the values whose changes are reported from a child device."""
+    return {
+        EventType.MOTION: device.motion_status,
+        EventType.CONTACT: device.contact_status,
+        EventType.STATUS: "Online" if device.online else "Offline",
+        EventType.BATTERY: device.battery_state,
+        EventType.RSSI_BAND: rssi_band(device.rssi),
+    }
+
+
+# device_id -> (nickname, tracked state)
+DeviceStates = Dict[str, Tuple[str, Dict[EventType, Any]]]
+
+
+class SnapshotDiff:
+    """
+    The transitions in one snapshot of a hub, computed as its devices arrive.
+
+    States are stored device by device, so a snapshot that fails part way does
+    not report the same transitions again on the next poll. Removed devices are
+    only known once ``finish()`` confirms the whole snapshot was seen.
+    """
+
+    def __init__(self, states: Dict[str, DeviceStates], hub: str, timestamp: datetime.datetime) -> None:
+        self._states = states
+        self.hub = hub
+        self.timestamp = timestamp
+        # The first snapshot of a hub is only installed once complete
+        self.first_snapshot = hub not in states
+        self._current: DeviceStates = {} if self.first_snapshot else states[hub]
+        self._seen: Set[str] = set()
+
+    def add(self, devices: Iterable[ChildDevice]) -> List[DeviceEvent]:
+        """Diff the next devices of the snapshot and return their transitions."""
+        hub, timestamp = self.hub, self.timestamp
+        events: List[DeviceEvent] = []
+        for device in devices:
+            device_id = str(device.device_id)
+            nickname = str(device.nickname)
+            state = tracked_state(device)
+            previous = self._current.get(device_id)
+            self._current[device_id] = (nickname, state)
+            self._seen.add(device_id)
+            if self.first_snapshot:
+                continue
+
+            if previous is None:
+                events.append(DeviceEvent(EventType.ADDED, hub, device_id, nickname, timestamp=timestamp))
+                continue
+
+            old_state = previous[1]
+            for event_type, value in state.items():
+                if value is not None and value != old_state.get(event_type):
+                    events.append(DeviceEvent(event_type, hub, device_id, nickname,
+                                              old=old_state.get(event_type), new=value, timestamp=timestamp))
+        return events
+
+    def finish(self) -> List[DeviceEvent]:
+        """Complete the snapshot: forget devices it did not contain and return their removals."""
+        events = [
+            DeviceEvent(EventType.REMOVED, self.hub, device_id, self._current.pop(device_id)[0],
+                        timestamp=self.timestamp)
+            for device_id in self._current.keys() - self._seen
+        ]
+        self._states[self.hub] = self._current
+        return events
+
+
+class DeviceStateStore:
+    """Last known child device states, emitting events for what changes between snapshots."""
+
+    def __init__(self) -> None:
+        # hub -> device_id -> (nickname, tracked state)
+        self._devices: Dict[str, DeviceStates] = {}
+        self._subscribers: List[Subscriber] = []
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """Register an async callback for every event; returns a function that unsubscribes it."""
+        self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def begin_snapshot(self, hub: str, timestamp: Optional[datetime.datetime] = None) -> SnapshotDiff:
+        """Start diffing a new snapshot of ``hub`` whose devices arrive in parts."""
+        return SnapshotDiff(self._devices, hub, timestamp or datetime.datetime.now())
+
+    def diff(self, hub: str, devices: List[ChildDevice],
+             timestamp: Optional[datetime.datetime] = None) -> List[DeviceEvent]:
+        """
+        Compare a hub's new snapshot with the stored one and remember the new states.
+
+        The first snapshot of a hub only establishes the baseline and yields no events.
+        Events carry ``timestamp``, the time the snapshot was taken, defaulting to now.
+        """
+        snapshot = self.begin_snapshot(hub, timestamp)
+        events = snapshot.add(devices)
+        return events + snapshot.finish()
+
+    async def publish(self, events: List[DeviceEvent]) -> None:
+        """Deliver events in order to every subscriber; a failing subscriber does not stop the others."""
+        for event in events:
+            for callback in list(self._subscribers):
+                try:
+                    await callback(event)
+                except Exception as e:
+                    console.print(f"[yellow]Warning: Event subscriber failed on '{event}': {e!s}[/yellow]")
+
+    async def update(self, hub: str, devices: List[ChildDevice],
+                     timestamp: Optional[datetime.datetime] = None) -> List[DeviceEvent]:
+        """Diff a hub's new snapshot, publish the resulting events and return them."""
+        events = self.diff(hub, devices, timestamp)
+        if events:
+            await self.publish(events)
+        return events
+
+    async def update_pages(self, hub: str, pages: AsyncIterable[List[ChildDevice]],
+                           timestamp: Optional[datetime.datetime] = None
+                           ) -> Tuple[List[ChildDevice], List[DeviceEvent]]:
+        """
+        Diff a snapshot that arrives page by page, publishing each page's events as it is diffed.
+
+        Returns every device of the snapshot and all of its events.
+        """
+        snapshot = self.begin_snapshot(hub, timestamp)
+        devices: List[ChildDevice] = []
+        events: List[DeviceEvent] = []
+        async for page in pages:
+            page_events = snapshot.add(page)
+            devices.extend(page)
+            events.extend(page_events)
+            if page_events:
+                await self.publish(page_events)
+        removed = snapshot.finish()
+        if removed:
+            await self.publish(removed)
+        return devices, events + removed
@@ -0,0 +1,243 @@
+"""Local time-series history of child device readings for Tapo Chatter.
+
+Readings are appended to an SQLite database in WAL mode, one batched
+transaction per poll cycle. Rows are keyed by a small integer device id and a
+Unix timestamp in a ``WITHOUT ROWID`` table, so a device's readings are stored
+together and range queries by device and time are index lookups. Old readings
+are downsampled into fixed buckets and eventually dropped, which keeps the
+database bounded for large fleets.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from platformdirs import user_data_dir
+
+from .models import ChildDevice
+
+HISTORY_FILENAME = "history.sqlite3"
+
+# Readings older than this are dropped (seconds)
+DEFAULT_RETENTION = 90 * 24 * 60 * 60
+
+# Readings older than this are merged into DEFAULT_BUCKET-sized buckets (seconds)
+DEFAULT_DOWNSAMPLE_AFTER = 7 * 24 * 60 * 60
+DEFAULT_BUCKET = 15 * 60
+
+# How often a running monitor downsamples and prunes the history (seconds)
+DEFAULT_MAINTENANCE_INTERVAL = 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    device_id TEXT NOT NULL UNIQUE,
+    hub TEXT,
+    nickname TEXT,
+    device_type TEXT
+);
+CREATE TABLE IF NOT EXISTS readings (
+    device INTEGER NOT NULL REFERENCES devices(id),
+    ts INTEGER NOT NULL,
+    rssi REAL,
+    jamming_rssi REAL,
+    online REAL,
+    motion REAL,
+    contact REAL,
+    battery_low REAL,
+    samples INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (device, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS readings_ts ON readings (ts);
+"""
+
+# Reading columns that are averaged (weighted by samples) when downsampling
+_VALUE_COLUMNS = ('rssi', 'jamming_rssi', 'online', 'motion', 'contact', 'battery_low')
+
+
+def default_history_path() -> Path:
+    """Return the history database location under the user data directory."""
+    return Path(user_data_dir("tapo_chatter")) / HISTORY_FILENAME
+
+
+@dataclass(frozen=True)
+class Reading:
+    """One stored reading; downsampled rows hold bucket averages over ``samples`` readings."""
+    device_id: str
+    ts: int
+    rssi: Optional[float]
+    jamming_rssi: Optional[float]
+    online: Optional[float]
+    motion: Optional[float]
+    contact: Optional[float]
+    battery_low: Optional[float]
+    samples: int
+
+
+def _flag(value: Optional[bool]) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+def reading_values(device: ChildDevice) -> Dict[str, Optional[float]]:
+    """Extract the stored values from a child device."""
+    return {
+        'rssi': device.rssi,
+        'jamming_rssi': device.jamming_rssi,
+        'online': 1 if device.online else 0,
+        'motion': _flag(device.motion_detected),
+        'contact': _flag(device.contact_open),
+        'battery_low': _flag(device.battery_low),
+    }
+
+
+class HistoryStore:
+    """Append-only SQLite history of child device readings."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path is not None else default_history_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Writes run in a worker thread so the poll loop never waits on the disk
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        # device_id -> (integer key, (hub, nickname, device type))
+        self._devices: Dict[str, Tuple[int, Tuple[Any, ...]]] = {}
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            for key, device_id, *details in self._conn.execute(
+                    "SELECT id, device_id, hub, nickname, device_type FROM devices"):
+                self._devices[device_id] = (key, tuple(details))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _device_key(self, hub: str, device: ChildDevice) -> int:
+        """Return the integer key for a device, registering or updating its details."""
+        device_id = str(device.device_id)
+        details = (hub, device.nickname, device.device_type)
+        known = self._devices.get(device_id)
+        if known is not None and known[1] == details:
+            return known[0]
+
+        self._conn.execute(
+            "INSERT INTO devices (device_id, hub, nickname, device_type) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(device_id) DO UPDATE SET hub=excluded.hub, nickname=excluded.nickname, "
+            "device_type=excluded.device_type",
+            (device_id, *details),
+        )
+        key = known[0] if known is not None else \
+            self._conn.execute("SELECT id FROM devices WHERE device_id = ?", (device_id,)).fetchone()[0]
+        self._devices[device_id] = (key, details)
+        return key
+
+    def record(self, hub: str, devices: List[ChildDevice], ts: Optional[float] = None) -> int:
+        """
+        Store one poll cycle's readings in a single transaction.
+
+        Args:
+            hub: The hub the devices were read from
+            devices: Child devices as returned by ``get_child_devices``
+            ts: Unix time of the poll, defaulting to now
+
+        Returns:
+            int: The number of readings written
+        """
+        if not devices:
+            return 0
+        timestamp = int(ts if ts is not None else time.time())
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                rows = []
+                for device in devices:
+                    values = reading_values(device)
+                    rows.append((self._device_key(hub, device), timestamp,
+                                 *(values[column] for column in _VALUE_COLUMNS)))
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO readings (device, ts, {', '.join(_VALUE_COLUMNS)}) "
+                    f"VALUES (?, ?, {', '.join('?' for _ in _VALUE_COLUMNS)})",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                # Devices registered in the rolled back transaction are gone again
+                self._devices.clear()
+                raise
+        return len(rows)
+
+    async def append(self, hub: str, devices: List[ChildDevice], ts: Optional[float] = None) -> int:
+        """Store one poll cycle's readings from a worker thread."""
+        return await asyncio.to_thread(self.record, hub, devices, ts)
+
+    def query(self, device_id: str, start: Optional[float] = None, end: Optional[float] = None) -> List[Reading]:
+        """Return a device's readings between ``start`` and ``end`` (Unix times, inclusive), oldest first."""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT ts, {', '.join(_VALUE_COLUMNS)}, samples FROM readings "
+                "WHERE device = (SELECT id FROM devices WHERE device_id = ?) AND ts BETWEEN ? AND ? "
+                "ORDER BY ts",
+                (device_id, int(start) if start is not None else 0,
+                 int(end) if end is not None else 2**62),
+            )
+            return [Reading(device_id, *row) for row in cursor]
+
+    def downsample(self, older_than: float = DEFAULT_DOWNSAMPLE_AFTER, bucket: int = DEFAULT_BUCKET,
+                   now: Optional[float] = None) -> int:
+        """
+        Merge readings older than ``older_than`` seconds into ``bucket``-second averages.
+
+        Returns:
+            int: The number of rows removed by merging
+        """
+        cutoff = int((now if now is not None else time.time()) - older_than)
+        averages = ", ".join(
+            f"SUM({column} * samples) / NULLIF(SUM(CASE WHEN {column} IS NULL THEN 0 ELSE samples END), 0)"
+            for column in _VALUE_COLUMNS
+        )
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                before = self._conn.execute("SELECT COUNT(*) FROM readings WHERE ts < ?", (cutoff,)).fetchone()[0]
+                self._conn.execute(
+                    f"CREATE TEMP TABLE merged AS SELECT device, (ts / ?) * ? AS ts, {averages}, "
+                    "SUM(samples) AS samples FROM readings WHERE ts < ? GROUP BY device, ts / ?",
+                    (bucket, bucket, cutoff, bucket),
+                )
+                self._conn.execute("DELETE FROM readings WHERE ts < ?", (cutoff,))
+                self._conn.execute("INSERT INTO readings SELECT * FROM merged")
+                self._conn.execute("DROP TABLE merged")
+                after = self._conn.execute("SELECT COUNT(*) FROM readings WHERE ts < ?", (cutoff,)).fetchone()[0]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return before - after
+
+    def prune(self, retention: float = DEFAULT_RETENTION, now: Optional[float] = None) -> int:
+        """Drop readings older than ``retention`` seconds; returns the number removed."""
+        cutoff = int((now if now is not None else time.time()) - retention)
+        with self._lock:
+            return self._conn.execute("DELETE FROM readings WHERE ts < ?", (cutoff,)).rowcount
+
+    def maintain(self, retention: float = DEFAULT_RETENTION, downsample_after: float = DEFAULT_DOWNSAMPLE_AFTER,
+                 bucket: int = DEFAULT_BUCKET) -> None:
+        """Apply retention and downsampling, then let SQLite reuse the freed pages."""
+        now = time.time()
+        self.prune(retention, now=now)
+        self.downsample(downsample_after, bucket, now=now)
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA optimize")
+
+    async def run_maintenance(self, interval: float = DEFAULT_MAINTENANCE_INTERVAL, **kwargs: Any) -> None:
+        """Run ``maintain`` in a worker thread every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.to_thread(self.maintain, **kwargs)
+            await asyncio.sleep(interval)
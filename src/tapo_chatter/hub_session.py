@@ -0,0 +1,132 @@
+"""Persistent H100 hub sessions for Tapo Chatter.
+
+Authenticating with a hub (the login/KLAP handshake) is far more expensive than
+the request that follows it. A ``HubSession`` keeps the authenticated handler
+returned by ``ApiClient.h100()`` alive across monitor refreshes and only
+re-authenticates when the session has aged out or a request on it fails.
+"""
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from tapo import ApiClient
+
+from .profiling import CHILD_DEVICES, HANDSHAKE, timed
+
+# Hubs expire their sessions on their own schedule; re-authenticate well before
+# that so a refresh rarely has to fail first to find out.
+DEFAULT_SESSION_MAX_AGE = 60 * 60
+
+# Children a hub returns per child_device_list page
+CHILD_PAGE_SIZE = 10
+
+
+class HubSession:
+    """A long-lived, lazily authenticated connection to a single H100 hub."""
+
+    def __init__(self, client: ApiClient, host: str,
+                 max_age: Optional[float] = DEFAULT_SESSION_MAX_AGE) -> None:
+        """
+        Args:
+            client: The Tapo ApiClient instance used to authenticate
+            host: IP address of the hub
+            max_age: Seconds after which the session is re-established, or None
+                to keep it until a request fails
+        """
+        self.client = client
+        self.host = host
+        self.max_age = max_age
+        self.handshakes = 0
+        self.handshakes_avoided = 0
+        self._hub: Optional[Any] = None
+        self._authenticated_at = 0.0
+
+    @property
+    def is_authenticated(self) -> bool:
+        """Whether a hub handler is currently held."""
+        return self._hub is not None
+
+    @property
+    def is_expired(self) -> bool:
+        """Whether the held session is older than ``max_age``."""
+        if self._hub is None:
+            return True
+        if self.max_age is None:
+            return False
+        return time.monotonic() - self._authenticated_at >= self.max_age
+
+    def invalidate(self) -> None:
+        """Drop the held session so the next request re-authenticates."""
+        self._hub = None
+
+    async def get_hub(self) -> Any:
+        """Return the authenticated hub handler, performing a handshake only if needed."""
+        if not self.is_expired:
+            self.handshakes_avoided += 1
+            return self._hub
+
+        with timed(HANDSHAKE, self.host):
+            self._hub = await self.client.h100(self.host)
+        self._authenticated_at = time.monotonic()
+        self.handshakes += 1
+        return self._hub
+
+    async def _request(self, request: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Run ``request`` on the hub handler over the persistent session.
+
+        If the request fails on a reused session, the session is assumed to have
+        been dropped by the hub; it is re-established once and the request retried.
+        """
+        reused = not self.is_expired
+        hub = await self.get_hub()
+        try:
+            with timed(CHILD_DEVICES, self.host):
+                return await request(hub)
+        except Exception:
+            self.invalidate()
+            if not reused:
+                raise
+            # The handshake we counted as avoided was not avoided after all
+            self.handshakes_avoided -= 1
+
+        hub = await self.get_hub()
+        try:
+            with timed(CHILD_DEVICES, self.host):
+                return await request(hub)
+        except Exception:
+            self.invalidate()
+            raise
+
+    async def get_child_device_list(self) -> Any:
+        """Fetch the hub's whole child device list over the persistent session."""
+        return await self._request(lambda hub: hub.get_child_device_list())
+
+    async def iter_child_device_pages(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Fetch the hub's child device list one page at a time.
+
+        Yields each page's raw child entries as soon as it arrives, so callers
+        can process a page while the next one is requested. Each page request
+        is retried like ``get_child_device_list()``.
+        """
+        start = 0
+        while True:
+            page = await self._request(lambda hub, start=start: hub.get_child_device_list_json(start))
+            children = page.get('child_device_list') or []
+            if not children:
+                return
+            yield children
+            start += len(children)
+            total = page.get('sum')
+            if total is not None and start >= total:
+                return
+            if total is None and len(children) < CHILD_PAGE_SIZE:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Return handshake counters for display or diagnostics."""
+        return {
+            'host': self.host,
+            'handshakes': self.handshakes,
+            'handshakes_avoided': self.handshakes_avoided,
+        }
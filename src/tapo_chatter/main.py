@@ -1,26 +1,64 @@
 """Main module for Tapo Chatter."""
 import asyncio
 import datetime  # Added for timestamp conversion
-import os  # Added for clearing screen
-from typing import Any, Dict, List, Optional
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
 
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
 from rich.panel import Panel
 from rich.table import Table
 from tapo import ApiClient
 
-from .config import TapoConfig
-from .utils import check_host_connectivity
+from .config import (
+    CONFIG_CHECK_INTERVAL,
+    TapoConfig,
+    get_config,
+    reload_config_if_changed,
+)
+from .events import DeviceEvent, DeviceStateStore
+from .history import HistoryStore
+from .hub_session import HubSession
+from .models import MISSING, ChildDevice
+from .profiling import (
+    CHILD_DEVICES,
+    HANDSHAKE,
+    PARSE,
+    LatencyProfile,
+    print_profile,
+    timed,
+    use_profile,
+)
+from .scheduling import DEFAULT_MAX_INTERVAL, AdaptiveCadence, FixedRateSchedule
+from .utils import ConnectivityCheck, check_host_connectivity
 
 console = Console()
 
 
-async def get_child_devices(client: ApiClient, host: str) -> List[Dict[str, Any]]:
-    """Get all child devices from the H100 hub."""
+async def get_child_devices(client: ApiClient, host: str,
+                            session: Optional[HubSession] = None,
+                            quiet: bool = False,
+                            check_connectivity: Optional[ConnectivityCheck] = None) -> List[ChildDevice]:
+    """
+    Get all child devices from the H100 hub.
+
+    When a ``session`` is given, its persistent hub connection is reused instead of
+    performing a fresh handshake with ``client.h100()`` on every call.
+
+    When ``quiet``, no progress is printed and failures are raised instead of
+    reported, for callers that keep their own display on screen.
+
+    ``check_connectivity`` replaces ``check_host_connectivity`` for the
+    reachability check.
+    """
+    log = (lambda *args: None) if quiet else console.print
     try:
         # First check if we can reach the host
-        console.print(f"[yellow]Checking connectivity to {host}...[/yellow]")
-        if not await check_host_connectivity(host):
+        log(f"[yellow]Checking connectivity to {host}...[/yellow]")
+        if not await (check_connectivity or check_host_connectivity)(host):
+            if quiet:
+                raise ConnectionError(f"Cannot reach host {host}")
             console.print(f"[red]Error: Cannot reach host {host}. Please check:[/red]")
             console.print("  • The device is powered on")
             console.print("  • You are on the same network as the device")
@@ -28,16 +66,23 @@ async def get_child_devices(client: ApiClient, host: str) -> List[Dict[str, Any]
             console.print("  • No firewall is blocking the connection")
             return []
 
-        console.print(f"[green]Successfully connected to {host}[/green]")
+        log(f"[green]Successfully connected to {host}[/green]")
 
-        # Get the hub device first
-        console.print("[yellow]Attempting to initialize H100 hub...[/yellow]")
-        hub = await client.h100(host)
-        console.print("[green]Successfully initialized H100 hub[/green]")
+        if session is not None:
+            # Reuse the long-lived hub session; it re-authenticates only when needed
+            log("[yellow]Fetching child devices...[/yellow]")
+            result = await session.get_child_device_list()
+        else:
+            # Get the hub device first
+            log("[yellow]Attempting to initialize H100 hub...[/yellow]")
+            with timed(HANDSHAKE, host):
+                hub = await client.h100(host)
+            log("[green]Successfully initialized H100 hub[/green]")
 
-        # Then get the child devices
-        console.print("[yellow]Fetching child devices...[/yellow]")
-        result = await hub.get_child_device_list()
+            # Then get the child devices
+            log("[yellow]Fetching child devices...[/yellow]")
+            with timed(CHILD_DEVICES, host):
+                result = await hub.get_child_device_list()
 
         # Debug the raw result - COMMENTED OUT
         # console.print(Panel(
@@ -48,101 +93,10 @@ async def get_child_devices(client: ApiClient, host: str) -> List[Dict[str, Any]
         #     border_style="blue"
         # ))
 
-        processed_devices: List[Dict[str, Any]] = []
+        processed_devices: List[ChildDevice] = []
         if isinstance(result, list):
-            for i, device_obj in enumerate(result):
-                device_dict: Dict[str, Any] = {}
-
-                device_dict["nickname"] = getattr(device_obj, 'nickname', "Unknown")
-                device_dict["device_id"] = getattr(device_obj, 'device_id', "Unknown")
-
-                if hasattr(device_obj, 'device_type'):
-                    device_dict["device_type"] = getattr(device_obj, 'device_type', "Unknown")
-                elif hasattr(device_obj, 'type'):
-                    device_dict["device_type"] = getattr(device_obj, 'type', "Unknown")
-                else:
-                    device_dict["device_type"] = "Unknown"
-
-                # The print_device_table function expects 'status' to be 1 for Online.
-                # We need to see what attribute on device_obj represents this.
-                # Common names: 'status', 'online'. Let's assume 'status' for now.
-                # If 'status' is boolean True for online, it also needs conversion.
-                # For now, assuming it's already 0 or 1 as print_device_table expects.
-                raw_status = getattr(device_obj, 'status', 0)
-
-                current_status_val = 0 # Default to Offline
-                if raw_status is not None:
-                    # Check common ways an 'online' status might be represented
-                    status_name = getattr(raw_status, 'name', '').lower() # For enums with .name
-                    status_value = getattr(raw_status, 'value', None) # For enums with .value
-                    status_str = str(raw_status).lower() # For string comparison
-
-                    if 'online' in status_name: # e.g., Status.Online.name == 'Online'
-                        current_status_val = 1
-                    elif status_value == 1: # e.g., Status.Online.value == 1
-                        current_status_val = 1
-                    elif 'online' in status_str: # e.g., str(Status.Online) is "Status.Online" or "online"
-                        current_status_val = 1
-                    elif isinstance(raw_status, bool) and raw_status is True: # if it's a boolean True
-                        current_status_val = 1
-                    elif raw_status == 1: # if it's already the integer 1
-                        current_status_val = 1
-                device_dict["status"] = current_status_val
-
-
-                params: Dict[str, Any] = {}
-                device_data_from_to_dict = {}
-
-                if hasattr(device_obj, 'to_dict') and callable(device_obj.to_dict):
-                    try:
-                        device_data_from_to_dict = device_obj.to_dict() # type: ignore[attr-defined]
-                    except Exception:  # pylint: disable=broad-except
-                        # If to_dict fails, params will remain empty for this device
-                        pass
-
-                if isinstance(device_data_from_to_dict, dict):
-                    # Battery status from 'at_low_battery'
-                    at_low_battery = device_data_from_to_dict.get('at_low_battery')
-                    if isinstance(at_low_battery, bool):
-                        # device_dict['battery_state'] = "Low" if at_low_battery else "OK" # No longer direct
-                        params['battery_state'] = "Low" if at_low_battery else "OK" # Back to params
-
-                    # Motion sensor status from 'detected'
-                    detected = device_data_from_to_dict.get('detected')
-                    if isinstance(detected, bool):
-                        params['motion_status'] = "Detected" if detected else "Clear"
-
-                    # Contact sensor status from 'open'
-                    is_open = device_data_from_to_dict.get('open')
-                    if isinstance(is_open, bool):
-                        params['contact_status'] = "Open" if is_open else "Closed"
-
-                    # RSSI (Signal Strength)
-                    rssi_value = device_data_from_to_dict.get('rssi')
-                    # if rssi_value is not None:
-                    #     device_dict['rssi'] = str(rssi_value) # Store directly in device_dict
-                    # else:
-                    #     device_dict['rssi'] = "N/A"
-                    device_dict['rssi'] = rssi_value if isinstance(rssi_value, (int, float)) else "N/A"
-
-                    # Additional device info for the new table (remains in params)
-                    params['hw_ver'] = str(device_data_from_to_dict.get('hw_ver', "N/A"))
-                    # params['jamming_rssi'] = str(device_data_from_to_dict.get('jamming_rssi', "N/A"))
-                    jamming_rssi_val = device_data_from_to_dict.get('jamming_rssi')
-                    params['jamming_rssi'] = jamming_rssi_val if isinstance(jamming_rssi_val, (int, float)) else "N/A"
-
-                    last_onboard_ts = device_data_from_to_dict.get('lastOnboardingTimestamp')
-                    if isinstance(last_onboard_ts, (int, float)):
-                        params['last_onboarded'] = datetime.datetime.fromtimestamp(last_onboard_ts).strftime('%Y-%m-%d %H:%M:%S')
-                    else:
-                        params['last_onboarded'] = "N/A"
-                    params['mac'] = str(device_data_from_to_dict.get('mac', "N/A"))
-                    params['region'] = str(device_data_from_to_dict.get('region', "N/A"))
-                    params['report_interval'] = str(device_data_from_to_dict.get('report_interval', "N/A"))
-                    params['signal_level'] = str(device_data_from_to_dict.get('signal_level', "N/A"))
-
-                device_dict["params"] = params
-                processed_devices.append(device_dict)
+            with timed(PARSE, host):
+                processed_devices = [ChildDevice.from_api(device_obj) for device_obj in result]
 
         # Show the extracted data structure - COMMENTED OUT
         # console.print(Panel(
@@ -151,10 +105,12 @@ async def get_child_devices(client: ApiClient, host: str) -> List[Dict[str, Any]
         #     border_style="blue"
         # ))
 
-        console.print(f"[green]Successfully retrieved {len(processed_devices)} child devices[/green]")
+        log(f"[green]Successfully retrieved {len(processed_devices)} child devices[/green]")
         return processed_devices
 
     except Exception as e:
+        if quiet:
+            raise
         console.print(Panel(
             f"[red]Error getting child devices: {e!s}[/red]\n\n"
             "[yellow]This could be due to:[/yellow]\n"
@@ -168,12 +124,30 @@ async def get_child_devices(client: ApiClient, host: str) -> List[Dict[str, Any]
         return []
 
 
-def print_additional_device_info_table(devices: List[Dict[str, Any]]) -> None:
-    """Print a table of additional device information."""
-    if not devices:
-        # No need to print "No devices found" here, main table will handle it
-        return
+async def iter_child_devices(client: ApiClient, host: str,
+                             session: Optional[HubSession] = None,
+                             check_connectivity: Optional[ConnectivityCheck] = None
+                             ) -> AsyncIterator[List[ChildDevice]]:
+    """
+    Yield a hub's child devices page by page, as each page is fetched and parsed.
+
+    Unlike ``get_child_devices()``, the whole list is never held at once, so a
+    caller can render or diff the first children while later pages are still
+    being requested. Failures are raised; nothing is printed.
+    """
+    if not await (check_connectivity or check_host_connectivity)(host):
+        raise ConnectionError(f"Cannot reach host {host}")
+    if session is None:
+        session = HubSession(client, host)
+
+    async for page in session.iter_child_device_pages():
+        with timed(PARSE, host):
+            devices = [ChildDevice.from_json(entry) for entry in page]
+        yield devices
 
+
+def new_additional_device_info_table() -> Table:
+    """Create the empty "Additional Device Information" table."""
     table = Table(title="Additional Device Information")
     table.add_column("Device Name", style="cyan")
     table.add_column("HW Ver", style="green")
@@ -184,43 +158,57 @@ def print_additional_device_info_table(devices: List[Dict[str, Any]]) -> None:
     table.add_column("Jamming RSSI", style="red")
     table.add_column("Report Int (s)", style="green")
     table.add_column("Last Onboarded", style="blue")
+    return table
+
+
+def _display(value: Any) -> str:
+    """Render an optional value for a table cell."""
+    return MISSING if value is None else str(value)
+
+
+def additional_device_info_row(device: ChildDevice) -> Tuple[str, ...]:
+    """Format one device's row of the additional device information table."""
+    jamming_rssi_val = device.jamming_rssi
+    jamming_rssi_display = MISSING
+    if jamming_rssi_val is not None:
+        if jamming_rssi_val == 0: # Assuming 0 means no jamming or very low
+            jamming_rssi_display = f"[green]{jamming_rssi_val}[/green]"
+        elif jamming_rssi_val < -79: # Threshold for very low jamming
+            jamming_rssi_display = f"[green]{jamming_rssi_val}[/green]"
+        elif jamming_rssi_val < -69: # Threshold for moderate jamming
+            jamming_rssi_display = f"[yellow]{jamming_rssi_val}[/yellow]"
+        else: # Higher jamming
+            jamming_rssi_display = f"[red]{jamming_rssi_val}[/red]"
+
+    last_onboarded = device.last_onboarded
+    return (
+        device.nickname,
+        _display(device.hw_ver),
+        _display(device.mac),
+        _display(device.region),
+        _display(device.signal_level),
+        _display(device.battery_state),
+        jamming_rssi_display,
+        _display(device.report_interval),
+        last_onboarded.strftime('%Y-%m-%d %H:%M:%S') if last_onboarded is not None else MISSING,
+    )
+
+
+def print_additional_device_info_table(devices: List[ChildDevice]) -> None:
+    """Print a table of additional device information."""
+    if not devices:
+        # No need to print "No devices found" here, main table will handle it
+        return
 
+    table = new_additional_device_info_table()
     for device in devices:
-        device_params = device.get('params', {})
-
-        jamming_rssi_val = device_params.get('jamming_rssi', "N/A")
-        jamming_rssi_display = str(jamming_rssi_val)
-        if isinstance(jamming_rssi_val, (int, float)):
-            if jamming_rssi_val == 0: # Assuming 0 means no jamming or very low
-                jamming_rssi_display = f"[green]{jamming_rssi_val}[/green]"
-            elif jamming_rssi_val < -79: # Threshold for very low jamming
-                jamming_rssi_display = f"[green]{jamming_rssi_val}[/green]"
-            elif jamming_rssi_val < -69: # Threshold for moderate jamming
-                jamming_rssi_display = f"[yellow]{jamming_rssi_val}[/yellow]"
-            else: # Higher jamming
-                jamming_rssi_display = f"[red]{jamming_rssi_val}[/red]"
-
-        table.add_row(
-            device.get("nickname", "Unknown"),
-            device_params.get('hw_ver', "N/A"),
-            device_params.get('mac', "N/A"),
-            device_params.get('region', "N/A"),
-            device_params.get('signal_level', "N/A"),
-            device_params.get('battery_state', "N/A"), # Correctly add battery_state here
-            jamming_rssi_display,
-            device_params.get('report_interval', "N/A"),
-            device_params.get('last_onboarded', "N/A"),
-        )
+        table.add_row(*additional_device_info_row(device))
     console.print(table)
     console.print() # Add a blank line for spacing before the next table
 
 
-def print_device_table(devices: List[Dict[str, Any]]) -> None:
-    """Print a formatted table of devices."""
-    if not devices:
-        console.print("[yellow]No devices found[/yellow]")
-        return
-
+def new_device_table() -> Table:
+    """Create the empty child device table."""
     table = Table(title="Tapo H100 Child Devices")
 
     # Add columns
@@ -230,91 +218,348 @@ def print_device_table(devices: List[Dict[str, Any]]) -> None:
     table.add_column("Status", style="yellow")
     table.add_column("RSSI", style="magenta")
     table.add_column("Details", style="blue")
+    return table
+
+
+def rssi_markup(rssi_val: Optional[int]) -> str:
+    """Color a signal strength reading by how good it is."""
+    if rssi_val is None:
+        return MISSING
+    if rssi_val == 0: # Assuming 0 is a very strong signal
+        return f"[green]{rssi_val}[/green]"
+    if rssi_val > -65:
+        return f"[green]{rssi_val}[/green]"
+    if rssi_val > -75:
+        return f"[yellow]{rssi_val}[/yellow]"
+    return f"[red]{rssi_val}[/red]"
+
+
+def device_table_row(device: ChildDevice) -> Tuple[str, ...]:
+    """Format one device's row of the child device table."""
+    # Extract additional details if available
+    details = []
+
+    # Standard sensor data (if present) - Temperature/Humidity remain in details
+    if device.temperature is not None:
+        details.append(f"Temp: {device.temperature}°C")
+    if device.humidity is not None:
+        details.append(f"Humidity: {device.humidity}%")
+
+    # Sensor states - Battery and RSSI have their own columns
+    if device.motion_status is not None:
+        motion_text = f"Motion: {device.motion_status}"
+        if device.motion_detected:
+            details.append(f"[bold red]{motion_text}[/bold red]")
+        else:
+            details.append(motion_text)
+    if device.contact_status is not None:
+        contact_text = f"Contact: {device.contact_status}"
+        if device.contact_open:
+            details.append(f"[bold red]{contact_text}[/bold red]")
+        else:
+            details.append(contact_text)
+
+    return (
+        device.nickname,
+        device.device_id,
+        device.device_type,
+        "Online" if device.online else "Offline",
+        rssi_markup(device.rssi),
+        ", ".join(details) if details else "No specific sensor info"
+    )
+
+
+def print_device_table(devices: List[ChildDevice]) -> None:
+    """Print a formatted table of devices."""
+    if not devices:
+        console.print("[yellow]No devices found[/yellow]")
+        return
 
-    # Add rows
+    table = new_device_table()
     for device in devices:
-        # Extract additional details if available
-        details = []
-        device_params = device.get('params', {})
-
-        if isinstance(device_params, dict):
-            # Standard sensor data (if present) - Temperature/Humidity remain in details
-            if "temperature" in device_params:
-                details.append(f"Temp: {device_params['temperature']}°C")
-            if "humidity" in device_params:
-                details.append(f"Humidity: {device_params['humidity']}%")
-
-            # Parsed status based on to_dict() data - Battery and RSSI removed from here
-            if "motion_status" in device_params:
-                motion_text = f"Motion: {device_params['motion_status']}"
-                if device_params['motion_status'] == "Detected":
-                    details.append(f"[bold red]{motion_text}[/bold red]")
-                else:
-                    details.append(motion_text)
-            if "contact_status" in device_params:
-                contact_text = f"Contact: {device_params['contact_status']}"
-                if device_params['contact_status'] == "Open":
-                    details.append(f"[bold red]{contact_text}[/bold red]")
-                else:
-                    details.append(contact_text)
-
-        rssi_val = device.get('rssi', "N/A")
-        rssi_display = str(rssi_val)
-        if isinstance(rssi_val, (int, float)):
-            if rssi_val == 0: # Assuming 0 is a very strong signal
-                rssi_display = f"[green]{rssi_val}[/green]"
-            elif rssi_val > -65:
-                rssi_display = f"[green]{rssi_val}[/green]"
-            elif rssi_val > -75:
-                rssi_display = f"[yellow]{rssi_val}[/yellow]"
-            else:
-                rssi_display = f"[red]{rssi_val}[/red]"
-
-        table.add_row(
-            device.get("nickname", "Unknown"),
-            device.get("device_id", "Unknown"),
-            device.get("device_type", "Unknown"),
-            "Online" if device.get("status", 0) == 1 else "Offline",
-            rssi_display,    # Colored RSSI
-            ", ".join(details) if details else "No specific sensor info"
-        )
-
+        table.add_row(*device_table_row(device))
     console.print(table)
 
 
-async def main(refresh_interval: int = 10, config: Optional[TapoConfig] = None) -> None:
-    """Main entry point."""
+# Pause after a hub reports before redrawing, so hubs finishing together share one redraw
+RENDER_DEBOUNCE = 0.1
+
+
+@dataclass
+class HubState:
+    """The latest poll result for one monitored hub."""
+    host: str
+    session: HubSession
+    devices: List[ChildDevice] = field(default_factory=list)
+    updated_at: Optional[datetime.datetime] = None
+    changed_at: Optional[datetime.datetime] = None
+    error: Optional[str] = None
+    # Poll deadlines skipped because the previous poll was still in flight
+    missed_polls: int = 0
+    # Seconds until the next poll; varies with an adaptive cadence
+    poll_interval: Optional[float] = None
+
+
+async def fetch_snapshot(client: ApiClient, state: HubState, store: Optional[DeviceStateStore],
+                         timestamp: datetime.datetime, paged: bool = False,
+                         check_connectivity: Optional[ConnectivityCheck] = None
+                         ) -> Tuple[List[ChildDevice], Optional[List[DeviceEvent]]]:
+    """
+    Fetch a hub's current child devices without printing anything.
+
+    When ``paged``, the list is fetched page by page and, with a ``store``, each
+    page is diffed into it as it arrives. Returns the devices and the events
+    published while fetching, or None if the snapshot was not diffed yet.
+    """
+    if not paged:
+        devices = await get_child_devices(client, state.host, session=state.session, quiet=True,
+                                          check_connectivity=check_connectivity)
+        return devices, None
+    pages = iter_child_devices(client, state.host, session=state.session, check_connectivity=check_connectivity)
+    if store is not None:
+        return await store.update_pages(state.host, pages, timestamp=timestamp)
+    return [device async for page in pages for device in page], None
+
+
+async def poll_hub(client: ApiClient, state: HubState, interval: float, updated: asyncio.Event,
+                   store: Optional[DeviceStateStore] = None,
+                   history: Optional[HistoryStore] = None,
+                   cadence: Optional[AdaptiveCadence] = None, paged: bool = False,
+                   check_connectivity: Optional[ConnectivityCheck] = None) -> None:
+    """
+    Poll one hub every ``interval`` seconds, storing each result in ``state``.
+
+    Polls start on a fixed-rate clock, so the period does not stretch by the
+    time each poll takes. Deadlines that pass while a poll is still in flight
+    are skipped and counted in ``state.missed_polls``.
+
+    ``updated`` is only set when the snapshot or error differs from the previous
+    poll, each snapshot is passed to ``store`` to publish its transitions,
+    stamped with the time the poll started, and its readings are appended to
+    ``history``.
+
+    With a ``cadence``, the interval is recomputed after every successful poll
+    from the children's report intervals and whether the poll changed anything.
+
+    When ``paged``, the child list is fetched page by page and each page's
+    transitions are published to ``store`` before the next page is requested.
+    ``check_connectivity`` replaces the reachability check before each poll.
+    """
+    schedule = FixedRateSchedule(interval)
+    state.poll_interval = interval
+    while True:
+        await schedule.wait()
+        sampled_at = datetime.datetime.now()
+        first_poll = state.updated_at is None
+        previous = (state.devices, state.error)
+        try:
+            devices, events = await fetch_snapshot(client, state, store, sampled_at, paged, check_connectivity)
+        except Exception as e:
+            state.error = str(e)
+        else:
+            # The first snapshot is a baseline, as in the store
+            changed = not first_poll and devices != state.devices
+            state.devices = devices
+            state.error = None
+            if store is not None:
+                if events is None:
+                    events = await store.update(state.host, devices, timestamp=sampled_at)
+                # Only state transitions count as changes, not signal fluctuations
+                changed = bool(events)
+            if cadence is not None:
+                schedule.interval = state.poll_interval = cadence.update(devices, changed)
+            if history is not None:
+                try:
+                    await history.append(state.host, devices)
+                except Exception as e:
+                    state.error = f"Could not write history: {e!s}"
+        state.updated_at = datetime.datetime.now()
+        if first_poll or (state.devices, state.error) != previous:
+            state.changed_at = state.updated_at
+            updated.set()
+        state.missed_polls += schedule.advance()
+
+
+async def follow_credentials(states: List[HubState], config: TapoConfig,
+                             check_interval: float = CONFIG_CHECK_INTERVAL) -> None:
+    """
+    Switch every hub to a new client when the credentials in the .env file change.
+
+    The hub list itself is fixed for the lifetime of the pollers. A file that
+    no longer parses is ignored and the previous credentials stay in use.
+    """
+    credentials = (config.username, config.password)
+    while True:
+        await asyncio.sleep(check_interval)
+        try:
+            reloaded = reload_config_if_changed()
+        except ValueError:
+            continue
+        if reloaded is None or (reloaded.username, reloaded.password) == credentials:
+            continue
+        credentials = (reloaded.username, reloaded.password)
+        client = ApiClient(*credentials)
+        for state in states:
+            # The next poll authenticates through the new session
+            state.session = HubSession(client, state.host)
+
+
+class MonitorView:
+    """
+    The combined live view of every monitored hub.
+
+    Formatted table rows are kept per device and only re-formatted when that
+    device's data changed since the previous render.
+    """
+
+    def __init__(self, states: List[HubState], max_events: int = 10) -> None:
+        self.states = states
+        self.recent_events: Deque[DeviceEvent] = deque(maxlen=max_events)
+        self.rows_formatted = 0
+        # (host, device id) -> (device data, additional info row, device row)
+        self._rows: Dict[Tuple[str, str], Tuple[ChildDevice, Tuple[str, ...], Tuple[str, ...]]] = {}
+
+    def _device_rows(self, key: Tuple[str, str], device: ChildDevice) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Return the cached rows for a device, re-formatting them if it changed."""
+        cached = self._rows.get(key)
+        if cached is not None and cached[0] == device:
+            return cached[1], cached[2]
+        info_row, device_row = additional_device_info_row(device), device_table_row(device)
+        self._rows[key] = (device, info_row, device_row)
+        self.rows_formatted += 1
+        return info_row, device_row
+
+    async def on_event(self, event: DeviceEvent) -> None:
+        """DeviceStateStore subscriber that keeps the latest changes for display."""
+        self.recent_events.append(event)
+
+    def render(self) -> Group:
+        """Build the renderable for the current state of every hub."""
+        parts: List[Any] = [
+            f"[bold blue]Last updated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}[/bold blue]"
+        ]
+        seen = set()
+        for state in self.states:
+            if len(self.states) > 1:
+                parts.append(f"\n[bold magenta]===== Hub {state.host} =====[/bold magenta]")
+            if state.updated_at is None:
+                parts.append("[yellow]Waiting for the first poll...[/yellow]")
+                continue
+            if state.error is not None:
+                parts.append(f"[red]Error polling hub at {state.host}: {state.error}[/red]")
+            parts.append(
+                f"[dim]Changed at {(state.changed_at or state.updated_at).strftime('%H:%M:%S')}. "
+                f"Hub session: {state.session.handshakes} handshake(s), "
+                f"{state.session.handshakes_avoided} avoided"
+                + (f", {state.missed_polls} missed poll(s)" if state.missed_polls else "")
+                + (f", polling every {state.poll_interval:g}s" if state.poll_interval is not None else "")
+                + "[/dim]"
+            )
+
+            if not state.devices:
+                parts.append("[yellow]No devices found[/yellow]")
+                continue
+
+            info_table = new_additional_device_info_table()
+            device_table = new_device_table()
+            for device in state.devices:
+                key = (state.host, device.device_id)
+                seen.add(key)
+                info_row, device_row = self._device_rows(key, device)
+                info_table.add_row(*info_row)
+                device_table.add_row(*device_row)
+            parts.extend([info_table, "", device_table])
+
+        # Forget devices that are no longer reported
+        for key in self._rows.keys() - seen:
+            del self._rows[key]
+
+        if self.recent_events:
+            events_table = Table(title="Recent Changes")
+            events_table.add_column("Time", style="dim")
+            events_table.add_column("Hub", style="magenta")
+            events_table.add_column("Device", style="cyan")
+            events_table.add_column("Change", style="yellow")
+            for event in reversed(self.recent_events):
+                change = event.type.value if event.old is None and event.new is None else f"{event.type.value}: {event.old} -> {event.new}"
+                events_table.add_row(event.timestamp.strftime('%H:%M:%S'), event.hub, event.nickname, change)
+            parts.extend(["", events_table])
+        return Group(*parts)
+
+
+async def main(refresh_interval: int = 10, config: Optional[TapoConfig] = None,
+               history: Optional[HistoryStore] = None, profile: bool = False,
+               follow_config: bool = False, adaptive: bool = False,
+               max_interval: float = DEFAULT_MAX_INTERVAL, paged: bool = False) -> None:
+    """
+    Main entry point; readings are also appended to ``history`` when given.
+
+    With ``profile``, every poll stage is timed per hub and a latency summary
+    is printed when monitoring stops. With ``follow_config``, credential
+    changes in the .env file are picked up without a restart. With
+    ``adaptive``, each hub's interval varies between ``refresh_interval`` and
+    ``max_interval`` with how often its children change. With ``paged``,
+    child lists are fetched and diffed page by page.
+    """
     try:
         # Get configuration from environment variables if not provided
         if config is None:
             console.print("[yellow]Loading configuration...[/yellow]")
-            config = TapoConfig.from_env()
+            config = get_config()
             console.print("[green]Configuration loaded successfully[/green]")
 
-        # Initialize the API client
+        hosts = config.hub_addresses
+        if not hosts:
+            raise ValueError("No hub IP address configured. Set TAPO_IP_ADDRESS or pass --ip")
+
+        # Initialize the API client, shared by every hub
         console.print("[yellow]Initializing Tapo API client...[/yellow]")
         client = ApiClient(config.username, config.password)
         console.print("[green]API client initialized[/green]")
 
-        refresh_interval_seconds = refresh_interval
-        console.print(f"[blue]Starting real-time monitoring. Refreshing every {refresh_interval_seconds} seconds. Press Ctrl+C to exit.[/blue]")
-        await asyncio.sleep(2) # Brief pause before first clear
-
-        while True:
-            # Clear the console
-            os.system('cls' if os.name == 'nt' else 'clear')
+        # Keep one authenticated session per hub for the lifetime of the monitor
+        states = [HubState(host=host, session=HubSession(client, host)) for host in hosts]
 
-            console.print(f"[bold blue]Last updated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}[/bold blue]")
-            # Get child devices
-            devices = await get_child_devices(client, config.ip_address)
-
-            # Print the additional device information table
-            print_additional_device_info_table(devices)
-
-            # Print the main devices table
-            print_device_table(devices)
+        refresh_interval_seconds = refresh_interval
+        console.print(
+            f"[blue]Starting real-time monitoring of {len(hosts)} hub(s): {', '.join(hosts)}. "
+            f"Refreshing every {refresh_interval_seconds} seconds. Press Ctrl+C to exit.[/blue]"
+        )
 
-            await asyncio.sleep(refresh_interval_seconds)
+        # Each hub polls concurrently on its own schedule; the live view is redrawn
+        # in place whenever one reports, without clearing the screen
+        view = MonitorView(states)
+        store = DeviceStateStore()
+        store.subscribe(view.on_event)
+        updated = asyncio.Event()
+        latency = LatencyProfile() if profile else None
+        # Pollers inherit the active profile from the context they are created in
+        with use_profile(latency):
+            pollers = [
+                asyncio.create_task(poll_hub(
+                    client, state, refresh_interval_seconds, updated, store, history,
+                    AdaptiveCadence(refresh_interval_seconds, max_interval) if adaptive else None,
+                    paged=paged,
+                ))
+                for state in states
+            ]
+        if history is not None:
+            pollers.append(asyncio.create_task(history.run_maintenance()))
+        if follow_config:
+            pollers.append(asyncio.create_task(follow_credentials(states, config)))
+        try:
+            with Live(view.render(), console=console, auto_refresh=False) as live:
+                while True:
+                    await updated.wait()
+                    await asyncio.sleep(RENDER_DEBOUNCE)
+                    updated.clear()
+                    live.update(view.render(), refresh=True)
+        finally:
+            for poller in pollers:
+                poller.cancel()
+            await asyncio.gather(*pollers, return_exceptions=True)
+            if latency is not None:
+                print_profile(latency.summary(), console)
 
     except KeyboardInterrupt:
         # This is now handled by main_cli, but kept here as a safeguard if main() is called directly.
@@ -331,7 +576,7 @@ async def main(refresh_interval: int = 10, config: Optional[TapoConfig] = None)
 def main_cli():
     """Synchronous entry point for the console script."""
     try:
-        asyncio.run(main())
+        asyncio.run(main(follow_config=True))
     except KeyboardInterrupt:
         console.print("\n[bold yellow]Exiting application...[/bold yellow]")
     # Other exceptions are caught and printed within main() or TapoConfig
@@ -0,0 +1,232 @@
+"""Typed records for the devices Tapo Chatter reads from hubs."""
+import base64
+import binascii
+import datetime
+import weakref
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Placeholder shown in tables for values a device did not report
+MISSING = "N/A"
+
+
+def _number(value: Any) -> Optional[float]:
+    """Return numeric values unchanged and anything else (including bools) as None."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def _integer(value: Any) -> Optional[int]:
+    number = _number(value)
+    return int(number) if number is not None else None
+
+
+def _text(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def _flag(value: Any) -> Optional[bool]:
+    return value if isinstance(value, bool) else None
+
+
+def _timestamp(value: Any) -> Optional[datetime.datetime]:
+    number = _number(value)
+    return datetime.datetime.fromtimestamp(number) if number is not None else None
+
+
+def _interpret_status(raw_status: Any) -> bool:
+    if raw_status is None:
+        return False
+    # Enums expose .name/.value; plain values are compared directly
+    if 'online' in getattr(raw_status, 'name', '').lower():
+        return True
+    if getattr(raw_status, 'value', None) == 1:
+        return True
+    if 'online' in str(raw_status).lower():
+        return True
+    return raw_status is True or raw_status == 1
+
+
+# Interpreted status values; hubs only ever report a handful of distinct ones
+_STATUS_CACHE: Dict[Any, bool] = {}
+_STATUS_CACHE_SIZE = 64
+
+
+def is_online(raw_status: Any) -> bool:
+    """Interpret the different ways the library reports a child device as online."""
+    try:
+        return _STATUS_CACHE[raw_status]
+    except (KeyError, TypeError):
+        pass
+    online = _interpret_status(raw_status)
+    try:
+        if len(_STATUS_CACHE) < _STATUS_CACHE_SIZE:
+            _STATUS_CACHE[raw_status] = online
+    except TypeError:
+        # Unhashable status values are interpreted every time
+        pass
+    return online
+
+
+# to_dict() key -> (ChildDevice field, converter)
+PAYLOAD_FIELDS: Tuple[Tuple[str, str, Callable[[Any], Any]], ...] = (
+    ('at_low_battery', 'battery_low', _flag),
+    ('detected', 'motion_detected', _flag),
+    ('open', 'contact_open', _flag),
+    ('rssi', 'rssi', _integer),
+    ('jamming_rssi', 'jamming_rssi', _integer),
+    ('signal_level', 'signal_level', _integer),
+    ('current_temp', 'temperature', _number),
+    ('current_humidity', 'humidity', _number),
+    ('hw_ver', 'hw_ver', _text),
+    ('mac', 'mac', _text),
+    ('region', 'region', _text),
+    ('report_interval', 'report_interval', _integer),
+    ('lastOnboardingTimestamp', 'last_onboarded', _timestamp),
+)
+
+
+def _nickname(value: Any) -> str:
+    """Decode a nickname from the raw API, which sends them base64-encoded."""
+    if not isinstance(value, str):
+        return "Unknown"
+    try:
+        return base64.b64decode(value, validate=True).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError):
+        # Already plain text, as in payloads the library decoded
+        return value
+
+
+Parser = Callable[[Any], 'ChildDevice']
+
+# Compiled parsers by result class, dropped with the class
+_PARSERS: 'weakref.WeakKeyDictionary[type, Parser]' = weakref.WeakKeyDictionary()
+
+
+def _payload(device_obj: Any) -> Optional[Dict[str, Any]]:
+    try:
+        data = device_obj.to_dict()
+    except Exception:  # pylint: disable=broad-except
+        # If to_dict fails, only the attributes read directly are known
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def compile_parser(sample: Any) -> Parser:
+    """
+    Build a parser specialised for the class of ``sample``.
+
+    The tapo library returns one result class per device type, each with a
+    fixed set of attributes and ``to_dict()`` keys. They are probed once here,
+    so the returned parser reads exactly the fields that class provides.
+    """
+    if hasattr(sample, 'device_type'):
+        type_attr: Optional[str] = 'device_type'
+    elif hasattr(sample, 'type'):
+        type_attr = 'type'
+    else:
+        type_attr = None
+    has_to_dict = callable(getattr(sample, 'to_dict', None))
+
+    fields_read = PAYLOAD_FIELDS
+    sample_data = _payload(sample) if has_to_dict else None
+    if sample_data is not None:
+        fields_read = tuple(entry for entry in PAYLOAD_FIELDS if entry[0] in sample_data)
+
+    def parse(device_obj: Any) -> 'ChildDevice':
+        values: Dict[str, Any] = {}
+        data = _payload(device_obj) if has_to_dict else None
+        if data is not None:
+            get = data.get
+            values = {name: convert(get(key)) for key, name, convert in fields_read}
+        return ChildDevice(
+            nickname=getattr(device_obj, 'nickname', "Unknown"),
+            device_id=getattr(device_obj, 'device_id', "Unknown"),
+            device_type=getattr(device_obj, type_attr, "Unknown") if type_attr else "Unknown",
+            online=is_online(getattr(device_obj, 'status', None)),
+            **values,
+        )
+
+    return parse
+
+
+def parser_for(device_obj: Any) -> Parser:
+    """Return the compiled parser for a result's class, compiling it on first use."""
+    cls = type(device_obj)
+    parser = _PARSERS.get(cls)
+    if parser is None:
+        parser = _PARSERS[cls] = compile_parser(device_obj)
+    return parser
+
+
+@dataclass(slots=True)
+class ChildDevice:
+    """
+    One child device reported by a hub.
+
+    Values keep their native types, and anything the device did not report is
+    None. Text for display is produced only when rendering.
+    """
+    nickname: str = "Unknown"
+    device_id: str = "Unknown"
+    device_type: str = "Unknown"
+    online: bool = False
+    rssi: Optional[int] = None
+    jamming_rssi: Optional[int] = None
+    signal_level: Optional[int] = None
+    battery_low: Optional[bool] = None
+    motion_detected: Optional[bool] = None
+    contact_open: Optional[bool] = None
+    temperature: Optional[float] = None
+    humidity: Optional[float] = None
+    hw_ver: Optional[str] = None
+    mac: Optional[str] = None
+    region: Optional[str] = None
+    report_interval: Optional[int] = None
+    last_onboarded: Optional[datetime.datetime] = None
+
+    @property
+    def battery_state(self) -> Optional[str]:
+        """"Low" or "OK", or None if the device has no battery report."""
+        if self.battery_low is None:
+            return None
+        return "Low" if self.battery_low else "OK"
+
+    @property
+    def motion_status(self) -> Optional[str]:
+        """"Detected" or "Clear" for motion sensors, otherwise None."""
+        if self.motion_detected is None:
+            return None
+        return "Detected" if self.motion_detected else "Clear"
+
+    @property
+    def contact_status(self) -> Optional[str]:
+        """"Open" or "Closed" for contact sensors, otherwise None."""
+        if self.contact_open is None:
+            return None
+        return "Open" if self.contact_open else "Closed"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the device as a JSON-serialisable dictionary."""
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        if self.last_onboarded is not None:
+            data['last_onboarded'] = self.last_onboarded.isoformat(timespec="seconds")
+        return data
+
+    @classmethod
+    def from_api(cls, device_obj: Any) -> 'ChildDevice':
+        """Build a record from a child device object returned by the tapo library."""
+        return parser_for(device_obj)(device_obj)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'ChildDevice':
+        """Build a record from one entry of a raw ``child_device_list`` page."""
+        get = data.get
+        return cls(
+            nickname=_nickname(get('nickname')),
+            device_id=_text(get('device_id')) or "Unknown",
+            device_type=_text(get('type')) or "Unknown",
+            online=is_online(get('status')),
+            **{name: convert(get(key)) for key, name, convert in PAYLOAD_FIELDS},
+        )
@@ -0,0 +1,199 @@
+"""Per-stage latency instrumentation for Tapo Chatter.
+
+Probes and hub polls are split into stages (TCP connect, handshake, device
+info, child device list, parsing) that are timed per host while a
+``LatencyProfile`` is active. The active profile is held in a context
+variable, so every task started inside ``use_profile()`` reports to it and
+code outside pays only for one lookup per stage.
+"""
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, ContextManager, Deque, Dict, Iterator, Optional, Sequence
+
+from rich.console import Console
+from rich.table import Table
+
+# Stage names, in pipeline order
+CONNECT = "connect"
+HANDSHAKE = "handshake"
+DEVICE_INFO = "device_info"
+CHILD_DEVICES = "child_devices"
+PARSE = "parse"
+STAGES = (CONNECT, HANDSHAKE, DEVICE_INFO, CHILD_DEVICES, PARSE)
+
+# Durations kept per stage for percentiles; older ones are dropped
+DEFAULT_MAX_SAMPLES = 2048
+
+# Hosts whose stages are broken out individually; later hosts only count towards
+# the stage totals, so a large scan does not grow the profile with its range
+DEFAULT_MAX_HOSTS = 1024
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_samples: Sequence[float], pct: float) -> float:
+    """
+    Return the nearest-rank percentile of already sorted samples, or 0.0 if there are none.
+
+    Every p50/p95/p99 figure in the package comes from here, so the latencies
+    that profiles, the adaptive tuner and benchmarks report agree.
+    """
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, -(-len(sorted_samples) * pct // 100))
+    return sorted_samples[int(rank) - 1]
+
+
+class _StageStats:
+    """Running totals for one stage, and its recent samples if ``max_samples`` is set."""
+    __slots__ = ('count', 'errors', 'max', 'samples', 'total')
+
+    def __init__(self, max_samples: int = 0) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Optional[Deque[float]] = deque(maxlen=max_samples) if max_samples else None
+
+    def add(self, seconds: float, failed: bool) -> None:
+        self.count += 1
+        self.errors += failed
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if self.samples is not None:
+            self.samples.append(seconds)
+
+    def describe(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            'count': self.count,
+            'errors': self.errors,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+        }
+        if self.samples is not None:
+            samples = sorted(self.samples)
+            for pct in PERCENTILES:
+                summary[f'p{pct}'] = percentile(samples, pct)
+        return summary
+
+
+class LatencyProfile:
+    """Stage durations summarised as percentiles, with totals per host."""
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES, max_hosts: int = DEFAULT_MAX_HOSTS) -> None:
+        self.max_samples = max_samples
+        self.max_hosts = max_hosts
+        self._stages: Dict[str, _StageStats] = {}
+        # host -> stage -> totals; per-host figures keep no samples
+        self._hosts: Dict[str, Dict[str, _StageStats]] = {}
+
+    def record(self, stage: str, host: str, seconds: float, failed: bool = False) -> None:
+        """Record one duration of ``stage`` on ``host``."""
+        stats = self._stages.get(stage)
+        if stats is None:
+            stats = self._stages[stage] = _StageStats(self.max_samples)
+        stats.add(seconds, failed)
+
+        host_stages = self._hosts.get(host)
+        if host_stages is None:
+            if len(self._hosts) >= self.max_hosts:
+                return
+            host_stages = self._hosts[host] = {}
+        host_stats = host_stages.get(stage)
+        if host_stats is None:
+            host_stats = host_stages[stage] = _StageStats()
+        host_stats.add(seconds, failed)
+
+    @contextmanager
+    def stage(self, stage: str, host: str) -> Iterator[None]:
+        """Time the enclosed block as ``stage`` on ``host``; failures are timed and counted too."""
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(stage, host, time.perf_counter() - started, failed)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return the recorded latencies as a structured dictionary.
+
+        Durations are in seconds. ``stages`` aggregates every host, with
+        percentiles over the recent samples, and ``hosts`` holds the totals,
+        mean and maximum per host and stage for the first ``max_hosts`` hosts.
+        """
+        ordered = sorted(self._stages, key=lambda stage: (STAGES.index(stage) if stage in STAGES else len(STAGES), stage))
+        return {
+            'stages': {stage: self._stages[stage].describe() for stage in ordered},
+            'hosts': {
+                host: {stage: stats.describe() for stage, stats in stages.items()}
+                for host, stages in self._hosts.items()
+            },
+        }
+
+
+_active_profile: ContextVar[Optional[LatencyProfile]] = ContextVar("active_profile", default=None)
+_untimed = nullcontext()
+
+
+@contextmanager
+def use_profile(profile: Optional[LatencyProfile]) -> Iterator[Optional[LatencyProfile]]:
+    """Make ``profile`` receive the stage timings of the current task and tasks it starts."""
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+def timed(stage: str, host: str) -> ContextManager[None]:
+    """Time a stage against the active profile, or do nothing if none is active."""
+    profile = _active_profile.get()
+    if profile is None:
+        return _untimed
+    return profile.stage(stage, host)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}"
+
+
+def print_profile(summary: Dict[str, Any], console: Console, slowest_hosts: int = 5) -> None:
+    """Print a ``LatencyProfile.summary()`` as stage and slowest-host tables."""
+    if not summary['stages']:
+        console.print("[yellow]No stage timings were recorded[/yellow]")
+        return
+
+    table = Table(title="Stage Latency (ms)")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Count", justify="right")
+    table.add_column("Errors", justify="right", style="red")
+    for column in ("Mean", *(f"p{pct}" for pct in PERCENTILES), "Max"):
+        table.add_column(column, justify="right", style="green")
+    table.add_column("Total (s)", justify="right", style="yellow")
+    for stage, stats in summary['stages'].items():
+        table.add_row(
+            stage, str(stats['count']), str(stats['errors']), _ms(stats['mean']),
+            *(_ms(stats[f'p{pct}']) for pct in PERCENTILES), _ms(stats['max']), f"{stats['total']:.2f}",
+        )
+    console.print(table)
+
+    hosts = sorted(summary['hosts'].items(),
+                   key=lambda item: sum(stats['total'] for stats in item[1].values()), reverse=True)
+    if len(hosts) > 1 and slowest_hosts > 0:
+        host_table = Table(title=f"Slowest Hosts (mean ms per stage, top {min(slowest_hosts, len(hosts))})")
+        host_table.add_column("Host", style="cyan")
+        stages = list(summary['stages'])
+        for stage in stages:
+            host_table.add_column(stage, justify="right", style="green")
+        for host, host_stats in hosts[:slowest_hosts]:
+            host_table.add_row(host, *(
+                _ms(host_stats[stage]['mean']) if stage in host_stats else "-" for stage in stages
+            ))
+        console.print(host_table)
@@ -0,0 +1,126 @@
+"""Fixed-rate scheduling for hub polls.
+
+Sleeping for the interval after each poll makes the real period the interval
+plus however long the poll took, so samples drift. ``FixedRateSchedule``
+instead fires on a grid of monotonic deadlines. A poll that overruns the next
+deadline does not start another one while it is in flight: the deadlines it
+covered are skipped and counted, and polling resumes on the grid.
+
+``AdaptiveCadence`` optionally varies a hub's interval between polls, backing
+off for hubs whose children rarely change.
+"""
+import asyncio
+import math
+import time
+from typing import Callable, Iterable, Optional
+
+from .models import ChildDevice
+
+
+class FixedRateSchedule:
+    """Deadlines every ``interval`` seconds on the monotonic clock."""
+
+    def __init__(self, interval: float, start: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Args:
+            interval: Seconds between deadlines; 0 runs the work back to back.
+                It may be changed between deadlines and applies from the next one.
+            start: Monotonic time of the first deadline, now if None
+            clock: Monotonic clock the deadlines refer to
+        """
+        if interval < 0:
+            raise ValueError(f"Interval must not be negative, got {interval}")
+        self.interval = interval
+        self.clock = clock
+        self.deadline = clock() if start is None else start
+        self.missed = 0
+
+    async def wait(self) -> float:
+        """Sleep until the current deadline and return how late it was reached."""
+        # Always yields, so back-to-back work still lets other tasks run
+        await asyncio.sleep(max(0.0, self.deadline - self.clock()))
+        return max(0.0, self.clock() - self.deadline)
+
+    def advance(self) -> int:
+        """
+        Move to the next deadline that is still in the future.
+
+        Call once the work for the current deadline is done. Returns how many
+        deadlines passed while it was in flight; they are skipped, not run late.
+        """
+        if self.interval == 0:
+            self.deadline = self.clock()
+            return 0
+        self.deadline += self.interval
+        overdue = self.clock() - self.deadline
+        skipped = 0
+        if overdue > 0:
+            skipped = math.ceil(overdue / self.interval)
+            self.deadline += skipped * self.interval
+            self.missed += skipped
+        return skipped
+
+
+# Longest an adaptive hub poll interval grows to by default, in seconds
+DEFAULT_MAX_INTERVAL = 300.0
+
+
+class AdaptiveCadence:
+    """
+    A hub's poll interval, adapted to how often its children can report changes.
+
+    Contact and motion sensors only send new state when they report, so polling
+    a hub faster than the quickest ``report_interval`` among its online
+    children gains nothing; that interval is the hub's floor. After
+    ``stable_polls`` polls without a state change the interval grows by
+    ``backoff`` per poll up to ``max_interval``, and a change drops it to
+    ``min_interval`` for the next ``boost_polls`` polls to catch follow-ups
+    such as motion clearing.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float = DEFAULT_MAX_INTERVAL,
+                 backoff: float = 1.5, stable_polls: int = 3, boost_polls: int = 3) -> None:
+        """
+        Args:
+            min_interval: Fastest poll interval, used while boosting after a change
+            max_interval: Slowest poll interval that backing off reaches
+            backoff: Factor the interval grows by per stable poll once backing off
+            stable_polls: Polls without a change before backing off starts
+            boost_polls: Polls at ``min_interval`` after a change
+        """
+        if min_interval < 0 or max_interval < min_interval:
+            raise ValueError(f"Invalid interval bounds: {min_interval} to {max_interval}")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.stable_polls = stable_polls
+        self.boost_polls = boost_polls
+        self.interval = min_interval
+        self._stable = 0
+        self._boost = 0
+
+    def floor(self, devices: Iterable[ChildDevice]) -> float:
+        """The shortest useful interval for a snapshot of the hub's children."""
+        report_intervals = [device.report_interval for device in devices
+                            if device.online and device.report_interval]
+        floor = max(self.min_interval, min(report_intervals)) if report_intervals else self.min_interval
+        return min(floor, self.max_interval)
+
+    def update(self, devices: Iterable[ChildDevice], changed: bool) -> float:
+        """Return the interval until the next poll, given the latest snapshot and whether it changed."""
+        if changed:
+            self._stable = 0
+            self._boost = self.boost_polls
+        if self._boost > 0:
+            self._boost -= 1
+            self.interval = self.min_interval
+            return self.interval
+
+        floor = self.floor(devices)
+        self._stable += 1
+        if self._stable > self.stable_polls:
+            self.interval = min(self.max_interval, max(floor, self.interval * self.backoff))
+        else:
+            self.interval = floor
+        return self.interval
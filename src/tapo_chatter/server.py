@@ -0,0 +1,274 @@
+"""Headless serve mode for Tapo Chatter.
+
+Polls the configured hubs in the background and serves the latest child device
+snapshots from a small asyncio HTTP server, as JSON and in the Prometheus text
+format. Scrapes are answered from memory and never reach a hub, so dashboards
+can poll the endpoint as often as they like.
+"""
+import asyncio
+import datetime
+import json
+from typing import Any, Callable, ClassVar, Dict, List, Mapping, Optional, Tuple
+
+from tapo import ApiClient
+
+from .config import TapoConfig, get_config
+from .events import DeviceStateStore
+from .history import HistoryStore
+from .hub_session import HubSession
+from .main import HubState, follow_credentials, poll_hub
+from .models import ChildDevice
+from .scheduling import DEFAULT_MAX_INTERVAL, AdaptiveCadence
+from .utils import console
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9105
+
+# Maximum time to wait for a client to send its request, in seconds
+REQUEST_TIMEOUT = 5.0
+
+JSON_CONTENT_TYPE = "application/json"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _timestamp(value: Optional[datetime.datetime]) -> Optional[str]:
+    return value.isoformat(timespec="seconds") if value is not None else None
+
+
+def render_json(states: List[HubState]) -> bytes:
+    """Serialise the latest snapshot of every hub as JSON."""
+    hubs = [
+        {
+            'host': state.host,
+            'updated_at': _timestamp(state.updated_at),
+            'changed_at': _timestamp(state.changed_at),
+            'error': state.error,
+            'missed_polls': state.missed_polls,
+            'poll_interval': state.poll_interval,
+            'devices': [device.to_dict() for device in state.devices],
+        }
+        for state in states
+    ]
+    return json.dumps({'hubs': hubs}, indent=2, default=str).encode("utf-8")
+
+
+def _escape_label(value: Any) -> str:
+    """Escape a label value as the Prometheus text format requires."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+# (metric name, type, help text)
+_METRICS: Tuple[Tuple[str, str, str], ...] = (
+    ("tapo_hub_up", "gauge", "Whether the last poll of the hub succeeded"),
+    ("tapo_hub_last_poll_timestamp_seconds", "gauge", "Unix time of the last poll of the hub"),
+    ("tapo_hub_child_devices", "gauge", "Number of child devices reported by the hub"),
+    ("tapo_hub_handshakes_total", "counter", "Handshakes performed with the hub"),
+    ("tapo_hub_poll_interval_seconds", "gauge", "Seconds between polls of the hub"),
+    ("tapo_hub_missed_polls_total", "counter", "Poll deadlines skipped because the previous poll was still running"),
+    ("tapo_child_online", "gauge", "Whether the child device is online"),
+    ("tapo_child_rssi_dbm", "gauge", "Signal strength of the child device"),
+    ("tapo_child_motion_detected", "gauge", "Whether the motion sensor currently detects motion"),
+    ("tapo_child_contact_open", "gauge", "Whether the contact sensor is currently open"),
+    ("tapo_child_battery_low", "gauge", "Whether the child device reports a low battery"),
+)
+
+
+def _flag(value: Optional[bool]) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+# (metric name, value for a polled hub); None values are not exported
+_HUB_SAMPLES: Tuple[Tuple[str, Callable[[HubState], Any]], ...] = (
+    ("tapo_hub_up", lambda state: 0 if state.error else 1),
+    ("tapo_hub_last_poll_timestamp_seconds", lambda state: f"{state.updated_at.timestamp():.3f}"),
+    ("tapo_hub_child_devices", lambda state: len(state.devices)),
+    ("tapo_hub_handshakes_total", lambda state: state.session.handshakes),
+    ("tapo_hub_poll_interval_seconds",
+     lambda state: f"{state.poll_interval:g}" if state.poll_interval is not None else None),
+    ("tapo_hub_missed_polls_total", lambda state: state.missed_polls),
+)
+
+# (metric name, value for a child device); None values are not exported
+_CHILD_SAMPLES: Tuple[Tuple[str, Callable[[ChildDevice], Any]], ...] = (
+    ("tapo_child_online", lambda device: int(device.online)),
+    ("tapo_child_rssi_dbm", lambda device: device.rssi),
+    ("tapo_child_motion_detected", lambda device: _flag(device.motion_detected)),
+    ("tapo_child_contact_open", lambda device: _flag(device.contact_open)),
+    ("tapo_child_battery_low", lambda device: _flag(device.battery_low)),
+)
+
+
+def _add_samples(samples: Dict[str, List[str]], table: Tuple[Tuple[str, Callable[[Any], Any]], ...],
+                 subject: Any, labels: str) -> None:
+    for name, value_of in table:
+        value = value_of(subject)
+        if value is not None:
+            samples[name].append(f"{name}{labels} {value}")
+
+
+def render_prometheus(states: List[HubState]) -> bytes:
+    """Render the latest snapshot of every hub in the Prometheus text exposition format."""
+    samples: Dict[str, List[str]] = {name: [] for name, _, _ in _METRICS}
+
+    for state in states:
+        if state.updated_at is None:
+            continue
+        _add_samples(samples, _HUB_SAMPLES, state, _labels(hub=state.host))
+        for device in state.devices:
+            labels = _labels(
+                hub=state.host,
+                device_id=device.device_id,
+                nickname=device.nickname,
+                type=device.device_type,
+            )
+            _add_samples(samples, _CHILD_SAMPLES, device, labels)
+
+    lines: List[str] = []
+    for name, metric_type, help_text in _METRICS:
+        if samples[name]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples[name])
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class SnapshotServer:
+    """Serves the in-memory hub snapshots over HTTP, re-rendering a body only after a new poll."""
+
+    # path -> (renderer, content type)
+    ROUTES: ClassVar[Mapping[str, Tuple[Callable[[List[HubState]], bytes], str]]] = {
+        "/": (render_json, JSON_CONTENT_TYPE),
+        "/devices": (render_json, JSON_CONTENT_TYPE),
+        "/metrics": (render_prometheus, PROMETHEUS_CONTENT_TYPE),
+    }
+
+    def __init__(self, states: List[HubState]) -> None:
+        self.states = states
+        self.requests = 0
+        self.renders = 0
+        # path -> (poll times the body was rendered from, rendered body)
+        self._bodies: Dict[str, Tuple[Tuple[Optional[datetime.datetime], ...], bytes]] = {}
+
+    def body(self, path: str) -> Tuple[bytes, str]:
+        """Return the body and content type for a route, rendering it only if a hub was polled since."""
+        render, content_type = self.ROUTES[path]
+        polled = tuple(state.updated_at for state in self.states)
+        cached = self._bodies.get(path)
+        if cached is None or cached[0] != polled:
+            cached = (polled, render(self.states))
+            self._bodies[path] = cached
+            self.renders += 1
+        return cached[1], content_type
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer a single HTTP request and close the connection."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=REQUEST_TIMEOUT)
+            # Drain the headers; nothing in them changes the response
+            while True:
+                header = await asyncio.wait_for(reader.readline(), timeout=REQUEST_TIMEOUT)
+                if header in (b"\r\n", b"\n", b""):
+                    break
+
+            self.requests += 1
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2:
+                status, body, content_type = "400 Bad Request", b"Bad Request\n", "text/plain"
+            else:
+                method, path = parts[0], parts[1].split("?", 1)[0]
+                if path not in self.ROUTES:
+                    status, body, content_type = "404 Not Found", b"Not Found\n", "text/plain"
+                elif method not in ("GET", "HEAD"):
+                    status, body, content_type = "405 Method Not Allowed", b"Method Not Allowed\n", "text/plain"
+                else:
+                    status = "200 OK"
+                    body, content_type = self.body(path)
+                    if method == "HEAD":
+                        writer.write(self._head(status, content_type, len(body)))
+                        await writer.drain()
+                        return
+
+            writer.write(self._head(status, content_type, len(body)) + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def _head(status: str, content_type: str, length: int) -> bytes:
+        return (
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {length}\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+        ).encode("latin-1")
+
+
+async def serve_main(refresh_interval: int = 10, config: Optional[TapoConfig] = None,
+                     host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                     history: Optional[HistoryStore] = None, follow_config: bool = False,
+                     adaptive: bool = False, max_interval: float = DEFAULT_MAX_INTERVAL,
+                     paged: bool = False) -> None:
+    """
+    Poll every configured hub headlessly and serve the snapshots over HTTP.
+
+    Args:
+        refresh_interval: Seconds between polls of each hub
+        config: Configuration to use, loaded from the environment if None
+        host: Address the HTTP server listens on
+        port: Port the HTTP server listens on
+        history: Optional store that every poll's readings are appended to
+        follow_config: Whether to pick up credential changes in the .env file without a restart
+        adaptive: Whether to vary each hub's interval with how often its children change
+        max_interval: Slowest interval an adaptive hub backs off to
+        paged: Whether to fetch and diff each hub's child list page by page
+    """
+    if config is None:
+        config = get_config()
+
+    hosts = config.hub_addresses
+    if not hosts:
+        raise ValueError("No hub IP address configured. Set TAPO_IP_ADDRESS or pass --ip")
+
+    client = ApiClient(config.username, config.password)
+    states = [HubState(host=hub, session=HubSession(client, hub)) for hub in hosts]
+    snapshots = SnapshotServer(states)
+    store = DeviceStateStore()
+    # Nothing redraws in serve mode; scrapes notice new polls through the poll times
+    updated = asyncio.Event()
+
+    tasks = [
+        asyncio.create_task(poll_hub(
+            client, state, refresh_interval, updated, store, history,
+            AdaptiveCadence(refresh_interval, max_interval) if adaptive else None,
+            paged=paged,
+        ))
+        for state in states
+    ]
+    if history is not None:
+        tasks.append(asyncio.create_task(history.run_maintenance()))
+    if follow_config:
+        tasks.append(asyncio.create_task(follow_credentials(states, config)))
+    try:
+        server = await asyncio.start_server(snapshots.handle, host, port)
+        console.print(
+            f"[blue]Serving {len(hosts)} hub(s) on http://{host}:{port}/devices and "
+            f"http://{host}:{port}/metrics, polling every {refresh_interval} seconds. Press Ctrl+C to exit.[/blue]"
+        )
+        async with server:
+            await server.serve_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,182 @@
+"""Adaptive concurrency and timeout tuning for Tapo Chatter discovery.
+
+Fixed ``--limit``/``--timeout`` values are either too aggressive for congested
+Wi-Fi or too timid for a quiet wired network. ``AdaptiveTuner`` learns both
+during a scan: the concurrency window follows AIMD (additive increase,
+multiplicative decrease on timeouts and errors) and the per-probe timeout
+tracks the observed p99 response time.
+"""
+import argparse
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Union
+
+from .profiling import percentile
+
+# Command-line value that selects adaptive tuning for --limit/--timeout
+AUTO = "auto"
+
+
+def limit_arg(value: str) -> Union[int, str]:
+    """argparse type for ``--limit``: a positive integer or ``auto``."""
+    if value.lower() == AUTO:
+        return AUTO
+    try:
+        limit = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be a positive integer or '{AUTO}', got {value!r}") from None
+    if limit < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer or '{AUTO}', got {value!r}")
+    return limit
+
+
+def timeout_arg(value: str) -> Union[float, str]:
+    """argparse type for ``--timeout``: a positive number of seconds or ``auto``."""
+    if value.lower() == AUTO:
+        return AUTO
+    try:
+        timeout = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be a positive number or '{AUTO}', got {value!r}") from None
+    if timeout <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number or '{AUTO}', got {value!r}")
+    return timeout
+
+
+class AdaptiveTuner:
+    """Adjusts a probe concurrency window and timeout from observed outcomes."""
+
+    def __init__(self,
+                 limit: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 initial_limit: int = 10,
+                 min_limit: int = 1,
+                 max_limit: int = 128,
+                 initial_timeout: float = 2.0,
+                 min_timeout: float = 0.2,
+                 max_timeout: float = 5.0,
+                 timeout_factor: float = 1.5,
+                 warmup: int = 5,
+                 backoff_threshold: float = 0.1,
+                 sample_size: int = 256) -> None:
+        """
+        Args:
+            limit: Fixed concurrency, or None to adapt it
+            timeout: Fixed per-probe timeout in seconds, or None to adapt it
+            initial_limit: Starting concurrency window when adapting
+            min_limit: Smallest window the tuner will back off to
+            max_limit: Largest window the tuner will grow to
+            initial_timeout: Timeout used until ``warmup`` responses have been seen
+            min_timeout: Lower bound for the learned timeout
+            max_timeout: Upper bound for the learned timeout
+            timeout_factor: Headroom applied on top of the observed p99
+            warmup: Number of responses needed before the timeout is learned
+            backoff_threshold: Failure rate within a window that halves it
+            sample_size: Number of recent response times kept for percentiles
+        """
+        self.adapt_limit = limit is None
+        self.adapt_timeout = timeout is None
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, limit if limit is not None else max_limit)
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_factor = timeout_factor
+        self.warmup = warmup
+        self.backoff_threshold = backoff_threshold
+
+        self.limit = limit if limit is not None else max(self.min_limit, min(initial_limit, self.max_limit))
+        self.timeout = timeout if timeout is not None else initial_timeout
+
+        self.responses = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.increases = 0
+        self.decreases = 0
+        self._samples: Deque[float] = deque(maxlen=sample_size)
+        self._epoch_outcomes = 0
+        self._epoch_failures = 0
+        self._in_use = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot in the current concurrency window."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_use < self.limit)
+            self._in_use += 1
+
+    async def release(self) -> None:
+        """Free a slot taken with ``acquire``."""
+        async with self._condition:
+            self._in_use -= 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot in the current concurrency window for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    def record(self, elapsed: float, outcome: Any) -> None:
+        """
+        Account for a finished probe.
+
+        Args:
+            elapsed: Seconds the probe took
+            outcome: The probe's result, or the exception it raised
+        """
+        if isinstance(outcome, asyncio.TimeoutError):
+            self.timeouts += 1
+            self._epoch_failures += 1
+        elif isinstance(outcome, BaseException):
+            self.errors += 1
+            self._epoch_failures += 1
+        else:
+            self.responses += 1
+            self._samples.append(elapsed)
+            if self.adapt_timeout and self.responses >= self.warmup:
+                p99 = self.percentile(99)
+                self.timeout = min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_factor))
+
+        self._epoch_outcomes += 1
+        if self.adapt_limit and self._epoch_outcomes >= self.limit:
+            self._adjust_limit()
+
+    def _adjust_limit(self) -> None:
+        """Apply one AIMD step based on the failure rate of the last window."""
+        failure_rate = self._epoch_failures / self._epoch_outcomes
+        if failure_rate > self.backoff_threshold:
+            new_limit = max(self.min_limit, self.limit // 2)
+            if new_limit < self.limit:
+                self.decreases += 1
+        else:
+            new_limit = min(self.max_limit, self.limit + 1)
+            if new_limit > self.limit:
+                self.increases += 1
+        self.limit = new_limit
+        self._epoch_outcomes = 0
+        self._epoch_failures = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-th percentile (nearest rank) of recent response times."""
+        if not self._samples:
+            return None
+        return percentile(sorted(self._samples), q)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the settled values and the measurements behind them."""
+        return {
+            'limit': self.limit,
+            'timeout': round(self.timeout, 3),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'responses': self.responses,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'increases': self.increases,
+            'decreases': self.decreases,
+        }
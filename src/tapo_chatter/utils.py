@@ -1,27 +1,219 @@
 """Utility functions shared between different Tapo Chatter modules."""
-import socket
-from typing import Any, Dict
+import argparse
+import asyncio
+import functools
+import logging
+import operator
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from rich.console import Console
 from tapo import ApiClient
 
+from .profiling import CONNECT, timed
+
 console = Console()
 
+# How long (in seconds) a reachability result is reused before probing again
+CONNECTIVITY_CACHE_TTL = 5.0
+
+# Most reachability results kept at once; the oldest are dropped first
+CONNECTIVITY_CACHE_SIZE = 4096
+
+# (host, port) -> (monotonic time of the check, reachable), oldest check first
+_connectivity_cache: "OrderedDict[Tuple[str, int], Tuple[float, bool]]" = OrderedDict()
+
+# Signature of check_host_connectivity, for callers that accept a replacement
+ConnectivityCheck = Callable[..., Awaitable[bool]]
+
+
+async def check_host_connectivity(host: str, port: int = 80, timeout: float = 2,
+                                  cache_ttl: float = CONNECTIVITY_CACHE_TTL) -> bool:
+    """
+    Check if the host is reachable on the network.
+
+    The TCP connect runs on the event loop, so an unreachable host only delays
+    its own caller. Results are cached per (host, port) for ``cache_ttl``
+    seconds; pass ``cache_ttl=0`` to always probe.
+    """
+    key = (host, port)
+    if cache_ttl > 0:
+        cached = _connectivity_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < cache_ttl:
+            return cached[1]
 
-async def check_host_connectivity(host: str, port: int = 80, timeout: float = 2) -> bool:
-    """Check if the host is reachable on the network."""
     try:
-        # Create a socket object
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
+        with timed(CONNECT, host):
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        reachable = True
+    except (OSError, asyncio.TimeoutError):
+        reachable = False
+
+    if cache_ttl > 0:
+        _remember_connectivity(key, reachable, cache_ttl)
+    return reachable
+
+
+def _remember_connectivity(key: Tuple[str, int], reachable: bool, cache_ttl: float) -> None:
+    """
+    Cache a reachability result, dropping expired and excess entries.
+
+    Entries are kept in the order they were checked, so the expired ones are
+    all at the front and a wide sweep does not leave its results behind for
+    the rest of the process.
+    """
+    now = time.monotonic()
+    _connectivity_cache[key] = (now, reachable)
+    _connectivity_cache.move_to_end(key)
+    while _connectivity_cache:
+        checked_at, _ = next(iter(_connectivity_cache.values()))
+        if now - checked_at < cache_ttl and len(_connectivity_cache) <= CONNECTIVITY_CACHE_SIZE:
+            break
+        _connectivity_cache.popitem(last=False)
+
+
+def clear_connectivity_cache() -> None:
+    """Forget all cached reachability results."""
+    _connectivity_cache.clear()
+
+
+# Logger the tapo library's native code reports through (via pyo3-log)
+TAPO_LOGGER_NAME = "tapo"
+
+# Messages suppressed while the current task is inside capture_library_logs()
+_captured_logs: ContextVar[Optional[List[str]]] = ContextVar("captured_logs", default=None)
+
+# Open captures by id(), guarded by _capture_lock: all of them, and those per host
+_capture_lock = threading.Lock()
+_open_captures: Dict[int, List[str]] = {}
+_host_captures: Dict[str, Dict[int, List[str]]] = {}
+
+
+@functools.lru_cache(maxsize=1024)
+def _host_pattern(host: str) -> "re.Pattern[str]":
+    """Match ``host`` in a message, but not as part of a longer address or name."""
+    return re.compile(rf"(?<![\w.-]){re.escape(host)}(?![\w-]|\.\w)")
+
+
+def _capture_buckets(message: str) -> List[List[str]]:
+    """
+    Pick the open captures a library message from another thread belongs to.
+
+    The message goes to the captures for every host it names, or, when it
+    names none, to the only open capture. Call with _capture_lock held.
+    """
+    named = [
+        bucket
+        for host, buckets in _host_captures.items()
+        if host in message and _host_pattern(host).search(message)
+        for bucket in buckets.values()
+    ]
+    if named or len(_open_captures) != 1:
+        return named
+    return list(_open_captures.values())
+
+
+class _LibraryLogCollector(logging.Handler):
+    """
+    Swallow library log records, keeping them for the capture they belong to.
 
-        # Attempt to connect to the host
-        result = sock.connect_ex((host, port))
-        sock.close()
+    The tapo library logs from its own worker threads (through pyo3-log), where
+    the probing task's context is not visible. Such records are attributed by
+    the host they mention; ones that cannot be attributed are only dropped.
+    """
 
-        return result == 0
-    except socket.error:
-        return False
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        entry = f"{record.levelname}: {message}"
+        bucket = _captured_logs.get()
+        if bucket is not None:
+            bucket.append(entry)
+            return
+        with _capture_lock:
+            for bucket in _capture_buckets(message):
+                bucket.append(entry)
+
+
+_log_collector = _LibraryLogCollector()
+_suppression_depth = 0
+_saved_propagate = True
+
+
+@contextmanager
+def suppress_library_logs() -> Iterator[None]:
+    """
+    Keep the tapo library's log output off the console for the duration of the block.
+
+    Instead of swapping ``sys.stderr`` (which concurrent probes would race on), the
+    library logger stops propagating to the root handlers and its records go to a
+    collector. Nested and concurrent uses share one setup, which is undone when the
+    outermost block exits.
+    """
+    global _suppression_depth, _saved_propagate
+    logger = logging.getLogger(TAPO_LOGGER_NAME)
+    if _suppression_depth == 0:
+        _saved_propagate = logger.propagate
+        logger.propagate = False
+        logger.addHandler(_log_collector)
+    _suppression_depth += 1
+    try:
+        yield
+    finally:
+        _suppression_depth -= 1
+        if _suppression_depth == 0:
+            logger.removeHandler(_log_collector)
+            logger.propagate = _saved_propagate
+
+
+@contextmanager
+def capture_library_logs(host: Optional[str] = None) -> Iterator[List[str]]:
+    """
+    Collect the library messages suppressed while inside the block.
+
+    Messages logged by the current task are always collected. Messages the
+    library logs from its own threads are collected when they name ``host``, or
+    when this is the only capture open; read the list once the block has exited.
+    """
+    messages: List[str] = []
+    token = _captured_logs.set(messages)
+    key = id(messages)
+    with _capture_lock:
+        _open_captures[key] = messages
+        if host is not None:
+            _host_captures.setdefault(host, {})[key] = messages
+    try:
+        yield messages
+    finally:
+        with _capture_lock:
+            del _open_captures[key]
+            if host is not None:
+                buckets = _host_captures[host]
+                del buckets[key]
+                if not buckets:
+                    del _host_captures[host]
+        _captured_logs.reset(token)
 
 
 def setup_console() -> Console:
@@ -37,21 +229,98 @@ async def create_tapo_protocol(username: str, password: str) -> ApiClient:
     return client
 
 
-def process_device_data(device_data: Any) -> Dict[str, Any]:
-    """Process raw device data into a standardized format."""
-    # Extract useful properties from device_info object
-    useful_info = {}
-    useful_properties = [
-        'avatar', 'device_on', 'model', 'nickname',
-        'signal_level', 'ssid', 'device_id', 'device_type',
-        'hw_ver', 'mac', 'region', 'type', 'status'
-    ]
+# Properties of a device's info object that discovery always keeps
+DEVICE_FIELDS: FrozenSet[str] = frozenset({
+    'avatar', 'device_on', 'model', 'nickname',
+    'signal_level', 'ssid', 'device_id', 'device_type',
+    'hw_ver', 'mac', 'region', 'type', 'status'
+})
+
+# Further properties that can be requested on top of DEVICE_FIELDS
+EXTENDED_DEVICE_FIELDS: FrozenSet[str] = frozenset({
+    'fw_ver', 'fw_id', 'hw_id', 'oem_id', 'ip', 'rssi', 'lang',
+    'on_time', 'time_diff', 'overheated', 'overheat_status',
+    'overcurrent_status', 'power_protection_status', 'brightness'
+})
+
+_MISSING = object()
+
+
+def device_fields_arg(value: str) -> FrozenSet[str]:
+    """
+    Parse a comma-separated list of extra device info fields for argparse.
+
+    "extended" selects every field in EXTENDED_DEVICE_FIELDS; any other name is
+    read from the device info as-is, so fields added by newer firmware can be
+    requested without a code change.
+    """
+    fields: Set[str] = set()
+    for name in (part.strip() for part in value.split(',')):
+        if not name:
+            continue
+        if name == "extended":
+            fields |= EXTENDED_DEVICE_FIELDS
+        elif name.isidentifier():
+            fields.add(name)
+        else:
+            raise argparse.ArgumentTypeError(f"invalid device field name: {name!r}")
+    return frozenset(fields)
+
+
+@functools.lru_cache(maxsize=128)
+def _field_extractor(cls: type, fields: FrozenSet[str]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Build the extractor for one device info class and field set.
+
+    The tapo library's result classes define their properties on the class and
+    have no instance ``__dict__``, so the fields they provide are resolved once
+    and read together with a single ``attrgetter``. Fields that are not on the
+    class are looked up per object, and only if its instances can carry them.
+    """
+    on_class = tuple(sorted(name for name in fields if hasattr(cls, name)))
+    per_object: Tuple[str, ...] = ()
+    if cls.__dictoffset__ != 0 or hasattr(cls, '__getattr__'):
+        per_object = tuple(sorted(fields.difference(on_class)))
+    get_on_class = operator.attrgetter(*on_class) if on_class else None
+
+    def lookup(device_data: Any, names: Tuple[str, ...]) -> Dict[str, Any]:
+        info = {}
+        for name in names:
+            value = getattr(device_data, name, _MISSING)
+            if value is not _MISSING:
+                info[name] = value
+        return info
+
+    def extract(device_data: Any) -> Dict[str, Any]:
+        if get_on_class is None:
+            return lookup(device_data, per_object)
+        try:
+            values = get_on_class(device_data)
+        except AttributeError:
+            # A property that failed to resolve; fall back to reading fields one by one
+            return lookup(device_data, on_class + per_object)
+        info = dict(zip(on_class, values, strict=True)) if len(on_class) > 1 else {on_class[0]: values}
+        if per_object:
+            info.update(lookup(device_data, per_object))
+        return info
+
+    return extract
+
+
+def process_device_data(device_data: Any, extra_fields: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Process raw device data into a standardized format.
 
-    for property in dir(device_data):
-        if property in useful_properties:
-            useful_info[property] = getattr(device_data, property)
+    Args:
+        device_data: The device info object returned by the Tapo API
+        extra_fields: Properties to keep in addition to DEVICE_FIELDS; ones the
+            device does not have are left out
 
-    return useful_info
+    Returns:
+        Dict[str, Any]: The requested properties the device provides
+    """
+    fields = DEVICE_FIELDS.union(extra_fields) if extra_fields else DEVICE_FIELDS
+    return _field_extractor(type(device_data), fields)(device_data)
 
 
 async def cleanup_resources() -> None:
@@ -0,0 +1,13 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+
+from tapo_chatter.config import clear_config_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_config():
+    """Make every test load its own configuration instead of one cached by an earlier test."""
+    clear_config_cache()
+    yield
+    clear_config_cache()
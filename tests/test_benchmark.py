@@ -0,0 +1,140 @@
+"""Tests for the offline benchmark harness and its simulated fleet."""
+
+import json
+
+import pytest
+
+from tapo_chatter import benchmark, main as monitor
+from tapo_chatter.benchmark import (
+    FleetSpec,
+    SimulatedClient,
+    SimulatedFleet,
+    compare_results,
+    quiet_consoles,
+    run_benchmarks,
+)
+from tapo_chatter.cli import parse_args
+from tapo_chatter.hub_session import HubSession
+from tapo_chatter.models import ChildDevice
+
+SMALL_FLEET = FleetSpec(network="10.99.0.0/26", devices=10, hubs=2, children=4, latency=0.001, jitter=0.0)
+
+
+def test_fleet_is_deterministic():
+    first, second = SimulatedFleet(SMALL_FLEET), SimulatedFleet(SMALL_FLEET)
+    assert list(first.hubs) == list(second.hubs) and list(first.devices) == list(second.devices)
+    assert first.hosts == 12
+    assert all(len(children) == 4 for children in first.children.values())
+
+    with pytest.raises(ValueError):
+        SimulatedFleet(FleetSpec(network="10.99.0.0/30", devices=10))
+
+
+@pytest.mark.asyncio
+async def test_simulated_client_answers_like_the_library():
+    fleet = SimulatedFleet(SMALL_FLEET)
+    client = SimulatedClient(fleet)
+    hub_ip = next(iter(fleet.hubs))
+
+    hub = await client.h100(hub_ip)
+    devices = [ChildDevice.from_api(child) for child in await hub.get_child_device_list()]
+    assert len(devices) == 4 and devices[0].motion_detected is not None
+    assert devices[1].contact_open is not None and devices[0].report_interval == 16
+
+    plug_ip = next(iter(fleet.devices))
+    info = await (await client.generic_device(plug_ip)).get_device_info()
+    assert info.model == "P110" and info.ip == plug_ip
+
+    empty = next(ip for ip in fleet.address_range if ip not in fleet.hubs and ip not in fleet.devices)
+    with pytest.raises(ConnectionRefusedError):
+        await client.generic_device(empty)
+    assert not await fleet.check_host_connectivity(empty)
+
+
+@pytest.mark.asyncio
+async def test_lost_requests_time_out():
+    fleet = SimulatedFleet(FleetSpec(network="10.99.0.0/28", devices=2, hubs=0, loss=1.0, latency=0.001))
+    assert not await fleet.check_host_connectivity(next(iter(fleet.devices)), timeout=0.05)
+    assert fleet.lost == 1
+
+
+def test_quiet_consoles_restores_them():
+    with quiet_consoles():
+        assert benchmark.console.quiet and monitor.console.quiet
+    assert not benchmark.console.quiet and not monitor.console.quiet
+
+
+@pytest.mark.asyncio
+async def test_run_benchmarks_covers_every_scenario(tmp_path):
+    document = await run_benchmarks(SMALL_FLEET, rounds=2, duration=0.3, interval=0.05, timeout=0.2)
+
+    results = {result['scenario']: result for result in document['results']}
+    assert list(results) == ["discovery", "child_devices", "monitor"]
+    assert results['discovery']['devices_found'] == 12
+    assert results['discovery']['items'] == 62
+    assert results['child_devices']['items'] == 2 * 2 * 4
+    assert results['monitor']['items'] >= 2 and results['monitor']['renders'] >= 1
+    for result in results.values():
+        assert result['wall_time'] > 0 and result['throughput'] > 0
+        assert result['memory_peak_bytes'] > 0
+        assert set(result['loop_lag']) == {'mean', 'p99', 'max'}
+
+    path = tmp_path / "results.json"
+    benchmark.write_results(document, path)
+    assert json.loads(path.read_text())['fleet']['devices'] == 10
+
+
+def test_compare_results_flags_throughput_drops():
+    baseline = {'results': [{'scenario': 'discovery', 'throughput': 100.0},
+                            {'scenario': 'monitor', 'throughput': 10.0}]}
+    current = {'results': [{'scenario': 'discovery', 'throughput': 70.0},
+                           {'scenario': 'monitor', 'throughput': 9.0},
+                           {'scenario': 'child_devices', 'throughput': 5.0}]}
+
+    regressions = compare_results(current, baseline, tolerance=0.2)
+
+    assert len(regressions) == 1 and regressions[0].startswith("discovery:")
+
+
+@pytest.mark.asyncio
+async def test_benchmark_main_fails_on_regression(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({'results': [{'scenario': 'child_devices', 'throughput': 1e9}]}))
+    output = tmp_path / "out.json"
+
+    passed = await benchmark.benchmark_main(SMALL_FLEET, scenarios=("child_devices",), output=output,
+                                            baseline=baseline, rounds=1, trace_memory=False)
+
+    assert not passed
+    assert json.loads(output.read_text())['results'][0]['memory_peak_bytes'] is None
+
+
+def test_benchmark_arguments():
+    args = parse_args(["benchmark", "--devices", "50", "--loss", "0.1", "--scenario", "monitor", "--no-memory"])
+    assert args.mode == "benchmark"
+    assert args.devices == 50 and args.loss == 0.1 and args.scenario == ["monitor"] and args.no_memory
+    assert args.hubs == FleetSpec().hubs
+
+
+@pytest.mark.asyncio
+async def test_simulated_hub_pages_match_the_full_list():
+    fleet = SimulatedFleet(FleetSpec(network="10.99.0.0/28", devices=0, hubs=1, children=23, latency=0.001))
+    hub_ip = next(iter(fleet.hubs))
+    session = HubSession(SimulatedClient(fleet), hub_ip)
+
+    pages = [[ChildDevice.from_json(entry) for entry in page] async for page in session.iter_child_device_pages()]
+
+    assert [len(page) for page in pages] == [10, 10, 3]
+    assert [device for page in pages for device in page] == [
+        ChildDevice.from_api(child) for child in fleet.children[hub_ip]
+    ]
+    assert fleet.child_list_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_monitor_scenario_runs_paged():
+    document = await run_benchmarks(SMALL_FLEET, scenarios=("monitor",), duration=0.3, interval=0.05,
+                                    paged=True, trace_memory=False)
+
+    result = document['results'][0]
+    assert document['settings']['paged'] and result['items'] >= 2 and result['renders'] >= 1
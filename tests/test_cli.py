@@ -0,0 +1,94 @@
+"""Tests for the unified CLI's lazy loading of modes."""
+
+import subprocess
+import sys
+
+import pytest
+
+import tapo_chatter
+from tapo_chatter.cli import parse_args
+
+
+def loaded_modules(code: str) -> set:
+    """Run ``code`` in a fresh interpreter and return the modules it left imported."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_version_loads_no_mode():
+    modules = loaded_modules(
+        "import sys; sys.argv = ['tapo-chatter', '--version']\n"
+        "from tapo_chatter.cli import main_cli; main_cli()"
+    )
+    assert "tapo_chatter.cli" in modules
+    assert not modules & {"tapo", "rich", "asyncio", "dotenv", "netifaces", "tapo_chatter.utils"}
+
+
+def test_monitor_mode_loads_only_what_it_uses():
+    modules = loaded_modules(
+        "from tapo_chatter.cli import parse_args, monitor_mode\n"
+        "parse_args(['monitor', '--interval', '5'])\n"
+        "import tapo_chatter.main"
+    )
+    assert not modules & {"tapo_chatter.discover", "tapo_chatter.device_discovery",
+                          "tapo_chatter.server", "tapo_chatter.benchmark", "netifaces"}
+
+
+def test_selected_mode_arguments_are_parsed():
+    args = parse_args(["discover", "--limit", "auto", "--fields", "fw_ver"])
+    assert args.mode == "discover" and args.limit == "auto" and args.fields == frozenset({"fw_ver"})
+
+    args = parse_args(["--version"])
+    assert args.version and args.mode is None
+
+    with pytest.raises(SystemExit):
+        parse_args(["monitor", "--limit", "5"])
+
+
+def test_package_exports_resolve_lazily():
+    from tapo_chatter.models import ChildDevice
+
+    assert tapo_chatter.ChildDevice is ChildDevice
+    assert "discover_devices" in dir(tapo_chatter)
+    with pytest.raises(AttributeError):
+        tapo_chatter.not_an_export  # noqa: B018
+
+
+@pytest.mark.parametrize("mode", ["monitor", "serve"])
+def test_polling_modes_share_their_poll_options(mode):
+    args = parse_args([mode, "--ip", "10.0.0.2", "--interval", "5", "--adaptive", "--max-interval", "60", "--paged"])
+    assert args.ip == ["10.0.0.2"] and args.interval == 5
+    assert args.adaptive and args.max_interval == 60 and args.paged and args.history is None
+
+
+@pytest.mark.parametrize("credentials, port_taken, message", [
+    (True, True, "address already in use"),
+    (False, False, "TAPO_USERNAME and TAPO_PASSWORD"),
+])
+def test_serve_reports_startup_errors_without_a_traceback(tmp_path, credentials, port_taken, message):
+    import os
+    import socket
+
+    env = {key: value for key, value in os.environ.items() if not key.startswith("TAPO_")}
+    # Run from an empty directory, so no .env file is found, with this package importable
+    package_root = os.path.dirname(os.path.dirname(tapo_chatter.__file__))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    env["COLUMNS"] = "300"
+    if credentials:
+        env.update(TAPO_USERNAME="user@example.com", TAPO_PASSWORD="secret")
+    with socket.socket() as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        port = busy.getsockname()[1] if port_taken else 0
+        result = subprocess.run(
+            [sys.executable, "-m", "tapo_chatter.cli", "serve", "--ip", "127.0.0.1",
+             "--host", "127.0.0.1", "--port", str(port)],
+            capture_output=True, text=True, cwd=tmp_path, env=env, timeout=30,
+        )
+
+    assert result.returncode == 1
+    assert "Fatal Error" in result.stdout and message in result.stdout
+    assert "Traceback" not in result.stderr
@@ -2,8 +2,18 @@ import os
 from unittest import mock
 
 import pytest
+from dotenv import dotenv_values
 
-from tapo_chatter.config import TapoConfig
+from tapo_chatter.config import (
+    ConfigCache,
+    IpRange,
+    TapoConfig,
+    count_ip_addresses,
+    iter_ip_addresses,
+    merge_ip_ranges,
+    parse_hub_addresses,
+    parse_ip_ranges,
+)
 
 # Valid and invalid inputs for testing
 VALID_IP = "192.168.1.1"
@@ -188,3 +198,154 @@ def test_console_instance():
     assert hasattr(tapo_chatter.config, "console")
     from rich.console import Console
     assert isinstance(tapo_chatter.config.console, Console)
+
+@pytest.mark.parametrize(
+    "ip_range, expected_first, expected_last",
+    [
+        ("192.168.1.100", "192.168.1.100", "192.168.1.100"),
+        ("192.168.1.100-192.168.1.110", "192.168.1.100", "192.168.1.110"),
+        ("192.168.1.100-110", "192.168.1.100", "192.168.1.110"),
+        ("192.168.1.0/24", "192.168.1.1", "192.168.1.254"),
+        ("10.0.0.0/22", "10.0.0.1", "10.0.3.254"),
+        ("10.0.0.250-10.0.1.5", "10.0.0.250", "10.0.1.5"),
+        ("10.0.0.7/32", "10.0.0.7", "10.0.0.7"),
+    ]
+)
+def test_ip_range_from_string(ip_range, expected_first, expected_last):
+    parsed = IpRange.from_string(ip_range)
+    assert str(parsed.first) == expected_first
+    assert str(parsed.last) == expected_last
+
+def test_ip_range_from_string_rejects_reversed_range():
+    with pytest.raises(ValueError):
+        IpRange.from_string("192.168.1.20-192.168.1.10")
+
+def test_ip_range_iteration_and_length():
+    ip_range = IpRange.from_string("10.0.0.254-10.0.1.1")
+    assert len(ip_range) == 4
+    assert list(ip_range) == ["10.0.0.254", "10.0.0.255", "10.0.1.0", "10.0.1.1"]
+
+def test_merge_ip_ranges_deduplicates_overlaps():
+    ranges = parse_ip_ranges("10.0.0.0/22, 10.0.1.10-10.0.1.20, 10.0.3.255-10.0.4.3, 192.168.1.5")
+    merged = merge_ip_ranges(ranges)
+    assert [str(r) for r in merged] == ["10.0.0.1-10.0.4.3", "192.168.1.5"]
+    assert count_ip_addresses(ranges) == sum(len(r) for r in merged)
+
+def test_iter_ip_addresses_yields_each_address_once():
+    addresses = list(iter_ip_addresses(parse_ip_ranges("10.0.0.1-10.0.0.3,10.0.0.2,10.0.0.3-10.0.0.4")))
+    assert addresses == ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"]
+
+def test_ip_range_still_accepts_the_subnet_form():
+    with pytest.warns(DeprecationWarning):
+        by_keyword = IpRange(subnet="192.168.1", start=10, end=20)
+    with pytest.warns(DeprecationWarning):
+        by_position = IpRange("192.168.1", 10, 20)
+    assert by_keyword == by_position == IpRange.from_string("192.168.1.10-192.168.1.20")
+    assert (by_keyword.subnet, by_keyword.start, by_keyword.end) == ("192.168.1", 10, 20)
+    assert IpRange.from_string("10.0.0.0/22").end == 255
+
+def test_get_discovery_params_still_reports_the_first_merged_range():
+    config = TapoConfig(username=VALID_EMAIL, password="pw",
+                        ip_ranges=parse_ip_ranges("192.168.5.10-192.168.5.20,10.0.0.5-10.0.0.9,10.0.0.8-10.0.0.12"))
+    with pytest.warns(DeprecationWarning):
+        assert config.get_discovery_params() == ("10.0.0", (5, 12))
+    with pytest.warns(DeprecationWarning):
+        assert TapoConfig(username=VALID_EMAIL, password="pw").get_discovery_params() == (None, (1, 254))
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TAPO_USERNAME": VALID_EMAIL,
+        "TAPO_PASSWORD": "test_password",
+        "TAPO_IP_RANGE": "10.0.0.0/22,192.168.5.10-192.168.5.20",
+    },
+)
+def test_from_env_parses_all_ip_ranges():
+    config = TapoConfig.from_env()
+    assert [str(r) for r in config.ip_ranges] == ["10.0.0.1-10.0.3.254", "192.168.5.10-192.168.5.20"]
+
+def test_parse_hub_addresses_deduplicates_and_validates():
+    assert parse_hub_addresses("10.0.0.5, 10.0.0.6,10.0.0.5,") == ["10.0.0.5", "10.0.0.6"]
+    with pytest.raises(ValueError):
+        parse_hub_addresses("10.0.0.5,10.0.0")
+
+def test_hub_addresses_falls_back_to_ip_address():
+    config = TapoConfig(username=VALID_EMAIL, password="pass123", ip_address=VALID_IP)
+    assert config.hub_addresses == [VALID_IP]
+    assert TapoConfig(username=VALID_EMAIL, password="pass123").hub_addresses == []
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TAPO_USERNAME": VALID_EMAIL,
+        "TAPO_PASSWORD": "test_password",
+        "TAPO_IP_ADDRESS": "192.168.1.10,192.168.1.11",
+    },
+)
+def test_from_env_parses_multiple_hubs():
+    config = TapoConfig.from_env()
+    assert config.ip_address == "192.168.1.10"
+    assert config.hub_addresses == ["192.168.1.10", "192.168.1.11"]
+
+
+def write_dotenv(path, text, mtime):
+    path.write_text(text)
+    os.utime(path, ns=(mtime, mtime))
+
+
+@mock.patch.dict(os.environ, {"TAPO_IP_RANGE": "10.0.0.0/30"}, clear=True)
+def test_config_cache_loads_once_and_reloads_on_change(tmp_path):
+    dotenv = tmp_path / ".env"
+    write_dotenv(dotenv, f"TAPO_USERNAME={VALID_EMAIL}\nTAPO_PASSWORD=first\nTAPO_IP_RANGE=10.9.9.0/24\n",
+                 1_000_000_000)
+    cache = ConfigCache(str(dotenv))
+
+    with mock.patch("tapo_chatter.config.dotenv_values", wraps=dotenv_values) as parse, \
+            mock.patch("tapo_chatter.config.load_dotenv") as load_dotenv:
+        config = cache.get()
+        assert cache.get() is config
+        assert cache.reload_if_changed() is None
+    assert parse.call_count == 1
+    load_dotenv.assert_not_called()
+    assert config.password == "first"
+    # Variables from the real environment win over the file, as with load_dotenv()
+    assert config.ip_ranges == [IpRange.from_string("10.0.0.0/30")]
+
+    write_dotenv(dotenv, f"TAPO_USERNAME={VALID_EMAIL}\nTAPO_PASSWORD=second\n", 2_000_000_000)
+    reloaded = cache.reload_if_changed()
+    assert reloaded is not None and reloaded.password == "second"
+    assert cache.get() is reloaded
+    assert os.environ["TAPO_IP_RANGE"] == "10.0.0.0/30"
+
+
+@mock.patch.dict(os.environ, {}, clear=True)
+def test_config_cache_reload_picks_up_an_edited_key(tmp_path):
+    dotenv = tmp_path / ".env"
+    write_dotenv(dotenv, f"TAPO_USERNAME={VALID_EMAIL}\nTAPO_PASSWORD=secret\nTAPO_IP_ADDRESS=10.0.0.5\n",
+                 1_000_000_000)
+    cache = ConfigCache(str(dotenv))
+    assert cache.get().ip_address == "10.0.0.5"
+
+    write_dotenv(dotenv, f"TAPO_USERNAME={VALID_EMAIL}\nTAPO_PASSWORD=secret\nTAPO_IP_ADDRESS=10.0.0.6\n",
+                 2_000_000_000)
+    with mock.patch("tapo_chatter.config.dotenv_values", wraps=dotenv_values) as parse:
+        reloaded = cache.reload_if_changed()
+    assert reloaded is not None and reloaded.ip_address == "10.0.0.6"
+    assert parse.call_count == 1
+    assert "TAPO_IP_ADDRESS" not in os.environ
+
+
+@mock.patch.dict(os.environ, {}, clear=True)
+def test_config_cache_keeps_previous_config_when_file_breaks(tmp_path):
+    dotenv = tmp_path / ".env"
+    write_dotenv(dotenv, f"TAPO_USERNAME={VALID_EMAIL}\nTAPO_PASSWORD=secret\n", 1_000_000_000)
+    cache = ConfigCache(str(dotenv))
+    config = cache.get()
+
+    write_dotenv(dotenv, f"TAPO_USERNAME={VALID_EMAIL}\n", 2_000_000_000)
+    with pytest.raises(ValueError):
+        cache.reload_if_changed()
+    assert "TAPO_PASSWORD" not in os.environ
+    # Reported once; the previous configuration stays in use
+    assert cache.reload_if_changed() is None
+    assert cache.get() is config
@@ -0,0 +1,357 @@
+"""Tests for network device discovery."""
+
+import argparse
+import asyncio
+from contextlib import aclosing
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from tapo_chatter.config import parse_ip_ranges
+from tapo_chatter.device_discovery import (
+    discover_devices,
+    iter_discover_devices,
+    scan_addresses,
+    sweep_open_hosts,
+)
+from tapo_chatter.tuning import AdaptiveTuner
+from tapo_chatter.utils import (
+    EXTENDED_DEVICE_FIELDS,
+    capture_library_logs,
+    device_fields_arg,
+    process_device_data,
+    suppress_library_logs,
+)
+
+
+@pytest.fixture(autouse=True)
+def open_ports():
+    """Make the pre-filter port sweep see every host as open unless a test says otherwise."""
+    with mock.patch("tapo_chatter.device_discovery.check_host_connectivity",
+                    new_callable=mock.AsyncMock, return_value=True) as check:
+        yield check
+
+
+def make_fleet_client(devices, delays=None):
+    """Build a mock ApiClient whose generic_device() answers only for known IPs."""
+    delays = delays or {}
+
+    async def generic_device(ip_address):
+        await asyncio.sleep(delays.get(ip_address, 0))
+        if ip_address not in devices:
+            raise ConnectionRefusedError
+        device = mock.Mock()
+        device.get_device_info = mock.AsyncMock(return_value=devices[ip_address])
+        return device
+
+    client = mock.Mock()
+    client.generic_device = mock.AsyncMock(side_effect=generic_device)
+    return client
+
+
+def device_info(nickname, model="P100", device_type="SMART.TAPOPLUG"):
+    return SimpleNamespace(nickname=nickname, model=model, type=device_type)
+
+
+@pytest.mark.asyncio
+async def test_iter_discover_devices_yields_as_found():
+    """Devices are yielded in the order they respond, not in address order."""
+    client = make_fleet_client(
+        {"10.0.0.2": device_info("slow"), "10.0.0.3": device_info("fast")},
+        delays={"10.0.0.2": 0.05},
+    )
+
+    found = [
+        device["device_info"]["nickname"]
+        async for device in iter_discover_devices(client, subnet="10.0.0", ip_range=(1, 4), timeout_seconds=1)
+    ]
+
+    assert found == ["fast", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_iter_discover_devices_consumer_break_cancels_probes():
+    """Stopping iteration early cancels the probes still in flight."""
+    client = make_fleet_client(
+        {"10.0.0.1": device_info("first")},
+        delays={f"10.0.0.{octet}": 5 for octet in range(2, 6)},
+    )
+    error_stats = {}
+
+    scan = iter_discover_devices(client, subnet="10.0.0", ip_range=(1, 5),
+                                 timeout_seconds=10, error_stats=error_stats)
+    async with aclosing(scan):
+        async for device in scan:
+            assert device["ip_address"] == "10.0.0.1"
+            break
+
+    assert error_stats["cancelled"] == 4
+
+
+@pytest.mark.asyncio
+async def test_discover_devices_collects_results_and_errors():
+    """discover_devices returns the full list plus error statistics."""
+    client = make_fleet_client({"10.0.0.1": device_info("hub", "H100", "SMART.TAPOHUB")})
+
+    devices, error_stats = await discover_devices(client, subnet="10.0.0", ip_range=(1, 3), timeout_seconds=1)
+
+    assert [device["ip_address"] for device in devices] == ["10.0.0.1"]
+    assert devices[0]["device_info"]["model"] == "H100"
+    assert set(error_stats) >= {"timeout", "connection_refused", "cancelled", "other"}
+
+
+@pytest.mark.asyncio
+async def test_failed_probes_reach_the_tuner_and_error_stats():
+    """Refused hosts count as errors, and only real devices are sampled for the timeout."""
+    client = make_fleet_client({"10.0.0.1": device_info("a"), "10.0.0.2": device_info("b")})
+    tuner = AdaptiveTuner(initial_limit=4)
+
+    devices, error_stats = await discover_devices(client, subnet="10.0.0", ip_range=(1, 10),
+                                                  prefilter=False, tuner=tuner)
+
+    assert len(devices) == 2
+    assert error_stats["connection_refused"] == 8 and error_stats["cancelled"] == 0
+    assert tuner.responses == 2 and tuner.errors == 8
+
+
+@pytest.mark.asyncio
+async def test_discover_devices_stop_after():
+    """The scan stops once stop_after devices have been found."""
+    client = make_fleet_client(
+        {"10.0.0.1": device_info("a"), "10.0.0.2": device_info("b")},
+        delays={"10.0.0.2": 5},
+    )
+
+    devices, error_stats = await discover_devices(client, subnet="10.0.0", ip_range=(1, 2),
+                                                  timeout_seconds=10, stop_after=1)
+
+    assert len(devices) == 1
+    assert error_stats["cancelled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scan_addresses_bounds_concurrency_and_pulls_lazily():
+    """Only `limit` probes run at once and addresses are consumed on demand."""
+    in_flight = 0
+    peak = 0
+
+    async def probe(address):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return address
+
+    pulled = 0
+
+    def addresses():
+        nonlocal pulled
+        for i in range(100_000):
+            pulled += 1
+            yield f"10.{i // 65536}.{i // 256 % 256}.{i % 256}"
+
+    scan = scan_addresses(addresses(), probe, limit=8, timeout_seconds=1)
+    async with aclosing(scan):
+        results = [item async for _, item in _take(scan, 50)]
+
+    assert len(results) == 50
+    assert peak <= 8
+    assert pulled < 100
+
+
+@pytest.mark.asyncio
+async def test_scan_addresses_reports_exceptions():
+    """Probe failures and timeouts are yielded as exception outcomes."""
+    async def probe(address):
+        if address == "slow":
+            await asyncio.sleep(1)
+        if address == "bad":
+            raise ConnectionRefusedError
+        return "ok"
+
+    outcomes = {address: outcome async for address, outcome in
+                scan_addresses(["good", "bad", "slow"], probe, limit=3, timeout_seconds=0.05)}
+
+    assert outcomes["good"] == "ok"
+    assert isinstance(outcomes["bad"], ConnectionRefusedError)
+    assert isinstance(outcomes["slow"], asyncio.TimeoutError)
+
+
+async def _take(iterator, count):
+    async for item in iterator:
+        yield item
+        count -= 1
+        if count == 0:
+            return
+
+
+@pytest.mark.asyncio
+async def test_discover_devices_scans_multiple_ranges_once():
+    """Overlapping ranges across subnets are merged and each address probed once."""
+    client = make_fleet_client({"10.0.1.7": device_info("vlan-a"), "10.0.9.3": device_info("vlan-b")})
+    ip_ranges = parse_ip_ranges("10.0.0.0/23,10.0.1.0-10.0.1.10,10.0.9.3")
+
+    devices, _ = await discover_devices(client, ip_ranges=ip_ranges, limit=50, timeout_seconds=1)
+
+    assert sorted(device["ip_address"] for device in devices) == ["10.0.1.7", "10.0.9.3"]
+    probed = [call.args[0] for call in client.generic_device.call_args_list]
+    assert len(probed) == len(set(probed)) == 511
+
+
+@pytest.mark.asyncio
+async def test_prefilter_only_probes_hosts_with_open_port(open_ports):
+    """Hosts that refuse the Tapo port never reach the authenticated probe."""
+    open_ports.side_effect = lambda ip, **kwargs: ip in {"10.0.0.3", "10.0.0.9"}
+    client = make_fleet_client({"10.0.0.3": device_info("plug")})
+
+    devices, error_stats = await discover_devices(client, subnet="10.0.0", ip_range=(1, 20), timeout_seconds=1)
+
+    assert [device["ip_address"] for device in devices] == ["10.0.0.3"]
+    assert sorted(call.args[0] for call in client.generic_device.call_args_list) == ["10.0.0.3", "10.0.0.9"]
+    assert error_stats["port_closed"] == 18
+    assert error_stats["cancelled"] == 0
+    open_ports.assert_any_call("10.0.0.1", port=80, timeout=1, cache_ttl=0)
+
+
+@pytest.mark.asyncio
+async def test_sweep_open_hosts_passes_on_open_hosts_and_counts_the_rest():
+    async def check(ip, port, timeout, cache_ttl):
+        assert (port, cache_ttl) == (9999, 0)
+        return ip.endswith((".2", ".4"))
+
+    error_stats = {}
+    addresses = [f"10.0.0.{octet}" for octet in range(1, 6)]
+
+    hosts = [ip async for ip in sweep_open_hosts(addresses, check, port=9999, error_stats=error_stats)]
+
+    assert sorted(hosts) == ["10.0.0.2", "10.0.0.4"]
+    assert error_stats == {"port_closed": 3}
+
+
+@pytest.mark.asyncio
+async def test_prefilter_can_be_disabled(open_ports):
+    """With prefilter=False every address goes straight to the Tapo probe."""
+    client = make_fleet_client({})
+
+    await discover_devices(client, subnet="10.0.0", ip_range=(1, 5), timeout_seconds=1, prefilter=False)
+
+    open_ports.assert_not_called()
+    assert client.generic_device.await_count == 5
+
+
+@pytest.mark.asyncio
+async def test_scan_suppresses_library_logs_and_collects_them_per_probe(capsys):
+    """Library log output stays off stderr during a scan and can be collected per host."""
+    import logging
+    import sys
+
+    async def generic_device(ip_address):
+        logging.getLogger("tapo.api").warning("handshake failed for %s", ip_address)
+        raise ConnectionRefusedError
+
+    client = mock.Mock()
+    client.generic_device = mock.AsyncMock(side_effect=generic_device)
+    original_stderr = sys.stderr
+    probe_logs = {}
+
+    await discover_devices(client, subnet="10.0.0", ip_range=(1, 3), timeout_seconds=1, probe_logs=probe_logs)
+
+    assert sys.stderr is original_stderr
+    assert "handshake failed" not in capsys.readouterr().err
+    assert probe_logs == {
+        f"10.0.0.{octet}": [f"WARNING: handshake failed for 10.0.0.{octet}"] for octet in range(1, 4)
+    }
+    assert logging.getLogger("tapo").propagate is True
+    assert not logging.getLogger("tapo").handlers
+
+
+@pytest.mark.asyncio
+async def test_library_logs_from_native_threads_reach_the_probe_they_name():
+    """Records the library emits on its own threads are attributed by the host in them."""
+    import logging
+    import threading
+
+    def native_log(ip_address):
+        logging.getLogger("tapo.api.protocol").warning(
+            "Discover error: error sending request for url (http://%s/)", ip_address)
+
+    async def generic_device(ip_address):
+        await asyncio.sleep(0.01)
+        thread = threading.Thread(target=native_log, args=(ip_address,))
+        thread.start()
+        thread.join()
+        raise ConnectionRefusedError
+
+    client = mock.Mock()
+    client.generic_device = mock.AsyncMock(side_effect=generic_device)
+    probe_logs = {}
+
+    await discover_devices(client, subnet="10.0.0", ip_range=(1, 12), timeout_seconds=1,
+                           prefilter=False, probe_logs=probe_logs)
+
+    assert probe_logs == {
+        f"10.0.0.{octet}": [
+            f"WARNING: Discover error: error sending request for url (http://10.0.0.{octet}/)"
+        ]
+        for octet in range(1, 13)
+    }
+
+
+def test_a_lone_capture_keeps_native_thread_logs_without_a_host():
+    """With a single capture open, thread records that name no host still land in it."""
+    import logging
+    import threading
+
+    def native_log():
+        logging.getLogger("tapo.api.protocol").warning("Performing handshake1...")
+
+    with suppress_library_logs(), capture_library_logs("10.0.0.7") as messages:
+        thread = threading.Thread(target=native_log)
+        thread.start()
+        thread.join()
+
+    assert messages == ["WARNING: Performing handshake1..."]
+
+
+def test_process_device_data_reads_requested_fields():
+    info = SimpleNamespace(nickname="plug", model="P110", fw_ver="1.2.3", on_time=3600, secret="x")
+
+    assert process_device_data(info) == {"nickname": "plug", "model": "P110"}
+    assert process_device_data(info, ["fw_ver", "on_time", "power_protection_status"]) == {
+        "nickname": "plug", "model": "P110", "fw_ver": "1.2.3", "on_time": 3600,
+    }
+
+
+def test_process_device_data_reads_class_properties():
+    class DeviceInfoResult:
+        """Like the library's result classes: properties on the class, no instance __dict__."""
+        __slots__ = ("_nickname",)
+
+        def __init__(self, nickname):
+            self._nickname = nickname
+
+        nickname = property(lambda self: self._nickname)
+        model = "P100"
+
+    assert process_device_data(DeviceInfoResult("a")) == {"nickname": "a", "model": "P100"}
+    assert process_device_data(DeviceInfoResult("b"), ["fw_ver"]) == {"nickname": "b", "model": "P100"}
+
+
+@pytest.mark.asyncio
+async def test_discovery_reports_extra_fields():
+    info = SimpleNamespace(nickname="plug", model="P110", type="SMART.TAPOPLUG", fw_ver="1.2.3")
+    client = make_fleet_client({"10.0.0.1": info})
+
+    devices, _ = await discover_devices(client, ip_ranges=parse_ip_ranges("10.0.0.1"),
+                                        extra_fields=frozenset({"fw_ver"}))
+
+    assert devices[0]["device_info"]["fw_ver"] == "1.2.3"
+
+
+def test_device_fields_arg():
+    assert device_fields_arg("fw_ver, on_time,") == {"fw_ver", "on_time"}
+    assert device_fields_arg("extended") == EXTENDED_DEVICE_FIELDS
+    with pytest.raises(argparse.ArgumentTypeError):
+        device_fields_arg("fw-ver")
@@ -0,0 +1,129 @@
+"""Tests for the discover command's sweep and hub child-device output."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+
+from tapo_chatter import discover
+from tapo_chatter.config import parse_ip_ranges
+from tapo_chatter.discovery_cache import DiscoveryCache
+from tapo_chatter.models import ChildDevice
+
+
+def make_hub(ip_address, nickname):
+    return {'ip_address': ip_address, 'device_info': {'nickname': nickname, 'model': 'H100'}}
+
+
+@pytest.fixture
+def printed():
+    """Collect the hub section headers and child tables in print order."""
+    lines = []
+    with mock.patch.object(discover.console, "print",
+                           side_effect=lambda *args, **kwargs: lines.append(str(args[0]) if args else "")), \
+            mock.patch.object(discover, "print_additional_device_info_table"), \
+            mock.patch.object(discover, "print_child_device_table",
+                              side_effect=lambda children: lines.append(f"table:{children[0].nickname}")):
+        yield lines
+
+
+@pytest.mark.asyncio
+async def test_hubs_are_fetched_concurrently_and_printed_in_order(printed):
+    delays = {"10.0.0.1": 0.1, "10.0.0.2": 0.0, "10.0.0.3": 0.05}
+    in_flight = 0
+    peak = 0
+
+    async def get_child_devices(client, host, quiet=False):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(delays[host])
+        in_flight -= 1
+        return [ChildDevice(nickname=f"child-of-{host}")]
+
+    hubs = [make_hub(ip, f"hub{i}") for i, ip in enumerate(delays, start=1)]
+    with mock.patch.object(discover, "get_child_devices", side_effect=get_child_devices):
+        started = asyncio.get_running_loop().time()
+        await discover.print_hub_child_devices(hubs, mock.Mock(), limit=3)
+        elapsed = asyncio.get_running_loop().time() - started
+
+    tables = [line for line in printed if line.startswith("table:")]
+    assert tables == ["table:child-of-10.0.0.1", "table:child-of-10.0.0.2", "table:child-of-10.0.0.3"]
+    assert peak == 3
+    assert elapsed < 0.14
+
+
+@pytest.mark.asyncio
+async def test_hub_fetches_respect_limit(printed):
+    in_flight = 0
+    peak = 0
+
+    async def get_child_devices(client, host, quiet=False):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return []
+
+    hubs = [make_hub(f"10.0.0.{i}", f"hub{i}") for i in range(1, 7)]
+    with mock.patch.object(discover, "get_child_devices", side_effect=get_child_devices):
+        await discover.print_hub_child_devices(hubs, mock.Mock(), limit=2)
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_hub_times_out_without_holding_up_others(printed):
+    async def get_child_devices(client, host, quiet=False):
+        if host == "10.0.0.1":
+            await asyncio.sleep(5)
+        return [ChildDevice(nickname=f"child-of-{host}")]
+
+    hubs = [make_hub("10.0.0.1", "slow"), make_hub("10.0.0.2", "fast")]
+    with mock.patch.object(discover, "get_child_devices", side_effect=get_child_devices):
+        await discover.print_hub_child_devices(hubs, mock.Mock(), hub_timeout=0.05)
+
+    assert any("Timed out after 0.05s" in line and "10.0.0.1" in line for line in printed)
+    assert "table:child-of-10.0.0.2" in printed
+
+
+@pytest.mark.asyncio
+async def test_failing_hub_reports_its_error_under_its_header(printed):
+    async def get_child_devices(client, host, quiet=False):
+        assert quiet
+        if host == "10.0.0.1":
+            raise ConnectionError(f"Cannot reach host {host}")
+        return [ChildDevice(nickname=f"child-of-{host}")]
+
+    hubs = [make_hub("10.0.0.1", "down"), make_hub("10.0.0.2", "up")]
+    with mock.patch.object(discover, "get_child_devices", side_effect=get_child_devices):
+        await discover.print_hub_child_devices(hubs, mock.Mock())
+
+    sections = [line for line in printed if "=====" in line or "Error" in line or line.startswith("table:")]
+    assert "down" in sections[0]
+    assert "Cannot reach host 10.0.0.1" in sections[1]
+    assert "up" in sections[2] and sections[3] == "table:child-of-10.0.0.2"
+    assert not any("No child devices found" in line for line in printed)
+
+
+@pytest.mark.asyncio
+async def test_sweep_skips_fresh_targets_and_records_a_full_sweep(printed, tmp_path):
+    targets = parse_ip_ranges("10.0.0.0/29")
+    cache = DiscoveryCache(tmp_path / "cache.json")
+    found = [{'ip_address': "10.0.0.2", 'device_info': {'device_id': "known"}}]
+    swept = {'ip_address': "10.0.0.5", 'device_info': {'device_id': "new"}}
+    scan = mock.AsyncMock(return_value=([swept], {'timeout': 3}))
+
+    assert await discover.sweep_unless_fresh(scan, cache, targets, found, prefilter=False) == (
+        [swept], {'timeout': 3})
+    scan.assert_awaited_once_with(ip_ranges=targets, stop_after=None, exclude={"10.0.0.2"}, prefilter=False)
+    assert cache.known_ips() == ["10.0.0.5"]
+
+    scan.reset_mock()
+    assert await discover.sweep_unless_fresh(scan, cache, targets, found) == ([], {})
+    assert await discover.sweep_unless_fresh(scan, cache, targets, found, stop_after=1) == ([], {})
+    scan.assert_not_awaited()
+
+    await discover.sweep_unless_fresh(scan, cache, targets, found, rescan=True, stop_after=3)
+    scan.assert_awaited_once_with(ip_ranges=targets, stop_after=2, exclude={"10.0.0.2"})
@@ -0,0 +1,75 @@
+"""Tests for the on-disk discovery cache."""
+
+import json
+from unittest import mock
+
+from tapo_chatter.config import parse_ip_ranges
+from tapo_chatter.discovery_cache import CACHE_VERSION, DiscoveryCache, targets_key
+
+
+def device(ip, **info):
+    return {"ip_address": ip, "device_info": {"device_id": f"id-{ip}", "model": "P100", **info}}
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = DiscoveryCache(path)
+    cache.record(device("10.0.0.5", mac="AA:BB", nickname="Plug", type="SMART.TAPOPLUG"))
+    cache.mark_swept(parse_ip_ranges("10.0.0.0/24"))
+    cache.save()
+
+    loaded = DiscoveryCache.load(path)
+    assert loaded.known_ips() == ["10.0.0.5"]
+    entry = loaded.devices["10.0.0.5"]
+    assert entry["device_id"] == "id-10.0.0.5"
+    assert entry["mac"] == "AA:BB"
+    assert "last_seen" in entry
+    assert not loaded.is_stale(parse_ip_ranges("10.0.0.0/24"))
+
+
+def test_missing_or_corrupt_file_gives_empty_cache(tmp_path):
+    assert DiscoveryCache.load(tmp_path / "missing.json").devices == {}
+
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    assert DiscoveryCache.load(corrupt).devices == {}
+
+    old_version = tmp_path / "old.json"
+    old_version.write_text(json.dumps({"version": CACHE_VERSION + 1, "devices": {"10.0.0.1": {}}}))
+    assert DiscoveryCache.load(old_version).devices == {}
+
+
+def test_known_ips_filters_by_targets_and_sorts_numerically(tmp_path):
+    cache = DiscoveryCache(tmp_path / "cache.json")
+    for ip in ("10.0.0.20", "10.0.0.3", "192.168.1.4"):
+        cache.record(device(ip))
+
+    assert cache.known_ips() == ["10.0.0.3", "10.0.0.20", "192.168.1.4"]
+    assert cache.known_ips(parse_ip_ranges("10.0.0.0/24")) == ["10.0.0.3", "10.0.0.20"]
+
+
+def test_staleness_is_tracked_per_target_set(tmp_path):
+    cache = DiscoveryCache(tmp_path / "cache.json")
+    targets = parse_ip_ranges("10.0.0.0/24")
+
+    with mock.patch("tapo_chatter.discovery_cache.time.time", return_value=1000.0):
+        assert cache.is_stale(targets)
+        cache.mark_swept(targets)
+    with mock.patch("tapo_chatter.discovery_cache.time.time", return_value=1000.0 + 60):
+        assert not cache.is_stale(targets, max_age=120)
+        assert cache.is_stale(targets, max_age=30)
+        assert cache.is_stale(parse_ip_ranges("10.0.1.0/24"))
+
+    # Equivalent target lists share a key
+    assert targets_key(parse_ip_ranges("10.0.0.1-10.0.0.100,10.0.0.101-10.0.0.254")) == targets_key(targets)
+
+
+def test_save_drops_devices_past_retention(tmp_path):
+    cache = DiscoveryCache(tmp_path / "cache.json")
+    with mock.patch("tapo_chatter.discovery_cache.time.time", return_value=1000.0):
+        cache.record(device("10.0.0.1"))
+    cache.record(device("10.0.0.2"))
+
+    cache.save(retention=3600)
+
+    assert DiscoveryCache.load(tmp_path / "cache.json").known_ips() == ["10.0.0.2"]
@@ -0,0 +1,150 @@
+"""Tests for child device change detection."""
+
+import datetime
+
+import pytest
+
+from tapo_chatter.events import DeviceStateStore, EventType, rssi_band
+from tapo_chatter.models import ChildDevice
+
+
+def child(device_id="dev1", nickname="Hall Sensor", online=True, rssi=-60, **fields):
+    return ChildDevice(device_id=device_id, nickname=nickname, online=online, rssi=rssi, **fields)
+
+
+def test_first_snapshot_is_a_silent_baseline():
+    store = DeviceStateStore()
+    assert store.diff("hub", [child(motion_detected=True)]) == []
+
+
+def test_unchanged_snapshot_emits_nothing():
+    store = DeviceStateStore()
+    store.diff("hub", [child(motion_detected=False)])
+    assert store.diff("hub", [child(motion_detected=False, hw_ver="1.1")]) == []
+
+
+def test_transitions_are_typed():
+    store = DeviceStateStore()
+    store.diff("hub", [child(motion_detected=False, contact_open=False, battery_low=False, rssi=-60)])
+
+    events = store.diff("hub", [child(motion_detected=True, contact_open=True,
+                                      battery_low=True, online=False, rssi=-80)])
+
+    changes = {event.type: (event.old, event.new) for event in events}
+    assert changes == {
+        EventType.MOTION: ("Clear", "Detected"),
+        EventType.CONTACT: ("Closed", "Open"),
+        EventType.STATUS: ("Online", "Offline"),
+        EventType.BATTERY: ("OK", "Low"),
+        EventType.RSSI_BAND: ("good", "poor"),
+    }
+    assert all(event.device_id == "dev1" and event.hub == "hub" for event in events)
+
+
+def test_rssi_change_within_band_is_not_an_event():
+    store = DeviceStateStore()
+    store.diff("hub", [child(rssi=-50)])
+    assert store.diff("hub", [child(rssi=-60)]) == []
+
+
+def test_added_and_removed_devices():
+    store = DeviceStateStore()
+    store.diff("hub", [child("a", "A")])
+
+    events = store.diff("hub", [child("b", "B")])
+
+    assert {(event.type, event.device_id) for event in events} == {
+        (EventType.ADDED, "b"),
+        (EventType.REMOVED, "a"),
+    }
+
+
+def test_events_carry_the_snapshot_timestamp():
+    store = DeviceStateStore()
+    store.diff("hub", [child("a", "A", motion_detected=False)])
+    sampled_at = datetime.datetime(2024, 5, 1, 12, 0, 0)
+
+    events = store.diff("hub", [child("a", "A", motion_detected=True), child("b", "B")], sampled_at)
+
+    assert len(events) == 2 and all(event.timestamp == sampled_at for event in events)
+
+
+def test_hubs_are_tracked_separately():
+    store = DeviceStateStore()
+    store.diff("hub1", [child(motion_detected=False)])
+    assert store.diff("hub2", [child(motion_detected=True)]) == []
+
+
+@pytest.mark.parametrize("rssi, band", [(0, "good"), (-64, "good"), (-70, "fair"), (-75, "poor"), ("N/A", None)])
+def test_rssi_band(rssi, band):
+    assert rssi_band(rssi) == band
+
+
+@pytest.mark.asyncio
+async def test_update_publishes_to_subscribers_in_order():
+    store = DeviceStateStore()
+    received = []
+
+    async def subscriber(event):
+        received.append((event.type, event.new))
+
+    async def failing(event):
+        raise RuntimeError("boom")
+
+    store.subscribe(failing)
+    unsubscribe = store.subscribe(subscriber)
+    await store.update("hub", [child(motion_detected=False)])
+    await store.update("hub", [child(motion_detected=True, contact_open=None)])
+    await store.update("hub", [child(motion_detected=False)])
+
+    assert received == [(EventType.MOTION, "Detected"), (EventType.MOTION, "Clear")]
+
+    unsubscribe()
+    await store.update("hub", [child(motion_detected=True)])
+    assert len(received) == 2
+
+
+async def pages_of(*pages):
+    for page in pages:
+        yield page
+
+
+@pytest.mark.asyncio
+async def test_paged_updates_publish_each_page_as_it_arrives():
+    store = DeviceStateStore()
+    received = []
+
+    async def subscriber(event):
+        received.append(event.device_id)
+
+    store.subscribe(subscriber)
+    await store.update_pages("hub", pages_of([child("a", motion_detected=False)], [child("b"), child("c")]))
+    assert received == []
+
+    async def snapshot():
+        yield [child("a", motion_detected=True)]
+        # The first page's event is out before the second page is fetched
+        assert received == ["a"]
+        yield [child("b")]
+
+    devices, events = await store.update_pages("hub", snapshot())
+
+    assert [device.device_id for device in devices] == ["a", "b"]
+    assert [(event.type, event.device_id) for event in events] == [(EventType.MOTION, "a"), (EventType.REMOVED, "c")]
+    assert received == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_interrupted_paged_snapshot_does_not_repeat_events():
+    store = DeviceStateStore()
+    store.diff("hub", [child("a", motion_detected=False), child("b")])
+
+    async def failing_snapshot():
+        yield [child("a", motion_detected=True)]
+        raise ConnectionError("lost the hub")
+
+    with pytest.raises(ConnectionError):
+        await store.update_pages("hub", failing_snapshot())
+
+    # Device "b" is not treated as removed, and the motion event is not reported twice
+    assert store.diff("hub", [child("a", motion_detected=True), child("b")]) == []
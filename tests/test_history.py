@@ -0,0 +1,106 @@
+"""Tests for the child device reading history."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+
+from tapo_chatter.history import HistoryStore, reading_values
+from tapo_chatter.main import HubState, poll_hub
+from tapo_chatter.models import ChildDevice
+
+
+def child(device_id="dev1", rssi=-60, online=True, **fields):
+    return ChildDevice(device_id=device_id, nickname=f"Sensor {device_id}", device_type="T100",
+                       online=online, rssi=rssi, **fields)
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore(tmp_path / "history.sqlite3")
+    yield history
+    history.close()
+
+
+def test_reading_values():
+    values = reading_values(child(rssi=None, online=False, motion_detected=True,
+                                  battery_low=True, jamming_rssi=-90))
+    assert values == {"rssi": None, "jamming_rssi": -90, "online": 0, "motion": 1,
+                      "contact": None, "battery_low": 1}
+
+
+def test_uses_wal_journal(store):
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_record_and_query_by_device_and_time(store):
+    assert store.record("hub", [child("a", rssi=-60), child("b", rssi=-70)], ts=1000) == 2
+    store.record("hub", [child("a", rssi=-65, motion_detected=True)], ts=1010)
+    store.record("hub", [child("a", rssi=-66)], ts=1020)
+
+    readings = store.query("a", start=1005, end=1020)
+
+    assert [(r.ts, r.rssi, r.motion) for r in readings] == [(1010, -65, 1), (1020, -66, None)]
+    assert [r.rssi for r in store.query("b")] == [-70]
+    assert store.query("missing") == []
+
+
+def test_history_survives_reopening(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    first = HistoryStore(path)
+    first.record("hub", [child("a")], ts=1000)
+    first.close()
+
+    second = HistoryStore(path)
+    second.record("hub", [child("a")], ts=1010)
+    assert [r.ts for r in second.query("a")] == [1000, 1010]
+    second.close()
+
+
+def test_downsample_merges_old_readings_into_weighted_buckets(store):
+    for ts, rssi in ((0, -60), (60, -70), (120, -80)):
+        store.record("hub", [child("a", rssi=rssi)], ts=ts)
+    store.record("hub", [child("a", rssi=-50)], ts=10_000)
+
+    removed = store.downsample(older_than=1000, bucket=900, now=10_000)
+
+    readings = store.query("a")
+    assert removed == 2
+    assert [(r.ts, r.rssi, r.samples) for r in readings] == [(0, -70, 3), (10_000, -50, 1)]
+
+    # Downsampling again keeps merged buckets intact
+    assert store.downsample(older_than=1000, bucket=900, now=10_000) == 0
+    assert store.query("a")[0].samples == 3
+
+
+def test_prune_applies_retention(store):
+    store.record("hub", [child("a")], ts=100)
+    store.record("hub", [child("a")], ts=5000)
+
+    assert store.prune(retention=1000, now=5500) == 1
+    assert [r.ts for r in store.query("a")] == [5000]
+
+
+@pytest.mark.asyncio
+async def test_append_runs_off_the_event_loop(store):
+    written = await store.append("hub", [child("a"), child("b")], ts=1000)
+    assert written == 2
+    assert len(store.query("a")) == 1
+
+
+@pytest.mark.asyncio
+async def test_poll_hub_appends_each_snapshot(store):
+    snapshots = [[child("a", rssi=-60)], [child("a", rssi=-61)]]
+
+    async def fake_get_child_devices(client, host, session=None, quiet=False, check_connectivity=None):
+        if not snapshots:
+            raise asyncio.CancelledError
+        return snapshots.pop(0)
+
+    state = HubState(host="10.0.0.1", session=mock.Mock())
+    with mock.patch("tapo_chatter.main.get_child_devices", side_effect=fake_get_child_devices), \
+            mock.patch("tapo_chatter.history.time.time", side_effect=[1000, 1010]):
+        with pytest.raises(asyncio.CancelledError):
+            await poll_hub(mock.Mock(), state, 0, asyncio.Event(), history=store)
+
+    assert [r.rssi for r in store.query("a")] == [-60, -61]
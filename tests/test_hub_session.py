@@ -0,0 +1,134 @@
+"""Tests for the persistent hub session used by monitor mode."""
+
+from unittest import mock
+
+import pytest
+
+from tapo_chatter.hub_session import HubSession
+from tapo_chatter.main import get_child_devices
+
+
+def make_client(hub):
+    client = mock.AsyncMock()
+    client.h100 = mock.AsyncMock(return_value=hub)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_session_reuses_handshake_across_calls():
+    """Only the first request performs a handshake."""
+    hub = mock.AsyncMock()
+    hub.get_child_device_list = mock.AsyncMock(return_value=[])
+    client = make_client(hub)
+    session = HubSession(client, "192.168.1.10")
+
+    for _ in range(3):
+        await session.get_child_device_list()
+
+    client.h100.assert_awaited_once_with("192.168.1.10")
+    assert session.handshakes == 1
+    assert session.handshakes_avoided == 2
+    assert hub.get_child_device_list.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_session_reauthenticates_after_failure():
+    """A failed request on a reused session triggers one re-handshake and retry."""
+    hub = mock.AsyncMock()
+    hub.get_child_device_list = mock.AsyncMock(side_effect=[[], Exception("session expired"), ["child"]])
+    client = make_client(hub)
+    session = HubSession(client, "192.168.1.10")
+
+    await session.get_child_device_list()
+    result = await session.get_child_device_list()
+
+    assert result == ["child"]
+    assert client.h100.await_count == 2
+    assert session.handshakes == 2
+    assert session.handshakes_avoided == 0
+
+
+@pytest.mark.asyncio
+async def test_session_failure_on_fresh_handshake_is_raised():
+    """A failure right after a handshake is not retried."""
+    hub = mock.AsyncMock()
+    hub.get_child_device_list = mock.AsyncMock(side_effect=Exception("bad hub"))
+    client = make_client(hub)
+    session = HubSession(client, "192.168.1.10")
+
+    with pytest.raises(Exception, match="bad hub"):
+        await session.get_child_device_list()
+
+    assert not session.is_authenticated
+    client.h100.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_session_expires_after_max_age():
+    """A session older than max_age is re-established."""
+    hub = mock.AsyncMock()
+    hub.get_child_device_list = mock.AsyncMock(return_value=[])
+    client = make_client(hub)
+    session = HubSession(client, "192.168.1.10", max_age=30)
+
+    now = [100.0]
+    with mock.patch("tapo_chatter.hub_session.time.monotonic", side_effect=lambda: now[0]):
+        await session.get_child_device_list()  # handshake at t=100
+        now[0] = 110.0
+        await session.get_child_device_list()  # reused
+        now[0] = 140.0
+        await session.get_child_device_list()  # expired
+
+    assert session.handshakes == 2
+    assert session.handshakes_avoided == 1
+
+
+@pytest.mark.asyncio
+async def test_get_child_devices_uses_session():
+    """get_child_devices fetches through the session instead of calling client.h100."""
+    hub = mock.AsyncMock()
+    hub.get_child_device_list = mock.AsyncMock(return_value=[])
+    client = make_client(hub)
+    session = HubSession(client, "192.168.1.10")
+
+    with mock.patch("tapo_chatter.main.check_host_connectivity", return_value=True):
+        await get_child_devices(client, "192.168.1.10", session=session)
+        await get_child_devices(client, "192.168.1.10", session=session)
+
+    client.h100.assert_awaited_once()
+    assert session.handshakes_avoided == 1
+
+
+def page(start, total, size=10):
+    return {
+        "child_device_list": [{"device_id": str(i)} for i in range(start, min(start + size, total))],
+        "start_index": start,
+        "sum": total,
+    }
+
+
+@pytest.mark.asyncio
+async def test_pages_are_fetched_until_the_hub_reports_all_children():
+    hub = mock.AsyncMock()
+    hub.get_child_device_list_json = mock.AsyncMock(side_effect=lambda start: page(start, 23))
+    session = HubSession(make_client(hub), "192.168.1.10")
+
+    pages = [children async for children in session.iter_child_device_pages()]
+
+    assert [len(children) for children in pages] == [10, 10, 3]
+    assert [call.args[0] for call in hub.get_child_device_list_json.await_args_list] == [0, 10, 20]
+    assert session.handshakes == 1 and session.handshakes_avoided == 2
+
+
+@pytest.mark.asyncio
+async def test_paging_without_a_total_stops_on_a_short_page():
+    hub = mock.AsyncMock()
+    hub.get_child_device_list_json = mock.AsyncMock(
+        side_effect=lambda start: {"child_device_list": page(start, 10)["child_device_list"]})
+    session = HubSession(make_client(hub), "192.168.1.10")
+
+    pages = [children async for children in session.iter_child_device_pages()]
+
+    # A full page may be followed by more, so an empty one ends the list
+    assert [len(children) for children in pages] == [10]
+    assert hub.get_child_device_list_json.await_count == 2
@@ -1,5 +1,7 @@
 """Tests for the main module and core functionality."""
 
+import asyncio
+import dataclasses
 import datetime
 import os
 import socket
@@ -9,9 +11,24 @@ from typing import Any, Dict
 from unittest import mock
 
 import pytest
+from rich.console import Console
 from tapo import ApiClient
 
-from tapo_chatter.main import check_host_connectivity, get_child_devices, main
+from tapo_chatter import utils
+from tapo_chatter.config import TapoConfig
+from tapo_chatter.events import DeviceStateStore
+from tapo_chatter.hub_session import HubSession
+from tapo_chatter.main import (
+    HubState,
+    MonitorView,
+    check_host_connectivity,
+    follow_credentials,
+    get_child_devices,
+    main,
+    poll_hub,
+)
+from tapo_chatter.models import ChildDevice
+from tapo_chatter.utils import clear_connectivity_cache
 
 
 def test_version():
@@ -43,66 +60,218 @@ async def test_main_output(capsys: pytest.CaptureFixture[str]) -> None:
             assert captured.err == ""
 
 @pytest.mark.asyncio
-async def test_check_host_connectivity_success():
+async def test_main_polls_every_hub_concurrently_with_one_client():
+    """All configured hubs are polled in one loop, sharing the ApiClient."""
+    config = TapoConfig(username="user", password="pass", hub_ips=["10.0.0.1", "10.0.0.2"])
+    polled_sessions = {}
+    rendered = []
+
+    class StopMonitor(Exception):
+        pass
+
+    async def fake_get_child_devices(client, host, session=None, quiet=False, check_connectivity=None):
+        polled_sessions[host] = session
+        return [ChildDevice(nickname=f"child-of-{host}")]
+
+    def fake_render(view):
+        rendered.append({state.host: state.devices for state in view.states})
+        if all(state.updated_at for state in view.states):
+            raise StopMonitor
+        return ""
+
+    with mock.patch("tapo_chatter.main.ApiClient") as mock_api_client, \
+            mock.patch("tapo_chatter.main.get_child_devices", side_effect=fake_get_child_devices), \
+            mock.patch("tapo_chatter.main.MonitorView.render", autospec=True, side_effect=fake_render):
+        with pytest.raises(StopMonitor):
+            await main(refresh_interval=60, config=config)
+
+    mock_api_client.assert_called_once_with("user", "pass")
+    assert rendered[-1] == {
+        "10.0.0.1": [ChildDevice(nickname="child-of-10.0.0.1")],
+        "10.0.0.2": [ChildDevice(nickname="child-of-10.0.0.2")],
+    }
+    assert {session.host for session in polled_sessions.values()} == {"10.0.0.1", "10.0.0.2"}
+    assert all(session.client is mock_api_client.return_value for session in polled_sessions.values())
+
+@pytest.mark.asyncio
+async def test_main_requires_a_hub(capsys: pytest.CaptureFixture[str]):
+    config = TapoConfig(username="user", password="pass")
+    with pytest.raises(ValueError):
+        await main(config=config)
+    assert "No hub IP address configured" in capsys.readouterr().out
+
+@pytest.mark.asyncio
+async def test_follow_credentials_switches_sessions_to_a_new_client():
+    config = TapoConfig(username="user", password="old", hub_ips=["10.0.0.1"])
+    old_session = HubSession(mock.Mock(), "10.0.0.1")
+    state = HubState(host="10.0.0.1", session=old_session)
+    reloads = [None, ValueError("TAPO_PASSWORD missing"), dataclasses.replace(config, password="new")]
+
+    def fake_reload():
+        result = reloads.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    with mock.patch("tapo_chatter.main.reload_config_if_changed", side_effect=fake_reload), \
+            mock.patch("tapo_chatter.main.ApiClient") as mock_api_client:
+        follower = asyncio.create_task(follow_credentials([state], config, check_interval=0))
+        while reloads:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        follower.cancel()
+        await asyncio.gather(follower, return_exceptions=True)
+
+    mock_api_client.assert_called_once_with("user", "new")
+    assert state.session is not old_session and state.session.client is mock_api_client.return_value
+
+def test_monitor_view_reformats_only_changed_rows():
+    session = mock.Mock(handshakes=1, handshakes_avoided=0)
+    device_a = ChildDevice(nickname="A", device_id="a", online=True, rssi=-60)
+    device_b = ChildDevice(nickname="B", device_id="b", online=True, rssi=-70)
+    state = HubState(host="10.0.0.1", session=session, devices=[device_a, device_b],
+                     updated_at=datetime.datetime.now())
+    view = MonitorView([state])
+
+    view.render()
+    assert view.rows_formatted == 2
+
+    view.render()
+    assert view.rows_formatted == 2
+
+    state.devices = [device_a, dataclasses.replace(device_b, online=False)]
+    group = view.render()
+    assert view.rows_formatted == 3
+
+    console = Console(record=True, width=200)
+    console.print(group)
+    assert "Offline" in console.export_text()
+
+@pytest.mark.asyncio
+async def test_get_child_devices_quiet_raises_instead_of_reporting(capsys: pytest.CaptureFixture[str]):
+    with mock.patch("tapo_chatter.main.check_host_connectivity", new_callable=mock.AsyncMock, return_value=False):
+        with pytest.raises(ConnectionError):
+            await get_child_devices(mock.Mock(), "10.0.0.1", quiet=True)
+    assert capsys.readouterr().out == ""
+
+@pytest.mark.asyncio
+async def test_poll_hub_signals_only_changed_snapshots():
+    snapshots = [
+        [ChildDevice(device_id="a", nickname="A", online=True, motion_detected=False)],
+        [ChildDevice(device_id="a", nickname="A", online=True, motion_detected=False)],
+        [ChildDevice(device_id="a", nickname="A", online=True, motion_detected=True)],
+    ]
+    state = HubState(host="10.0.0.1", session=mock.Mock())
+    store = DeviceStateStore()
+    events = []
+    signals = []
+    updated = asyncio.Event()
+
+    async def on_event(event):
+        events.append(event)
+
+    store.subscribe(on_event)
+
+    async def fake_get_child_devices(client, host, session=None, quiet=False, check_connectivity=None):
+        if not snapshots:
+            raise asyncio.CancelledError
+        signals.append(updated.is_set())
+        updated.clear()
+        return snapshots.pop(0)
+
+    with mock.patch("tapo_chatter.main.get_child_devices", side_effect=fake_get_child_devices):
+        with pytest.raises(asyncio.CancelledError):
+            await poll_hub(mock.Mock(), state, 0, updated, store)
+
+    # Polls 2 and 3 see whether the previous poll signalled a change
+    assert signals == [False, True, False]
+    assert updated.is_set()
+    assert [(event.old, event.new) for event in events] == [("Clear", "Detected")]
+
+@pytest.fixture
+def mock_open_connection():
+    """Patch asyncio.open_connection and reset the reachability cache around the test."""
+    clear_connectivity_cache()
+    writer = mock.Mock()
+    writer.wait_closed = mock.AsyncMock()
+    with mock.patch("tapo_chatter.utils.asyncio.open_connection",
+                    new_callable=mock.AsyncMock, return_value=(mock.Mock(), writer)) as open_conn:
+        open_conn.writer = writer
+        yield open_conn
+    clear_connectivity_cache()
+
+@pytest.mark.asyncio
+async def test_check_host_connectivity_success(mock_open_connection):
     """Test successful host connectivity."""
-    with mock.patch("socket.socket") as mock_socket_constructor:
-        mock_sock_instance = mock.Mock()
-        mock_sock_instance.connect_ex.return_value = 0  # 0 indicates success
-        mock_socket_constructor.return_value = mock_sock_instance
-
-        result = await check_host_connectivity("192.168.1.1", 80, timeout=2.0)
-        assert result is True
-        mock_socket_constructor.assert_called_once_with(socket.AF_INET, socket.SOCK_STREAM)
-        mock_sock_instance.settimeout.assert_called_once_with(2.0)
-        mock_sock_instance.connect_ex.assert_called_once_with(("192.168.1.1", 80))
-        mock_sock_instance.close.assert_called_once()
+    result = await check_host_connectivity("192.168.1.1", 80, timeout=2.0)
+    assert result is True
+    mock_open_connection.assert_awaited_once_with("192.168.1.1", 80)
+    mock_open_connection.writer.close.assert_called_once()
 
 @pytest.mark.asyncio
-async def test_check_host_connectivity_failure():
+async def test_check_host_connectivity_failure(mock_open_connection):
     """Test failed host connectivity (e.g., connection refused)."""
-    with mock.patch("socket.socket") as mock_socket_constructor:
-        mock_sock_instance = mock.Mock()
-        mock_sock_instance.connect_ex.return_value = 1  # Non-zero indicates failure
-        mock_socket_constructor.return_value = mock_sock_instance
-
-        result = await check_host_connectivity("192.168.1.100", 80, timeout=2.0)
-        assert result is False
-        mock_socket_constructor.assert_called_once_with(socket.AF_INET, socket.SOCK_STREAM)
-        mock_sock_instance.settimeout.assert_called_once_with(2.0)
-        mock_sock_instance.connect_ex.assert_called_once_with(("192.168.1.100", 80))
-        mock_sock_instance.close.assert_called_once()
+    mock_open_connection.side_effect = ConnectionRefusedError
+
+    result = await check_host_connectivity("192.168.1.100", 80, timeout=2.0)
+    assert result is False
+    mock_open_connection.assert_awaited_once_with("192.168.1.100", 80)
 
 @pytest.mark.asyncio
-async def test_check_host_connectivity_socket_error():
+async def test_check_host_connectivity_socket_error(mock_open_connection):
     """Test connectivity check when a socket.error occurs."""
-    with mock.patch("socket.socket") as mock_socket_constructor:
-        mock_sock_instance = mock.Mock()
-        mock_sock_instance.connect_ex.side_effect = socket.error
-        mock_socket_constructor.return_value = mock_sock_instance
-
-        result = await check_host_connectivity("example.com", 80, timeout=2.0)
-        assert result is False
-        mock_socket_constructor.assert_called_once_with(socket.AF_INET, socket.SOCK_STREAM)
-        mock_sock_instance.settimeout.assert_called_once_with(2.0)
-        mock_sock_instance.connect_ex.assert_called_once_with(("example.com", 80))
-        # .close() is not asserted here as it might not be reached if connect_ex() raises an error
-        # and there isn't a try/finally block in the original code ensuring sock.close().
+    mock_open_connection.side_effect = socket.error
+
+    result = await check_host_connectivity("example.com", 80, timeout=2.0)
+    assert result is False
 
 @pytest.mark.asyncio
-async def test_check_host_connectivity_custom_timeout():
-    """Test host connectivity with a custom timeout value."""
-    with mock.patch("socket.socket") as mock_socket_constructor:
-        mock_sock_instance = mock.Mock()
-        mock_sock_instance.connect_ex.return_value = 0  # Success
-        mock_socket_constructor.return_value = mock_sock_instance
-
-        custom_timeout = 5.0
-        result = await check_host_connectivity("10.0.0.5", 443, timeout=custom_timeout)
-        assert result is True
-        mock_socket_constructor.assert_called_once_with(socket.AF_INET, socket.SOCK_STREAM)
-        mock_sock_instance.settimeout.assert_called_once_with(custom_timeout)
-        mock_sock_instance.connect_ex.assert_called_once_with(("10.0.0.5", 443))
-        mock_sock_instance.close.assert_called_once()
+async def test_check_host_connectivity_timeout_does_not_block(mock_open_connection):
+    """An unresponsive host times out without blocking the event loop."""
+    async def never_connects(host, port):
+        await asyncio.sleep(10)
+
+    mock_open_connection.side_effect = never_connects
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    result = await check_host_connectivity("10.0.0.9", 80, timeout=0.1)
+    ticker_task.cancel()
+
+    assert result is False
+    assert ticks > 1
+
+@pytest.mark.asyncio
+async def test_check_host_connectivity_caches_result(mock_open_connection):
+    """Repeated checks within the TTL reuse the cached result."""
+    assert await check_host_connectivity("10.0.0.5", 443) is True
+    assert await check_host_connectivity("10.0.0.5", 443) is True
+    mock_open_connection.assert_awaited_once()
+
+    # A zero TTL always probes again
+    assert await check_host_connectivity("10.0.0.5", 443, cache_ttl=0) is True
+    assert mock_open_connection.await_count == 2
+
+@pytest.mark.asyncio
+async def test_check_host_connectivity_cache_drops_expired_and_excess_entries(mock_open_connection):
+    """The cache forgets expired results and never holds more than its size."""
+    with mock.patch("tapo_chatter.utils.time.monotonic", return_value=100.0):
+        await check_host_connectivity("10.0.0.1", 80)
+    with mock.patch("tapo_chatter.utils.time.monotonic", return_value=200.0):
+        await check_host_connectivity("10.0.0.2", 80)
+    assert list(utils._connectivity_cache) == [("10.0.0.2", 80)]
+
+    with mock.patch.object(utils, "CONNECTIVITY_CACHE_SIZE", 3), \
+            mock.patch("tapo_chatter.utils.time.monotonic", return_value=200.0):
+        for octet in range(3, 8):
+            await check_host_connectivity(f"10.0.0.{octet}", 80)
+    assert list(utils._connectivity_cache) == [(f"10.0.0.{octet}", 80) for octet in range(5, 8)]
 
 @pytest.mark.asyncio
 async def test_get_child_devices_connectivity_failure(capsys: pytest.CaptureFixture[str]):
@@ -229,86 +398,49 @@ async def test_get_child_devices_success_and_processing(capsys: pytest.CaptureFi
 
         # --- Assertions for Device 1 --- (Uncommented)
         dev1 = processed_devices[0]
-        assert dev1["nickname"] == "Living Room Sensor"
-        assert dev1["device_id"] == "device123"
-        assert dev1["device_type"] == "T100"
-        assert dev1["status"] == 1 # Online (from mock_device_1_data["status"].name)
-        assert dev1["rssi"] == -55
-        assert dev1["params"]["battery_state"] == "OK"
-        assert dev1["params"]["motion_status"] == "Detected"
-        assert dev1["params"]["contact_status"] == "Closed"
-        assert dev1["params"]["hw_ver"] == "1.0.0"
-        assert dev1["params"]["jamming_rssi"] == -80
-        assert dev1["params"]["last_onboarded"] == datetime.datetime.fromtimestamp(1678886400).strftime('%Y-%m-%d %H:%M:%S')
-        assert dev1["params"]["mac"] == "AA:BB:CC:DD:EE:FF"
-        assert dev1["params"]["region"] == "EU"
-        assert dev1["params"]["report_interval"] == "60" # Note: stored as string
-        assert dev1["params"]["signal_level"] == "4"    # Note: stored as string
+        assert isinstance(dev1, ChildDevice)
+        assert dev1.nickname == "Living Room Sensor"
+        assert dev1.device_id == "device123"
+        assert dev1.device_type == "T100"
+        assert dev1.online is True # Online (from the status string)
+        assert dev1.rssi == -55
+        assert dev1.battery_low is False
+        assert dev1.battery_state == "OK"
+        assert dev1.motion_status == "Detected"
+        assert dev1.contact_status == "Closed"
+        assert dev1.hw_ver == "1.0.0"
+        assert dev1.jamming_rssi == -80
+        assert dev1.last_onboarded == datetime.datetime.fromtimestamp(1678886400)
+        assert dev1.mac == "AA:BB:CC:DD:EE:FF"
+        assert dev1.region == "EU"
+        assert dev1.report_interval == 60 # Note: kept as a number
+        assert dev1.signal_level == 4
 
         # --- Assertions for Device 2 --- (Uncommented)
         dev2 = processed_devices[1]
-        assert dev2["nickname"] == "Kitchen Switch"
-        assert dev2["device_id"] == "device456"
-        assert dev2["device_type"] == "S200B" # From .type attribute
-        assert dev2["status"] == 1 # Online (from boolean True)
-        assert dev2["rssi"] == -75
-        assert dev2["params"]["battery_state"] == "Low"
-        assert "motion_status" not in dev2["params"] # No motion data
-        assert "contact_status" not in dev2["params"] # No contact data
-        assert dev2["params"]["last_onboarded"] == "N/A" # Invalid timestamp
+        assert dev2.nickname == "Kitchen Switch"
+        assert dev2.device_id == "device456"
+        assert dev2.device_type == "S200B" # From .type attribute
+        assert dev2.online is True # Online (from boolean True)
+        assert dev2.rssi == -75
+        assert dev2.battery_state == "Low"
+        assert dev2.motion_status is None # No motion data
+        assert dev2.contact_status is None # No contact data
+        assert dev2.last_onboarded is None # Invalid timestamp
+        assert dev2.signal_level is None # Non-numeric signal level
 
         # --- Assertions for Device 3 (to_dict failed) --- (Uncommented)
         dev3 = processed_devices[2]
-        assert dev3["nickname"] == "Faulty Device"
-        assert dev3["device_id"] == "device789"
-        assert dev3["device_type"] == "T300"
-        assert dev3["status"] == 0 # Offline (from explicit 0)
-        assert dev3["rssi"] == "N/A" # Should be N/A as to_dict failed before rssi could be read
-        # Params should contain N/A for all keys that are unconditionally .get() from device_data_from_to_dict
-        expected_dev3_params = {
-            'hw_ver': "N/A",
-            'jamming_rssi': "N/A",
-            'last_onboarded': "N/A",
-            'mac': "N/A",
-            'region': "N/A",
-            'report_interval': "N/A",
-            'signal_level': "N/A"
-        }
-        assert dev3["params"] == expected_dev3_params
+        assert dev3 == ChildDevice(nickname="Faulty Device", device_id="device789", device_type="T300", online=False)
 
         # --- Assertions for Device 4 (Unknown type, None status) --- (Uncommented)
         dev4 = processed_devices[3]
-        assert dev4["nickname"] == "Unknown Type Device"
-        assert dev4["device_id"] == "device000"
-        assert dev4["device_type"] == "Unknown" # No type attributes
-        assert dev4["status"] == 0 # Offline (from None status)
-        assert dev4["rssi"] == -65 # RSSI from minimal dict
-        # Check default for missing params not in its minimal to_dict
-        expected_dev4_params = {
-            'hw_ver': "N/A",
-            'jamming_rssi': "N/A",
-            'last_onboarded': "N/A",
-            'mac': "N/A",
-            'region': "N/A",
-            'report_interval': "N/A",
-            'signal_level': "N/A"
-            # battery_state, motion_status, contact_status will be missing as their keys aren't in to_dict
-        }
-        assert dev4["params"] == expected_dev4_params
+        assert dev4 == ChildDevice(nickname="Unknown Type Device", device_id="device000", rssi=-65)
 
         # --- Assertions for Device 5 (Integer status) ---
         dev5 = processed_devices[4]
-        assert dev5["nickname"] == "Integer Status Device"
-        assert dev5["device_id"] == "device555"
-        assert dev5["device_type"] == "T110"
-        assert dev5["status"] == 1 # Online (from integer 1 status)
-        assert dev5["rssi"] == -60
-        # Params for dev5 would be N/A for hw_ver etc. as not in its to_dict, similar to dev4
-        expected_dev5_params = {
-            'hw_ver': "N/A", 'jamming_rssi': "N/A", 'last_onboarded': "N/A",
-            'mac': "N/A", 'region': "N/A", 'report_interval': "N/A", 'signal_level': "N/A"
-        }
-        assert dev5["params"] == expected_dev5_params
+        assert dev5 == ChildDevice(nickname="Integer Status Device", device_id="device555",
+                                   device_type="T110", online=True, rssi=-60)
 
         # Check console output for success messages
         captured = capsys.readouterr()
@@ -356,8 +488,7 @@ def test_print_additional_device_info_table_empty(capsys: pytest.CaptureFixture[
         (0, "[green]0[/green]"),        # No jamming
         (-70, "[yellow]-70[/yellow]"), # Moderate jamming
         (-60, "[red]-60[/red]"),      # High jamming
-        ("N/A", "N/A"),               # N/A value
-        (None, "None")                # None value should be str(None)
+        (None, "N/A")                 # Not reported
     ]
 )
 def test_print_additional_device_info_table_jamming_rssi(
@@ -369,22 +500,17 @@ def test_print_additional_device_info_table_jamming_rssi(
     from tapo_chatter.main import print_additional_device_info_table
 
     devices = [
-        {
-            "nickname": "Test Device",
-            "params": {
-                'hw_ver': "1.0", 'mac': "AA:BB:CC", 'region': "EU",
-                'signal_level': "3", 'battery_state': "OK",
-                'jamming_rssi': jamming_rssi_val,
-                'report_interval': "60", 'last_onboarded': "2023-01-01"
-            }
-        }
+        ChildDevice(
+            nickname="Test Device", hw_ver="1.0", mac="AA:BB:CC", region="EU",
+            signal_level=3, battery_low=False, jamming_rssi=jamming_rssi_val,
+            report_interval=60, last_onboarded=datetime.datetime(2023, 1, 1),
+        )
     ]
     print_additional_device_info_table(devices)
     captured = capsys.readouterr()
     # Check for the plain value, not the Rich tags, in the output string.
     # Rich table output can be complex, so look for the value itself.
-    # Convert jamming_rssi_val to string for assertion, as it appears in the table.
-    assert str(jamming_rssi_val) in captured.out
+    assert (str(jamming_rssi_val) if jamming_rssi_val is not None else "N/A") in captured.out
 
 def test_print_device_table_empty(capsys: pytest.CaptureFixture[str]):
     """Test print_device_table with no devices."""
@@ -400,19 +526,16 @@ def test_print_device_table_empty(capsys: pytest.CaptureFixture[str]):
         (0, "[green]0[/green]"),          # Also strong (per code logic)
         (-70, "[yellow]-70[/yellow]"),   # Fair signal
         (-80, "[red]-80[/red]"),        # Poor signal
-        ("N/A", "N/A"),                 # N/A value
-        (None, "None")                  # None should become str(None), then N/A by code if not int/float.
-                                        # Actually, code is: rssi_value if isinstance(rssi_value, (int, float)) else "N/A"
-                                        # So None becomes "N/A"
+        (None, "N/A")                   # Not reported
     ]
 )
 def test_print_device_table_rssi_formatting(capsys: pytest.CaptureFixture[str], rssi_val: Any, expected_rssi_segment: str):
     """Test print_device_table for RSSI value formatting."""
     from tapo_chatter.main import print_device_table
-    devices = [{
-        "nickname": "RSSI Device", "device_id": "rssi01", "device_type": "T100",
-        "status": 1, "rssi": rssi_val, "params": {}
-    }]
+    devices = [ChildDevice(
+        nickname="RSSI Device", device_id="rssi01", device_type="T100",
+        online=True, rssi=rssi_val,
+    )]
     print_device_table(devices)
     captured = capsys.readouterr()
 
@@ -423,14 +546,14 @@ def test_print_device_table_rssi_formatting(capsys: pytest.CaptureFixture[str],
 @pytest.mark.parametrize(
     "device_type, params, expected_details",
     [
-        ("T100", {"motion_status": "Detected"}, "Motion: Detected"),
-        ("T100", {"motion_status": "Clear"}, "Motion: Clear"),
-        ("T110", {"contact_status": "Open"}, "Contact: Open"),
-        ("T110", {"contact_status": "Closed"}, "Contact: Closed"),
-        ("T31x", {"temperature": "25.5", "humidity": "60"}, "Temp: 25.5°C"),
-        ("KE100", {"target_temp": "22", "current_temp": "21.5"}, "No specific sensor info"), # KE100 not actually supported in given main.py
+        ("T100", {"motion_detected": True}, "Motion: Detected"),
+        ("T100", {"motion_detected": False}, "Motion: Clear"),
+        ("T110", {"contact_open": True}, "Contact: Open"),
+        ("T110", {"contact_open": False}, "Contact: Closed"),
+        ("T31x", {"temperature": 25.5, "humidity": 60}, "Temp: 25.5°C"),
+        ("KE100", {"battery_low": False}, "No specific sensor info"), # Battery has its own column
         ("S200B", {}, "No specific sensor info"), # No specific details
-        ("Unknown", {"some_other_param": "value"}, "No specific sensor info")
+        ("Unknown", {"hw_ver": "1.0"}, "No specific sensor info")
     ]
 )
 def test_print_device_table_details_formatting(capsys: pytest.CaptureFixture[str], device_type: str, params: Dict[str, Any], expected_details: str):
@@ -442,10 +565,10 @@ def test_print_device_table_details_formatting(capsys: pytest.CaptureFixture[str
     if device_type == "Unknown" and expected_details == "No specific sensor info":
         return  # Skip this test case
 
-    devices = [{
-        "nickname": "Details Device", "device_id": "detail01", "device_type": device_type,
-        "status": 1, "rssi": -60, "params": params
-    }]
+    devices = [ChildDevice(
+        nickname="Details Device", device_id="detail01", device_type=device_type,
+        online=True, rssi=-60, **params
+    )]
     print_device_table(devices)
     captured = capsys.readouterr()
 
@@ -469,12 +592,12 @@ def test_print_additional_device_info_table_mock():
 
         # Create test devices
         devices = [
-            {"nickname": "Device 1", "params": {
-                "hw_ver": "1.0", "mac": "AA:BB:CC", "region": "EU",
-                "signal_level": "4", "battery_state": "OK", "jamming_rssi": "-70",
-                "report_interval": "60", "last_onboarded": "2023-01-01"
-            }},
-            {"nickname": "Device 2", "params": {}},  # Empty params
+            ChildDevice(
+                nickname="Device 1", hw_ver="1.0", mac="AA:BB:CC", region="EU",
+                signal_level=4, battery_low=False, jamming_rssi=-70,
+                report_interval=60, last_onboarded=datetime.datetime(2023, 1, 1)
+            ),
+            ChildDevice(nickname="Device 2"),  # Nothing reported
         ]
 
         # Call the function
@@ -513,18 +636,18 @@ def test_print_additional_device_info_table_empty_with_mock():
     "mock_devices",
     [
         # Case 1: Standard params device
-        [{"nickname": "Complete Device", "params": {
-            'hw_ver': "1.0.0", 'mac': "AA:BB:CC:DD:EE:FF", 'region': "EU",
-            'signal_level': "5", 'battery_state': "OK", 'jamming_rssi': "-85",
-            'report_interval': "30", 'last_onboarded': "2023-01-01 12:00:00"
-        }}],
+        [ChildDevice(
+            nickname="Complete Device", hw_ver="1.0.0", mac="AA:BB:CC:DD:EE:FF", region="EU",
+            signal_level=5, battery_low=False, jamming_rssi=-85,
+            report_interval=30, last_onboarded=datetime.datetime(2023, 1, 1, 12, 0, 0)
+        )],
         # Case 2: Multiple devices
         [
-            {"nickname": "Device 1", "params": {'hw_ver': "1.0", 'jamming_rssi': "-70"}},
-            {"nickname": "Device 2", "params": {'hw_ver': "2.0", 'jamming_rssi': "-60"}}
+            ChildDevice(nickname="Device 1", hw_ver="1.0", jamming_rssi=-70),
+            ChildDevice(nickname="Device 2", hw_ver="2.0", jamming_rssi=-60)
         ],
         # Case 3: Min params
-        [{"nickname": "Min Device", "params": {}}]
+        [ChildDevice(nickname="Min Device")]
     ]
 )
 def test_print_additional_device_info_table_variants(mock_devices):
@@ -546,51 +669,50 @@ def test_print_additional_device_info_table_variants(mock_devices):
         assert mock_console.print.call_count >= 1
         mock_console.print.assert_any_call(mock_table_instance)
 
-def test_print_additional_info_table_with_malformed_data():
-    """Test print_additional_device_info_table with malformed device data."""
+def test_print_additional_info_table_with_missing_data():
+    """Test print_additional_device_info_table with devices that reported nothing."""
     from tapo_chatter.main import print_additional_device_info_table
 
     # Use mock to prevent actual rendering
     with mock.patch("tapo_chatter.main.Table") as mock_table, \
-        mock.patch("tapo_chatter.main.console") as mock_console:
+        mock.patch("tapo_chatter.main.console"):
 
         mock_table_instance = mock.Mock()
         mock_table.return_value = mock_table_instance
 
-        # Create a safer version of the function to test
-        def safe_print_additional_device_info_table(devices):
-            try:
-                # Wrap original function call with try/except
-                if devices:
-                    # Create dict-like devices to avoid issues
-                    safe_devices = []
-                    for device in devices:
-                        if isinstance(device, dict):
-                            params = device.get('params')
-                            if params is None or not isinstance(params, dict):
-                                # Create a safe copy with empty params dict
-                                device_copy = dict(device)
-                                device_copy['params'] = {}
-                                safe_devices.append(device_copy)
-                            else:
-                                safe_devices.append(device)
-                    if safe_devices:
-                        print_additional_device_info_table(safe_devices)
-            except Exception:
-                # Just testing that we don't crash on bad data
-                pass
-
-        # Test various problematic inputs
-        safe_print_additional_device_info_table([
-            {"nickname": "No Params Device"},
-            {"nickname": "None Params Device", "params": None},
-            {"nickname": "Wrong Params Type", "params": "Not a dictionary"},
-            {},
-            "Not a device dict"
-        ])
-
-        # Also test with None
-        safe_print_additional_device_info_table(None)
+        print_additional_device_info_table([ChildDevice(nickname="No Data Device"), ChildDevice()])
+
+        rows = [call[0] for call in mock_table_instance.add_row.call_args_list]
+        assert rows[0][0] == "No Data Device"
+        assert rows[1][0] == "Unknown"
+        # Every missing value is only turned into a placeholder when rendered
+        assert all(cell == "N/A" for row in rows for cell in row[1:])
+
+
+def test_print_tables_with_malformed_data():
+    """Malformed values from the library render as placeholders instead of failing."""
+    from tapo_chatter.main import print_additional_device_info_table, print_device_table
+
+    raw = mock.Mock(nickname="Garbled Sensor", device_id="dev-x", device_type="T100", status=None)
+    raw.to_dict.return_value = {
+        "rssi": "strong",
+        "at_low_battery": "yes",
+        "detected": None,
+        "report_interval": [16],
+        "lastOnboardingTimestamp": "yesterday",
+    }
+    device = ChildDevice.from_api(raw)
+    assert device.rssi is None and device.battery_low is None and not device.online
+
+    console = Console(record=True, width=300)
+    with mock.patch("tapo_chatter.main.console", console):
+        print_additional_device_info_table([device, ChildDevice(nickname=None)])
+        print_device_table([device])
+
+    output = console.export_text()
+    assert "Garbled Sensor" in output and "Offline" in output
+    assert "No specific sensor info" in output
+    assert "strong" not in output and "yes" not in output
 
 @pytest.mark.asyncio
 async def test_get_child_devices_async_mock_fix():
@@ -618,11 +740,11 @@ async def test_get_child_devices_async_mock_fix():
 
         # Verify basic device properties
         assert len(devices) == 1
-        assert devices[0]["nickname"] == "Test Device"
-        assert devices[0]["device_id"] == "device123"
-        assert devices[0]["device_type"] == "T100"
-        assert devices[0]["status"] == 1  # Online
-        assert devices[0]["rssi"] == -65
+        assert devices[0].nickname == "Test Device"
+        assert devices[0].device_id == "device123"
+        assert devices[0].device_type == "T100"
+        assert devices[0].online is True
+        assert devices[0].rssi == -65
 
 @pytest.mark.asyncio
 async def test_main_config_load_error(capsys: pytest.CaptureFixture[str]):
@@ -681,61 +803,44 @@ def test_print_additional_device_info_table_multiple_devices():
 
         devices = [
             # Device with all parameters present and valid
-            {
-                "nickname": "Complete Device",
-                "params": {
-                    'hw_ver': "1.0.0",
-                    'mac': "AA:BB:CC:DD:EE:FF",
-                    'region': "EU",
-                    'signal_level': "5",
-                    'battery_state': "OK",
-                    'jamming_rssi': -85,  # Green (good)
-                    'report_interval': "30",
-                    'last_onboarded': "2023-01-01 12:00:00"
-                }
-            },
+            ChildDevice(
+                nickname="Complete Device",
+                hw_ver="1.0.0",
+                mac="AA:BB:CC:DD:EE:FF",
+                region="EU",
+                signal_level=5,
+                battery_low=False,
+                jamming_rssi=-85,  # Green (good)
+                report_interval=30,
+                last_onboarded=datetime.datetime(2023, 1, 1, 12, 0, 0)
+            ),
             # Device with some missing parameters
-            {
-                "nickname": "Partial Device",
-                "params": {
-                    'hw_ver': "2.0.0",
-                    'mac': "11:22:33:44:55:66",
-                    # region missing
-                    'signal_level': "3",
-                    # battery_state missing
-                    'jamming_rssi': -70,  # Yellow (fair)
-                    # report_interval missing
-                    'last_onboarded': "2023-02-15 08:30:00"
-                }
-            },
-            # Device with minimum parameters and edge cases - ensure everything is a string
-            {
-                "nickname": "Minimal Device",
-                "params": {
-                    'hw_ver': "",  # Empty string
-                    'mac': "N/A",
-                    'region': "None",  # String instead of None
-                    'signal_level': "0",  # String instead of number
-                    'battery_state': "Low",
-                    'jamming_rssi': "-50",  # String instead of number
-                    'report_interval': "None",  # String instead of None
-                    'last_onboarded': ""  # Empty string
-                }
-            },
-            # Device with unexpected/non-standard values
-            {
-                "nickname": "Unusual Device",
-                "params": {
-                    'hw_ver': "beta",
-                    'mac': "INVALID:FORMAT",
-                    'region': "UNKNOWN",
-                    'signal_level': "Unknown",
-                    'battery_state': "CRITICAL",  # Non-standard value
-                    'jamming_rssi': "Error",  # Non-numeric string
-                    'report_interval': "variable",
-                    'last_onboarded': "pending"
-                }
-            }
+            ChildDevice(
+                nickname="Partial Device",
+                hw_ver="2.0.0",
+                mac="11:22:33:44:55:66",
+                # region missing
+                signal_level=3,
+                # battery state missing
+                jamming_rssi=-70,  # Yellow (fair)
+                # report_interval missing
+                last_onboarded=datetime.datetime(2023, 2, 15, 8, 30, 0)
+            ),
+            # Device with minimum parameters and edge cases
+            ChildDevice(
+                nickname="Minimal Device",
+                hw_ver="",  # Empty string
+                signal_level=0,
+                battery_low=True,
+                jamming_rssi=-50,  # Red (high)
+            ),
+            # Device whose hub reported unusual values
+            ChildDevice(
+                nickname="Unusual Device",
+                hw_ver="beta",
+                mac="INVALID:FORMAT",
+                region="UNKNOWN",
+            )
         ]
 
         print_additional_device_info_table(devices)
@@ -771,23 +876,23 @@ def test_print_device_table_with_temperature_humidity_full_coverage():
         # Test devices with different sensor values
         devices = [
             # Temperature sensor
-            {
-                "nickname": "Temp Only",
-                "device_id": "temp001",
-                "device_type": "T31x",
-                "status": 1,
-                "rssi": -55,
-                "params": {"temperature": "22.5"} # Only temp, no humidity
-            },
+            ChildDevice(
+                nickname="Temp Only",
+                device_id="temp001",
+                device_type="T31x",
+                online=True,
+                rssi=-55,
+                temperature=22.5 # Only temp, no humidity
+            ),
             # Humidity sensor
-            {
-                "nickname": "Humidity Only",
-                "device_id": "humid001",
-                "device_type": "T31x",
-                "status": 1,
-                "rssi": -60,
-                "params": {"humidity": "45"} # Only humidity, no temp
-            }
+            ChildDevice(
+                nickname="Humidity Only",
+                device_id="humid001",
+                device_type="T31x",
+                online=True,
+                rssi=-60,
+                humidity=45 # Only humidity, no temp
+            )
         ]
 
         print_device_table(devices)
@@ -809,14 +914,13 @@ def test_print_device_table_with_undefined_device_type():
         mock_table.return_value = mock_table_instance
 
         # Device with no recognizable type
-        device = {
-            "nickname": "Unknown Device",
-            "device_id": "unknown001",
-            "device_type": "UnknownType", # Not in the handled device types
-            "status": 1,
-            "rssi": -65,
-            "params": {}
-        }
+        device = ChildDevice(
+            nickname="Unknown Device",
+            device_id="unknown001",
+            device_type="UnknownType", # Not in the handled device types
+            online=True,
+            rssi=-65,
+        )
 
         print_device_table([device])
 
@@ -841,42 +945,10 @@ def test_print_additional_device_info_table_all_types():
 
         # Create devices with all possible jamming RSSI conditions
         devices = [
-            {
-                "nickname": "RSSI 0",
-                "params": {
-                    "hw_ver": "1.0", "mac": "AA:BB:CC", "region": "EU",
-                    "signal_level": "4", "battery_state": "OK",
-                    "jamming_rssi": 0, # Zero (very low jamming)
-                    "report_interval": "60", "last_onboarded": "2023-01-01"
-                }
-            },
-            {
-                "nickname": "RSSI Non-Numeric",
-                "params": {
-                    "hw_ver": "1.0", "mac": "AA:BB:CC", "region": "EU",
-                    "signal_level": "4", "battery_state": "OK",
-                    "jamming_rssi": "Not a number", # Non-numeric string
-                    "report_interval": "60", "last_onboarded": "2023-01-01"
-                }
-            },
-            {
-                "nickname": "RSSI Dict",
-                "params": {
-                    "hw_ver": "1.0", "mac": "AA:BB:CC", "region": "EU",
-                    "signal_level": "4", "battery_state": "OK",
-                    "jamming_rssi": {"complex": "object"}, # Dictionary
-                    "report_interval": "60", "last_onboarded": "2023-01-01"
-                }
-            },
-            {
-                "nickname": "RSSI List",
-                "params": {
-                    "hw_ver": "1.0", "mac": "AA:BB:CC", "region": "EU",
-                    "signal_level": "4", "battery_state": "OK",
-                    "jamming_rssi": [1, 2, 3], # List
-                    "report_interval": "60", "last_onboarded": "2023-01-01"
-                }
-            }
+            ChildDevice(nickname=f"RSSI {jamming_rssi}", hw_ver="1.0", mac="AA:BB:CC", region="EU",
+                        signal_level=4, battery_low=False, jamming_rssi=jamming_rssi,
+                        report_interval=60, last_onboarded=datetime.datetime(2023, 1, 1))
+            for jamming_rssi in (0, -85, -72, -60, None)
         ]
 
         print_additional_device_info_table(devices)
@@ -887,6 +959,9 @@ def test_print_additional_device_info_table_all_types():
 
         # Verify rows were added for each device
         assert mock_table_instance.add_row.call_count == len(devices)
+        jamming_cells = [call[0][6] for call in mock_table_instance.add_row.call_args_list]
+        assert jamming_cells == ["[green]0[/green]", "[green]-85[/green]", "[yellow]-72[/yellow]",
+                                 "[red]-60[/red]", "N/A"]
 
         # Verify the table was printed
         mock_console.print.assert_any_call(mock_table_instance)
@@ -943,12 +1018,12 @@ async def test_get_child_devices_with_status_name_and_value():
         assert len(devices) == 2
 
         # Verify first device (status.name contains 'online')
-        status_name_device = next(d for d in devices if d["nickname"] == "Status Name Device")
-        assert status_name_device["status"] == 1  # Should be online because status.name is 'Online'
+        status_name_device = next(d for d in devices if d.nickname == "Status Name Device")
+        assert status_name_device.online is True  # Should be online because status.name is 'Online'
 
         # Verify second device (status.value == 1)
-        status_value_device = next(d for d in devices if d["nickname"] == "Status Value Device")
-        assert status_value_device["status"] == 1  # Should be online because status.value is 1
+        status_value_device = next(d for d in devices if d.nickname == "Status Value Device")
+        assert status_value_device.online is True  # Should be online because status.value is 1
 
 def test_main_module_execution():
     """Test the 'if __name__ == "__main__"' block in main.py."""
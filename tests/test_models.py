@@ -0,0 +1,94 @@
+"""Tests for the child device model and its compiled parsers."""
+
+import datetime
+from unittest import mock
+
+from tapo_chatter import models
+from tapo_chatter.models import ChildDevice, compile_parser, is_online, parser_for
+
+
+class T100Result:
+    """Stand-in for one of the tapo library's per-type result classes."""
+
+    def __init__(self, device_id, detected, status="Online"):
+        self.nickname = f"Sensor {device_id}"
+        self.device_id = device_id
+        self.device_type = "SMART.TAPOSENSOR"
+        self.status = status
+        self.detected = detected
+        self.calls = 0
+
+    def to_dict(self):
+        self.calls += 1
+        return {"detected": self.detected, "rssi": -60, "at_low_battery": False,
+                "lastOnboardingTimestamp": 1678886400}
+
+
+def test_parser_is_compiled_once_per_class():
+    first = T100Result("a", True)
+    with mock.patch.object(models, "compile_parser", wraps=compile_parser) as compile_spy:
+        parser = parser_for(first)
+        assert parser_for(T100Result("b", False)) is parser
+    assert compile_spy.call_count == 1
+
+    device = ChildDevice.from_api(T100Result("c", False, status=1))
+    assert device == ChildDevice(
+        nickname="Sensor c", device_id="c", device_type="SMART.TAPOSENSOR", online=True,
+        rssi=-60, battery_low=False, motion_detected=False,
+        last_onboarded=datetime.datetime.fromtimestamp(1678886400),
+    )
+
+
+def test_parser_reads_only_fields_the_class_reports():
+    sample = T100Result("a", True)
+    parse = compile_parser(sample)
+    data = {"detected": False, "open": True, "current_temp": 21.5}
+    other = T100Result("b", False)
+    other.to_dict = lambda: data
+
+    device = parse(other)
+    assert device.motion_detected is False
+    # Keys the class did not report on first encounter are not looked up
+    assert device.contact_open is None and device.temperature is None
+
+
+def test_failing_to_dict_keeps_attributes():
+    obj = mock.Mock(nickname="Faulty", device_id="x", device_type="T300", status=0)
+    obj.to_dict.side_effect = RuntimeError("boom")
+    assert ChildDevice.from_api(obj) == ChildDevice(nickname="Faulty", device_id="x", device_type="T300")
+
+
+def test_status_interpretation():
+    class Status:
+        def __init__(self, name, value):
+            self.name, self.value = name, value
+
+    assert is_online(Status("Online", 0)) and is_online(Status("Other", 1))
+    assert is_online(True) and is_online(1) and is_online("Status.Online")
+    assert not is_online(None) and not is_online(0) and not is_online("Offline")
+    # Unhashable values are still interpreted
+    assert not is_online(["offline"])
+
+
+def test_to_dict_serialises_timestamps():
+    device = ChildDevice(device_id="a", last_onboarded=datetime.datetime(2024, 1, 1, 8, 0, 0))
+    data = device.to_dict()
+    assert data["last_onboarded"] == "2024-01-01T08:00:00"
+    assert data["rssi"] is None
+
+
+def test_from_json_reads_raw_page_entries():
+    device = ChildDevice.from_json({
+        "nickname": "SGFsbCBTZW5zb3I=",
+        "device_id": "abc",
+        "type": "SMART.TAPOSENSOR",
+        "status": "online",
+        "detected": True,
+        "rssi": -61,
+        "report_interval": 16,
+    })
+    assert device == ChildDevice(nickname="Hall Sensor", device_id="abc", device_type="SMART.TAPOSENSOR",
+                                 online=True, motion_detected=True, rssi=-61, report_interval=16)
+    # Nicknames that are not base64 are kept as they are
+    assert ChildDevice.from_json({"nickname": "Hall Sensor"}).nickname == "Hall Sensor"
+    assert ChildDevice.from_json({}) == ChildDevice()
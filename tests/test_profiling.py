@@ -0,0 +1,123 @@
+"""Tests for per-stage latency instrumentation."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from rich.console import Console
+
+from tapo_chatter.device_discovery import device_probe
+from tapo_chatter.hub_session import HubSession
+from tapo_chatter.profiling import (
+    LatencyProfile,
+    percentile,
+    print_profile,
+    timed,
+    use_profile,
+)
+
+
+def test_percentile_nearest_rank():
+    samples = sorted(float(n) for n in range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 95) == 95
+    assert percentile(samples, 99) == 99
+    assert percentile([0.2], 99) == 0.2
+    assert percentile([], 50) == 0.0
+
+
+def test_summary_per_stage_and_host():
+    profile = LatencyProfile()
+    for seconds in (0.1, 0.2, 0.3):
+        profile.record("handshake", "10.0.0.1", seconds)
+    profile.record("handshake", "10.0.0.2", 0.4, failed=True)
+    profile.record("connect", "10.0.0.1", 0.01)
+
+    summary = profile.summary()
+
+    assert list(summary["stages"]) == ["connect", "handshake"]
+    handshake = summary["stages"]["handshake"]
+    assert handshake["count"] == 4 and handshake["errors"] == 1
+    assert handshake["p50"] == 0.2 and handshake["p99"] == 0.4 and handshake["max"] == 0.4
+    assert summary["hosts"]["10.0.0.1"]["handshake"]["mean"] == pytest.approx(0.2)
+    assert "connect" not in summary["hosts"]["10.0.0.2"]
+
+
+def test_only_the_first_hosts_are_broken_out():
+    profile = LatencyProfile(max_samples=4, max_hosts=2)
+    for octet in range(1, 101):
+        profile.record("connect", f"10.0.0.{octet}", octet / 1000)
+
+    summary = profile.summary()
+
+    assert set(summary["hosts"]) == {"10.0.0.1", "10.0.0.2"}
+    assert "p99" not in summary["hosts"]["10.0.0.1"]["connect"]
+    connect = summary["stages"]["connect"]
+    assert connect["count"] == 100 and connect["max"] == 0.1
+    # Percentiles come from the most recent samples only
+    assert connect["p50"] == 0.098
+
+
+def test_stage_failures_are_timed_and_reraised():
+    profile = LatencyProfile()
+    with use_profile(profile):
+        with pytest.raises(ValueError):
+            with timed("device_info", "10.0.0.1"):
+                raise ValueError("boom")
+    assert profile.summary()["stages"]["device_info"]["errors"] == 1
+
+
+def test_timed_does_nothing_without_profile():
+    with timed("connect", "10.0.0.1"):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_tasks_report_to_the_profile_active_when_created():
+    profile = LatencyProfile()
+
+    async def work(host):
+        with timed("connect", host):
+            await asyncio.sleep(0)
+
+    with use_profile(profile):
+        task = asyncio.create_task(work("10.0.0.1"))
+    await task
+    await asyncio.create_task(work("10.0.0.2"))
+
+    assert set(profile.summary()["hosts"]) == {"10.0.0.1"}
+
+
+@pytest.mark.asyncio
+async def test_probe_and_hub_stages_are_recorded():
+    device = mock.Mock()
+    device.get_device_info = mock.AsyncMock(return_value=SimpleNamespace(nickname="plug", model="P100"))
+    client = mock.Mock()
+    client.generic_device = mock.AsyncMock(return_value=device)
+    hub = mock.Mock()
+    hub.get_child_device_list = mock.AsyncMock(return_value=[])
+    client.h100 = mock.AsyncMock(return_value=hub)
+
+    profile = LatencyProfile()
+    with use_profile(profile):
+        found, _ = await device_probe(client, "10.0.0.5")
+        await HubSession(client, "10.0.0.9").get_child_device_list()
+
+    assert found
+    hosts = profile.summary()["hosts"]
+    assert set(hosts["10.0.0.5"]) == {"handshake", "device_info", "parse"}
+    assert set(hosts["10.0.0.9"]) == {"handshake", "child_devices"}
+
+
+def test_print_profile():
+    profile = LatencyProfile()
+    profile.record("connect", "10.0.0.1", 0.012)
+    profile.record("connect", "10.0.0.2", 0.034)
+    console = Console(record=True, width=200)
+
+    print_profile(profile.summary(), console)
+
+    text = console.export_text()
+    assert "Stage Latency (ms)" in text and "Slowest Hosts" in text
+    assert "34.0" in text
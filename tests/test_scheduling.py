@@ -0,0 +1,161 @@
+"""Tests for fixed-rate poll scheduling."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+
+from tapo_chatter.events import DeviceStateStore
+from tapo_chatter.hub_session import HubSession
+from tapo_chatter.main import HubState, poll_hub
+from tapo_chatter.models import ChildDevice
+from tapo_chatter.scheduling import AdaptiveCadence, FixedRateSchedule
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_deadlines_stay_on_the_grid_regardless_of_work_time():
+    clock = FakeClock()
+    schedule = FixedRateSchedule(10, clock=clock)
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+        clock.now += delay
+
+    with mock.patch("tapo_chatter.scheduling.asyncio.sleep", side_effect=fake_sleep):
+        for work in (3.0, 7.5, 0.5):
+            assert await schedule.wait() == 0
+            clock.now += work
+            assert schedule.advance() == 0
+
+    assert slept == [0, 7.0, 2.5]
+    assert schedule.deadline == 130
+
+
+def test_overrunning_work_skips_the_deadlines_it_covered():
+    clock = FakeClock()
+    schedule = FixedRateSchedule(10, clock=clock)
+
+    clock.now += 25
+    assert schedule.advance() == 2
+    # Resumes on the original grid instead of restarting the period
+    assert schedule.deadline == 130 and schedule.missed == 2
+
+    clock.now = 130.0
+    assert schedule.advance() == 0 and schedule.deadline == 140
+
+
+def test_schedule_rejects_negative_intervals():
+    with pytest.raises(ValueError):
+        FixedRateSchedule(-1)
+
+
+@pytest.mark.asyncio
+async def test_poll_hub_counts_polls_that_overran_their_period():
+    durations = [0.0, 0.12, 0.0]
+    started = []
+    loop = asyncio.get_running_loop()
+
+    async def slow_get_child_devices(client, host, session=None, quiet=False, check_connectivity=None):
+        if not durations:
+            raise asyncio.CancelledError
+        started.append(loop.time())
+        await asyncio.sleep(durations.pop(0))
+        return [ChildDevice(device_id="a")]
+
+    state = HubState(host="10.0.0.1", session=mock.Mock())
+    with mock.patch("tapo_chatter.main.get_child_devices", side_effect=slow_get_child_devices):
+        with pytest.raises(asyncio.CancelledError):
+            await poll_hub(mock.Mock(), state, 0.05, asyncio.Event())
+
+    assert state.missed_polls == 2
+    # The third poll waits for the grid instead of starting right after the slow one
+    assert started[2] - started[0] == pytest.approx(0.2, abs=0.03)
+
+
+def sensors(*report_intervals, online=True):
+    return [ChildDevice(device_id=str(i), online=online, report_interval=interval)
+            for i, interval in enumerate(report_intervals)]
+
+
+def test_cadence_floor_is_the_quickest_reporting_child():
+    cadence = AdaptiveCadence(5, max_interval=120)
+    assert cadence.floor(sensors(16, 60)) == 16
+    assert cadence.floor(sensors(2)) == 5
+    assert cadence.floor(sensors(600)) == 120
+    # Offline children and children without a report interval don't set the pace
+    assert cadence.floor(sensors(16, online=False) + sensors(None)) == 5
+
+
+def test_cadence_backs_off_while_stable_and_boosts_after_a_change():
+    cadence = AdaptiveCadence(5, max_interval=60, backoff=2, stable_polls=2, boost_polls=2)
+    children = sensors(10, 30)
+
+    assert [cadence.update(children, changed=False) for _ in range(5)] == [10, 10, 20, 40, 60]
+    assert cadence.update(children, changed=False) == 60
+
+    assert cadence.update(children, changed=True) == 5
+    assert cadence.update(children, changed=False) == 5
+    assert cadence.update(children, changed=False) == 10
+
+
+@pytest.mark.asyncio
+async def test_poll_hub_applies_the_adaptive_interval():
+    polls = 0
+
+    async def fake_get_child_devices(client, host, session=None, quiet=False, check_connectivity=None):
+        nonlocal polls
+        polls += 1
+        if polls > 2:
+            raise asyncio.CancelledError
+        return sensors(30)
+
+    state = HubState(host="10.0.0.1", session=mock.Mock())
+    cadence = AdaptiveCadence(0, max_interval=60)
+    with mock.patch("tapo_chatter.main.get_child_devices", side_effect=fake_get_child_devices), \
+            mock.patch("tapo_chatter.scheduling.asyncio.sleep", new_callable=mock.AsyncMock) as fake_sleep:
+        with pytest.raises(asyncio.CancelledError):
+            await poll_hub(mock.Mock(), state, 0, asyncio.Event(), cadence=cadence)
+
+    assert state.poll_interval == 30
+    # The sleeps don't advance the clock, so the deadlines are 30 and 60 seconds out
+    delays = [call.args[0] for call in fake_sleep.await_args_list]
+    assert delays[1:] == [pytest.approx(30, abs=1), pytest.approx(60, abs=1)]
+
+
+
+@pytest.mark.asyncio
+async def test_paged_poll_streams_the_child_list_into_the_store():
+    polls = 0
+
+    async def get_page(start):
+        nonlocal polls
+        if start == 0:
+            polls += 1
+            if polls > 1:
+                raise asyncio.CancelledError
+        children = [{"device_id": str(i), "status": "online"} for i in range(start, min(start + 10, 12))]
+        return {"child_device_list": children, "sum": 12}
+
+    hub = mock.AsyncMock()
+    hub.get_child_device_list_json = mock.AsyncMock(side_effect=get_page)
+    client = mock.AsyncMock()
+    client.h100 = mock.AsyncMock(return_value=hub)
+    state = HubState(host="10.0.0.1", session=HubSession(client, "10.0.0.1"))
+    store = DeviceStateStore()
+
+    with mock.patch("tapo_chatter.main.check_host_connectivity", return_value=True):
+        with pytest.raises(asyncio.CancelledError):
+            await poll_hub(client, state, 0, asyncio.Event(), store, paged=True)
+
+    assert [device.device_id for device in state.devices] == [str(i) for i in range(12)]
+    assert all(device.online for device in state.devices)
+    assert not hub.get_child_device_list.called
@@ -0,0 +1,109 @@
+"""Tests for the headless serve mode."""
+
+import asyncio
+import datetime
+import json
+from unittest import mock
+
+import pytest
+
+from tapo_chatter.main import HubState
+from tapo_chatter.models import ChildDevice
+from tapo_chatter.server import SnapshotServer, render_json, render_prometheus
+
+
+def make_state(host="10.0.0.1", devices=None, error=None, polled=True):
+    return HubState(
+        host=host,
+        session=mock.Mock(handshakes=1),
+        devices=devices or [],
+        updated_at=datetime.datetime(2024, 1, 1, 12, 0, 0) if polled else None,
+        error=error,
+    )
+
+
+SENSOR = ChildDevice(
+    nickname='Hall "Main"',
+    device_id="dev1",
+    device_type="SMART.TAPOSENSOR",
+    online=True,
+    rssi=-62,
+    motion_detected=True,
+    battery_low=False,
+    last_onboarded=datetime.datetime(2023, 3, 15, 13, 20, 0),
+)
+
+
+def test_render_prometheus_exposes_hub_and_child_metrics():
+    text = render_prometheus([make_state(devices=[SENSOR]), make_state("10.0.0.2", polled=False)]).decode()
+
+    assert "# TYPE tapo_hub_up gauge" in text
+    assert 'tapo_hub_up{hub="10.0.0.1"} 1' in text
+    assert 'tapo_hub_child_devices{hub="10.0.0.1"} 1' in text
+    labels = '{hub="10.0.0.1",device_id="dev1",nickname="Hall \\"Main\\"",type="SMART.TAPOSENSOR"}'
+    assert f"tapo_child_online{labels} 1" in text
+    assert f"tapo_child_rssi_dbm{labels} -62" in text
+    assert f"tapo_child_motion_detected{labels} 1" in text
+    assert f"tapo_child_battery_low{labels} 0" in text
+    # Metrics without samples are left out entirely, as are hubs not yet polled
+    assert "tapo_child_contact_open" not in text
+    assert "10.0.0.2" not in text
+
+
+def test_render_prometheus_reports_failed_hub():
+    text = render_prometheus([make_state(error="Cannot reach host")]).decode()
+    assert 'tapo_hub_up{hub="10.0.0.1"} 0' in text
+
+
+def test_render_json():
+    data = json.loads(render_json([make_state(devices=[SENSOR])]))
+    assert data["hubs"][0]["host"] == "10.0.0.1"
+    assert data["hubs"][0]["updated_at"] == "2024-01-01T12:00:00"
+    device = data["hubs"][0]["devices"][0]
+    assert device["device_id"] == "dev1"
+    assert device["online"] is True
+    assert device["motion_detected"] is True
+    # Values the device did not report are null rather than placeholder strings
+    assert device["contact_open"] is None
+    assert device["last_onboarded"] == "2023-03-15T13:20:00"
+
+
+async def fetch(port, request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(request)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return head.decode(), body
+
+
+@pytest.mark.asyncio
+async def test_scrapes_are_served_from_memory():
+    state = make_state(devices=[SENSOR])
+    snapshots = SnapshotServer([state])
+    server = await asyncio.start_server(snapshots.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        head, body = await fetch(port, b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        assert head.startswith("HTTP/1.1 200 OK")
+        assert "text/plain; version=0.0.4" in head
+        assert b"tapo_child_online" in body
+
+        for _ in range(3):
+            await fetch(port, b"GET /metrics HTTP/1.1\r\n\r\n")
+        assert snapshots.renders == 1
+
+        # A new poll makes the next scrape render again
+        state.updated_at = datetime.datetime(2024, 1, 1, 12, 0, 10)
+        head, body = await fetch(port, b"GET /devices HTTP/1.1\r\n\r\n")
+        assert "application/json" in head
+        assert json.loads(body)["hubs"][0]["updated_at"] == "2024-01-01T12:00:10"
+
+        head, _ = await fetch(port, b"GET /nope HTTP/1.1\r\n\r\n")
+        assert head.startswith("HTTP/1.1 404")
+        head, _ = await fetch(port, b"POST /metrics HTTP/1.1\r\n\r\n")
+        assert head.startswith("HTTP/1.1 405")
+        head, body = await fetch(port, b"HEAD /metrics HTTP/1.1\r\n\r\n")
+        assert head.startswith("HTTP/1.1 200") and body == b""
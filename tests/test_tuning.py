@@ -0,0 +1,179 @@
+"""Tests for adaptive discovery tuning."""
+
+import argparse
+import asyncio
+
+import pytest
+
+from tapo_chatter.device_discovery import scan_addresses
+from tapo_chatter.profiling import percentile
+from tapo_chatter.tuning import AUTO, AdaptiveTuner, limit_arg, timeout_arg
+
+
+def test_limit_grows_by_one_per_clean_window():
+    tuner = AdaptiveTuner(initial_limit=4, max_limit=10)
+
+    for _ in range(4):
+        tuner.record(0.01, (False, None))
+    assert tuner.limit == 5
+
+    for _ in range(5):
+        tuner.record(0.01, (False, None))
+    assert tuner.limit == 6
+    assert tuner.increases == 2
+
+
+def test_limit_halves_on_timeouts():
+    tuner = AdaptiveTuner(initial_limit=8)
+
+    for _ in range(6):
+        tuner.record(0.01, (False, None))
+    for _ in range(2):
+        tuner.record(2.0, asyncio.TimeoutError())
+
+    assert tuner.limit == 4
+    assert tuner.decreases == 1
+    assert tuner.timeouts == 2
+
+
+def test_limit_stays_within_bounds():
+    tuner = AdaptiveTuner(initial_limit=2, min_limit=2, max_limit=3)
+
+    for _ in range(2):
+        tuner.record(0.5, OSError("unreachable"))
+    assert tuner.limit == 2
+
+    for _ in range(20):
+        tuner.record(0.01, (False, None))
+    assert tuner.limit == 3
+
+
+def test_timeout_follows_p99_after_warmup():
+    tuner = AdaptiveTuner(initial_timeout=2.0, warmup=5, timeout_factor=2.0)
+
+    for elapsed in (0.05, 0.1, 0.1):
+        tuner.record(elapsed, (False, None))
+    assert tuner.timeout == 2.0
+
+    for elapsed in (0.1, 0.3):
+        tuner.record(elapsed, (True, {}))
+    assert tuner.percentile(99) == 0.3
+    assert tuner.timeout == pytest.approx(0.6)
+
+
+def test_timeout_is_clamped():
+    tuner = AdaptiveTuner(warmup=1, min_timeout=0.2, max_timeout=1.0)
+
+    tuner.record(0.001, (False, None))
+    assert tuner.timeout == 0.2
+
+    tuner.record(3.0, (False, None))
+    assert tuner.timeout == 1.0
+
+
+def test_fixed_values_are_not_adapted():
+    tuner = AdaptiveTuner(limit=5, timeout=0.75, warmup=1)
+
+    for _ in range(10):
+        tuner.record(0.01, asyncio.TimeoutError())
+    tuner.record(0.01, (False, None))
+
+    assert tuner.limit == 5
+    assert tuner.max_limit == 5
+    assert tuner.timeout == 0.75
+
+
+def test_percentiles_match_the_profile_ones():
+    """The tuner and the latency profile rank samples the same way."""
+    tuner = AdaptiveTuner(sample_size=100)
+    samples = [i / 1000 for i in range(1, 101)]
+    for elapsed in samples:
+        tuner.record(elapsed, (False, None))
+
+    for q in (7, 50, 95, 99):
+        assert tuner.percentile(q) == percentile(samples, q)
+    assert tuner.percentile(7) == 0.007
+    assert AdaptiveTuner().percentile(50) is None
+
+
+def test_summary_reports_settled_values():
+    tuner = AdaptiveTuner(warmup=1)
+    tuner.record(0.2, (True, {}))
+
+    summary = tuner.summary()
+
+    assert summary["limit"] == tuner.limit
+    assert summary["p50"] == 0.2
+    assert summary["responses"] == 1
+
+
+@pytest.mark.parametrize("parse, value, expected", [
+    (limit_arg, "auto", AUTO),
+    (limit_arg, "AUTO", AUTO),
+    (limit_arg, "32", 32),
+    (timeout_arg, "auto", AUTO),
+    (timeout_arg, "0.25", 0.25),
+])
+def test_cli_arg_types(parse, value, expected):
+    assert parse(value) == expected
+
+
+@pytest.mark.parametrize("parse, value", [
+    (limit_arg, "0"),
+    (limit_arg, "fast"),
+    (timeout_arg, "-1"),
+    (timeout_arg, "slow"),
+])
+def test_cli_arg_types_reject_bad_values(parse, value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse(value)
+
+
+@pytest.mark.asyncio
+async def test_scan_addresses_respects_tuner_window():
+    """Only the tuner's current window of probes is in flight at once."""
+    tuner = AdaptiveTuner(initial_limit=3, max_limit=3)
+    in_flight = 0
+    peak = 0
+
+    async def probe(ip):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return ip
+
+    addresses = [f"10.0.0.{i}" for i in range(1, 21)]
+    outcomes = [outcome async for _, outcome in scan_addresses(addresses, probe, tuner=tuner)]
+
+    assert sorted(outcomes) == sorted(addresses)
+    assert peak <= 3
+    assert tuner.responses == 20
+
+
+@pytest.mark.asyncio
+async def test_scan_addresses_uses_tuner_timeout():
+    tuner = AdaptiveTuner(limit=2, timeout=0.05)
+
+    async def probe(ip):
+        await asyncio.sleep(1 if ip.endswith(".1") else 0)
+        return ip
+
+    outcomes = dict([item async for item in scan_addresses(["10.0.0.1", "10.0.0.2"], probe, tuner=tuner)])
+
+    assert isinstance(outcomes["10.0.0.1"], asyncio.TimeoutError)
+    assert outcomes["10.0.0.2"] == "10.0.0.2"
+    assert tuner.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_is_released_when_the_block_fails():
+    tuner = AdaptiveTuner(limit=1)
+
+    with pytest.raises(ConnectionRefusedError):
+        async with tuner.slot():
+            raise ConnectionRefusedError
+
+    async with tuner.slot():
+        pass